@@ -0,0 +1,20 @@
+"""
+Session and auth endpoints only.
+
+Imports neither OpenCV nor the detection model, so these workers start in a
+fraction of the time of :mod:`api.main`:
+
+    uvicorn api.accounts_main:app --host 0.0.0.0 --port 8001
+"""
+from dotenv import load_dotenv
+
+from routers import auth, sessions
+
+from .app_factory import create_app
+
+load_dotenv()
+
+app = create_app(
+    title="Climbing Crux Accounts",
+    routers=[sessions.router, auth.router],
+)
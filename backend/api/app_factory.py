@@ -0,0 +1,31 @@
+from collections.abc import Sequence
+
+from fastapi import APIRouter, FastAPI
+from starlette.responses import PlainTextResponse
+
+from . import telemetry
+
+
+def create_app(title: str, routers: Sequence[APIRouter], lifespan=None) -> FastAPI:
+    """
+    FastAPI app with the shared middleware, ``/health`` and ``/metrics``,
+    serving the given routers.
+
+    Keep this module light: every deployable app imports it, so anything
+    heavy imported here slows down the start of all of them.
+    """
+    app = FastAPI(title=title, lifespan=lifespan)
+    app.middleware("http")(telemetry.instrument_requests)
+
+    @app.get("/health")
+    async def health() -> dict:
+        return {"message": "ok"}
+
+    @app.get("/metrics", response_class=PlainTextResponse)
+    async def metrics() -> PlainTextResponse:
+        """Prometheus text exposition of latency histograms and counters."""
+        return PlainTextResponse(telemetry.registry.render(), media_type="text/plain; version=0.0.4")
+
+    for router in routers:
+        app.include_router(router)
+    return app
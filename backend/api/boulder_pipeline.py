@@ -0,0 +1,401 @@
+import inspect
+import json
+from collections.abc import Iterator, Sequence
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+
+import cv2
+import numpy as np
+from fastapi import HTTPException, status
+
+from src import config, image_utils, objects_detector
+from src.aruco_marker import ArucoMarker
+from src.image_decode import DecodedImage, decode_image
+from src.metrics import StageTimer
+from src.model.detected_object import DetectedObject
+from src.model.hold_set import Hold, HoldSet
+from src.perceptual_hash import FingerprintIndex, NearDuplicate, difference_hash, rescale_detected_objects
+from src.result_cache import CacheEntry
+from src.route_encoding import OutputFormat, new_overlay_canvas, timed_encode
+from src.route_generator import AnytimeRoute, RouteGenerator
+from src.route_planner import plan_best_routes, plan_bottom_to_top_route, plan_diverse_routes
+from src.route_scoring import LIMBS
+
+from .telemetry import FAILED_STAGE_HEADER
+
+RESIZE_WIDTH = 1216
+
+near_duplicate_index = FingerprintIndex(
+    capacity=config.NEAR_DUPLICATE_INDEX_SIZE,
+    max_distance=config.NEAR_DUPLICATE_MAX_DISTANCE,
+)
+
+
+@dataclass(frozen=True)
+class PipelineResult:
+    detected_objects: Sequence[DetectedObject]
+    body: bytes
+    media_type: str
+    # Hamming distance to the photo whose detections were reused, if any
+    near_duplicate_distance: int | None = None
+    encode_seconds: float = 0.0
+    route_length: int = 0
+    # seconds spent per pipeline stage, in execution order
+    timings: dict[str, float] = field(default_factory=dict)
+    # DetectorSettings.model_fingerprint of the model the detections came from
+    model_fingerprint: str = ""
+
+    def to_cache_entry(self) -> CacheEntry:
+        return CacheEntry(detected_objects=self.detected_objects, body=self.body, media_type=self.media_type,
+                          near_duplicate_distance=self.near_duplicate_distance)
+
+
+@dataclass(frozen=True)
+class _PlannedRoute:
+    decoded: DecodedImage
+    detected_objects: HoldSet
+    route_holds: list[DetectedObject]
+    # route_holds first, then the alternatives asked for
+    routes: list[list[DetectedObject]]
+    near_duplicate: NearDuplicate | None
+    timer: StageTimer
+    # with a deadline, the body-aware route that route_holds come from
+    body_route: AnytimeRoute | None = None
+
+
+def cache_params(output: str, route_count: int = 1, deadline_ms: int | None = None) -> dict:
+    """
+    Everything besides the upload bytes that changes the pipeline output.
+
+    ``output`` is ``"json"`` or an :meth:`OutputFormat.cache_key`.
+    """
+    params = {
+        "output": output,
+        "resizeWidth": RESIZE_WIDTH,
+        "detect": _detect_params(),
+        "planner": _planner_params(),
+    }
+    if route_count > 1:
+        params["routes"] = {**_keyword_defaults(plan_diverse_routes), "count": route_count}
+    if deadline_ms is not None:
+        params["bodyAware"] = {
+            **_keyword_defaults(RouteGenerator.generate_route_anytime),
+            "deadlineMs": deadline_ms,
+            "climberHeightInCm": config.CLIMBER_HEIGHT_IN_CM,
+            "stepRadiusInCm": config.STEP_RADIUS_IN_CM,
+            "startingStepsMaxDistanceFromGroundInCm": config.STARTING_STEPS_MAX_DISTANCE_FROM_GROUND_IN_CM,
+            "markerPerimeterInCm": config.MARKER_PERIMETER_IN_CM,
+        }
+    if config.DETECTION_TILING:
+        params["tiling"] = _tiling_params()
+    if output != "json":
+        params["render"] = {
+            "bboxColor": config.BBOX_COLOR.rgb(),
+            "bboxCenterColor": config.BBOX_CENTER_COLOR.rgb(),
+            "problemStepBboxColor": config.PROBLEM_STEP_BBOX_COLOR.rgb(),
+            "routeLineColor": config.ROUTE_LINE_COLOR.rgb(),
+            "lineWidth": config.LINE_WIDTH,
+            "routeLineWidth": config.ROUTE_LINE_WIDTH,
+        }
+    return params
+
+
+def generate_route(contents: bytes, output_format: OutputFormat = OutputFormat("png")) -> PipelineResult:
+    """
+    Run the decode -> detect -> plan -> render pipeline for one upload.
+
+    Blocking; meant to be executed on the worker pool, never on the event loop.
+    Returns the detections and the annotated image encoded in
+    ``output_format``; the overlay format draws on a transparent canvas
+    instead of the photo.
+
+    Detection is skipped when the photo is a near duplicate of a recent one;
+    the stored detections are rescaled to this image instead.
+    """
+    timer = StageTimer()
+    with _failed_stage_header(timer):
+        planned = _detect_and_plan(contents, timer)
+
+        with timer.stage("render"):
+            if output_format.is_overlay:
+                img_height, img_width = planned.decoded.img.shape[:2]
+                img = new_overlay_canvas(img_width, img_height)
+            else:
+                img = planned.decoded.img
+
+            img = image_utils.draw_bboxes(
+                img=img,
+                detected_objects=planned.detected_objects,
+                bbox_color=config.BBOX_COLOR,
+                bbox_center_color=config.BBOX_CENTER_COLOR,
+                line_width=config.LINE_WIDTH,
+                draw_labels=False,
+                draw_centers=False,
+            )
+
+            img = image_utils.draw_bboxes(
+                img=img,
+                detected_objects=planned.route_holds,
+                bbox_color=config.PROBLEM_STEP_BBOX_COLOR,
+                bbox_center_color=config.BBOX_CENTER_COLOR,
+                line_width=config.LINE_WIDTH,
+                draw_labels=False,
+                draw_centers=True,
+            )
+
+            for start_hold, end_hold in zip(planned.route_holds, planned.route_holds[1:]):
+                img = image_utils.draw_line(
+                    img=img,
+                    start_point=start_hold.center,
+                    end_point=end_hold.center,
+                    color=config.ROUTE_LINE_COLOR,
+                    line_width=config.ROUTE_LINE_WIDTH,
+                )
+
+        with timer.stage("encode"):
+            try:
+                body, encode_seconds = timed_encode(img, output_format)
+            except ValueError as exc:
+                raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail=str(exc)) from exc
+
+    print(
+        f"[boulder/generate] pipeline done in {sum(timer.stages.values()):.2f}s "
+        f"format={output_format.cache_key()} bytes={len(body)} encode={encode_seconds * 1000:.1f}ms"
+    )
+    return _result(planned, body=body, media_type=output_format.media_type, encode_seconds=encode_seconds)
+
+
+def generate_route_geometry(contents: bytes, route_count: int = 1, deadline_ms: int | None = None) -> PipelineResult:
+    """
+    Run the decode -> detect -> plan pipeline and return the route as JSON.
+
+    Nothing is drawn or image-encoded; clients render the overlay themselves
+    from the hold boxes and the ordered route indices. With ``route_count``
+    above 1, up to that many diverse routes are planned on the same
+    detections and returned together. With ``deadline_ms``, the route is a
+    body-aware one instead, the best found within that many milliseconds.
+    """
+    timer = StageTimer()
+    with _failed_stage_header(timer):
+        planned = _detect_and_plan(contents, timer, route_count, deadline_ms)
+
+        with timer.stage("serialize"):
+            geometry = route_geometry(planned.decoded, planned.detected_objects, planned.route_holds,
+                                      planned.routes if route_count > 1 else None, planned.body_route)
+            body = json.dumps(geometry, separators=(",", ":"))
+
+    print(f"[boulder/route] pipeline done in {sum(timer.stages.values()):.2f}s")
+    return _result(planned, body=body.encode(), media_type="application/json")
+
+
+def route_geometry(decoded: DecodedImage, detected_objects: Sequence[DetectedObject],
+                   route_holds: list[DetectedObject], routes: list[list[DetectedObject]] | None = None,
+                   body_route: AnytimeRoute | None = None) -> dict:
+    """
+    Compact route payload.
+
+    ``holds`` are ``[x1, y1, x2, y2, classIndex]`` in the coordinates of the
+    resized image; divide by ``image.scale`` to map onto the original photo.
+    ``route`` lists indices into ``holds`` from the start hold to the top.
+    ``routes``, only present when given, lists every route the same way,
+    ``route`` first. With ``body_route``, ``positions`` lists the holds of
+    the left arm, right arm, left leg and right leg in every position and
+    ``search`` how the route was found; ``route`` is then its holds in the
+    order they are first used.
+    """
+    hold_set = HoldSet.from_objects(detected_objects)
+    # class indices in order of first appearance
+    used_class_ids = list(dict.fromkeys(hold_set.class_ids.tolist()))
+    class_names = [hold_set.class_names[class_id] for class_id in used_class_ids]
+    class_indices = np.zeros(len(hold_set.class_names), dtype=int)
+    class_indices[used_class_ids] = np.arange(len(used_class_ids))
+    holds = np.column_stack([hold_set.bboxes, class_indices[hold_set.class_ids]]).tolist()
+
+    img_height, img_width = decoded.img.shape[:2]
+    geometry = {
+        "image": {
+            "width": img_width,
+            "height": img_height,
+            "originalWidth": decoded.original_width,
+            "originalHeight": decoded.original_height,
+            "scale": round(decoded.scale, 6),
+        },
+        "classNames": class_names,
+        "holds": holds,
+        "route": _hold_indices(hold_set, route_holds),
+    }
+    if routes is not None:
+        geometry["routes"] = [_hold_indices(hold_set, route) for route in routes]
+    if body_route is not None:
+        geometry["positions"] = [_hold_indices(hold_set, [getattr(position, limb).detected_object for limb in LIMBS])
+                                 for position in body_route.positions]
+        geometry["search"] = body_route.to_dict()
+    return geometry
+
+
+def _hold_indices(hold_set: HoldSet, holds: Sequence[DetectedObject]) -> list[int]:
+    """Row of each of ``holds`` in ``hold_set``: by id for holds of its detection, else by class and box."""
+    row_of_id = {hold_id: row for row, hold_id in enumerate(hold_set.ids.tolist())}
+    return [row_of_id[hold.id] if isinstance(hold, Hold) and hold.holds.source == hold_set.source
+            else hold_set.views().index(hold) for hold in holds]
+
+
+def _detect_and_plan(contents: bytes, timer: StageTimer, route_count: int = 1,
+                     deadline_ms: int | None = None) -> _PlannedRoute:
+    decode_width = config.DETECTION_TILE_SOURCE_WIDTH if config.DETECTION_TILING else RESIZE_WIDTH
+    with timer.stage("decode"):
+        decoded = decode_image(contents, target_width=decode_width, resize=False)
+        if decoded is None:
+            raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Invalid image file")
+
+    with timer.stage("resize"):
+        tiling_img = _tiling_source(decoded) if config.DETECTION_TILING else None
+        decoded = decoded.resized(RESIZE_WIDTH)
+
+    img_height, img_width = decoded.img.shape[:2]
+    with timer.stage("fingerprint"):
+        fingerprint = difference_hash(decoded.img)
+        near_duplicate = near_duplicate_index.find(fingerprint, img_width, img_height, _detector_key(tiling_img))
+
+    if near_duplicate is not None:
+        detected_objects = near_duplicate.detected_objects
+        print(f"[boulder] reused detections of near duplicate distance={near_duplicate.distance}")
+    else:
+        with timer.stage("detect"):
+            detected_objects = _detect(decoded.img, tiling_img)
+        # keyed after detecting, by the model that loaded if this was the first call
+        near_duplicate_index.add(fingerprint, img_width, img_height, detected_objects, _detector_key(tiling_img))
+
+    body_route = None
+    with timer.stage("plan"):
+        try:
+            if deadline_ms is not None:
+                body_route = _plan_body_aware(decoded.img, detected_objects, deadline_ms)
+                routes = [_holds_in_order(body_route)]
+            else:
+                routes = _plan(detected_objects, img_width=img_width, img_height=img_height, route_count=route_count)
+        except TimeoutError as exc:
+            # the time budget ran out, the same photo may well have a route
+            raise HTTPException(status_code=status.HTTP_504_GATEWAY_TIMEOUT,
+                                detail=f"{exc}, try a longer deadline_ms") from exc
+        except ValueError as exc:
+            raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(exc)) from exc
+
+    return _PlannedRoute(
+        decoded=decoded,
+        detected_objects=detected_objects,
+        route_holds=routes[0],
+        routes=routes,
+        near_duplicate=near_duplicate,
+        timer=timer,
+        body_route=body_route,
+    )
+
+
+def _plan(detected_objects: HoldSet, *, img_width: int, img_height: int,
+          route_count: int = 1) -> list[list[DetectedObject]]:
+    """The planned routes, best first; several routes always come from the graph planner's shared graph."""
+    if route_count > 1:
+        ranked = plan_diverse_routes(detected_objects, img_width=img_width, img_height=img_height, count=route_count)
+        return [route.holds for route in ranked]
+    if config.ROUTE_PLANNER == "graph":
+        return [plan_best_routes(detected_objects, img_width=img_width, img_height=img_height)[0].holds]
+    return [plan_bottom_to_top_route(detected_objects, img_width=img_width, img_height=img_height)]
+
+
+def _plan_body_aware(img: cv2.typing.MatLike, detected_objects: HoldSet, deadline_ms: int) -> AnytimeRoute:
+    """The best body-aware route found within ``deadline_ms``, scaled by the ArUco marker in ``img``."""
+    img_height, img_width = img.shape[:2]
+    marker = ArucoMarker(config.MARKER_ARUCO_DICT, img, config.MARKER_PERIMETER_IN_CM)
+    generator = RouteGenerator(img_width, img_height, marker, detected_objects)
+    return generator.generate_route_anytime(config.CLIMBER_HEIGHT_IN_CM,
+                                            config.STARTING_STEPS_MAX_DISTANCE_FROM_GROUND_IN_CM, deadline_ms)
+
+
+def _holds_in_order(body_route: AnytimeRoute) -> list[DetectedObject]:
+    """The holds of a body-aware route in the order they are first used."""
+    holds = (getattr(position, limb).detected_object for position in body_route.positions for limb in LIMBS)
+    return list(dict.fromkeys(holds))
+
+
+def _detect_params() -> dict:
+    return {**_keyword_defaults(objects_detector.detect), **objects_detector.settings().cache_params()}
+
+
+def _tiling_params() -> dict:
+    return {"sourceWidth": config.DETECTION_TILE_SOURCE_WIDTH, **_keyword_defaults(objects_detector.detect_tiled)}
+
+
+def _detector_key(tiling_img: cv2.typing.MatLike | None) -> str:
+    """What near-duplicate reuse must match: detections of other weights or settings are never reused."""
+    tiling = _tiling_params() if tiling_img is not None else None
+    return json.dumps({"detect": _detect_params(), "tiling": tiling}, sort_keys=True)
+
+
+def _planner_params() -> dict:
+    if config.ROUTE_PLANNER == "graph":
+        return {"mode": "graph", **_keyword_defaults(plan_best_routes)}
+    return _keyword_defaults(plan_bottom_to_top_route)
+
+
+@contextmanager
+def _failed_stage_header(timer: StageTimer) -> Iterator[None]:
+    # tells the API process which stage failed and how long the stages took, also across worker processes
+    try:
+        yield
+    except HTTPException as exc:
+        exc.headers = {**(exc.headers or {}), FAILED_STAGE_HEADER: timer.failed_stage or "unknown"}
+        exc.timings = dict(timer.stages)
+        raise
+
+
+def _result(planned: _PlannedRoute, body: bytes, media_type: str,
+            encode_seconds: float = 0.0) -> PipelineResult:
+    return PipelineResult(
+        detected_objects=planned.detected_objects,
+        body=body,
+        media_type=media_type,
+        near_duplicate_distance=planned.near_duplicate.distance if planned.near_duplicate is not None else None,
+        encode_seconds=encode_seconds,
+        route_length=len(planned.route_holds),
+        timings=dict(planned.timer.stages),
+        model_fingerprint=objects_detector.settings().model_fingerprint,
+    )
+
+
+def _tiling_source(decoded: DecodedImage) -> cv2.typing.MatLike | None:
+    """The photo at up to DETECTION_TILE_SOURCE_WIDTH, or None if it is no larger than the working width."""
+    img_width = decoded.img.shape[1]
+    if img_width <= RESIZE_WIDTH:
+        return None
+    if img_width > config.DETECTION_TILE_SOURCE_WIDTH:
+        return decoded.resized(config.DETECTION_TILE_SOURCE_WIDTH).img
+    return decoded.img
+
+
+def _detect(img: cv2.typing.MatLike, tiling_img: cv2.typing.MatLike | None = None) -> HoldSet:
+    """Detections in ``img`` coordinates; with ``tiling_img`` they are found tile by tile in that larger copy."""
+    try:
+        if tiling_img is not None:
+            detected_objects = objects_detector.detect_tiled(tiling_img)
+            return rescale_detected_objects(
+                detected_objects,
+                scale_x=img.shape[1] / tiling_img.shape[1],
+                scale_y=img.shape[0] / tiling_img.shape[0],
+            )
+        return objects_detector.detect(img)
+    except FileNotFoundError as exc:
+        raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail=str(exc)) from exc
+    except Exception as exc:
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"Object detection failed: {exc}",
+        ) from exc
+
+
+def _keyword_defaults(fn) -> dict:
+    return {
+        name: parameter.default
+        for name, parameter in inspect.signature(fn).parameters.items()
+        if parameter.default is not inspect.Parameter.empty
+    }
@@ -0,0 +1,39 @@
+from __future__ import annotations
+
+import threading
+
+
+class Readiness:
+    """
+    Startup state behind ``/ready``: ``starting`` until the model is warm,
+    then ``ready`` - or ``failed`` if warmup raised.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.state = "starting"
+        self.warmup_seconds: float | None = None
+        self.detail: str | None = None
+
+    @property
+    def is_ready(self) -> bool:
+        return self.state == "ready"
+
+    def mark_ready(self, warmup_seconds: float) -> None:
+        with self._lock:
+            self.state = "ready"
+            self.warmup_seconds = warmup_seconds
+            self.detail = None
+
+    def mark_failed(self, detail: str) -> None:
+        with self._lock:
+            self.state = "failed"
+            self.detail = detail
+
+    def to_dict(self) -> dict:
+        with self._lock:
+            return {
+                "state": self.state,
+                "warmupSeconds": self.warmup_seconds,
+                "detail": self.detail,
+            }
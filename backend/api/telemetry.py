@@ -0,0 +1,93 @@
+import time
+from collections.abc import Awaitable, Callable
+
+from fastapi import Request
+from starlette.responses import Response
+
+from src.metrics import (DETECTION_BATCH_FLUSHES, DETECTION_BATCH_SIZE, DETECTION_BATCH_WAIT_SECONDS, Counter,
+                         Histogram, MetricsRegistry, StageTimer)
+
+# set on error responses by code that knows which stage failed
+FAILED_STAGE_HEADER = "X-Failed-Stage"
+
+registry = MetricsRegistry()
+
+REQUEST_SECONDS = registry.register(Histogram(
+    "http_request_duration_seconds",
+    "End-to-end request latency by route.",
+    ("method", "route", "status"),
+))
+STAGE_SECONDS = registry.register(Histogram(
+    "request_stage_duration_seconds",
+    "Latency of the individual stages of a request.",
+    ("route", "stage"),
+))
+ERRORS = registry.register(Counter(
+    "request_errors_total",
+    "Requests answered with a 4xx/5xx status, by the stage that failed.",
+    ("route", "stage", "status"),
+))
+DETECTED_HOLDS = registry.register(Histogram(
+    "boulder_detected_holds",
+    "Number of holds detected per generated route.",
+    buckets=(0, 5, 10, 20, 40, 80, 160, 320),
+))
+ROUTE_HOLDS = registry.register(Histogram(
+    "boulder_route_holds",
+    "Number of holds in each planned route.",
+    buckets=(1, 2, 3, 4, 6, 8, 10, 12, 16),
+))
+CACHE_LOOKUPS = registry.register(Counter(
+    "boulder_cache_lookups_total",
+    "Result cache lookups by outcome.",
+    ("result",),
+))
+registry.register(DETECTION_BATCH_SIZE)
+registry.register(DETECTION_BATCH_WAIT_SECONDS)
+registry.register(DETECTION_BATCH_FLUSHES)
+
+
+def get_timer(request: Request) -> StageTimer:
+    return request.state.timer
+
+
+async def instrument_requests(request: Request,
+                              call_next: Callable[[Request], Awaitable[Response]]) -> Response:
+    """
+    Time every request, expose its stages as a ``Server-Timing`` header and
+    feed the latency histograms and error counters behind ``/metrics``.
+    """
+    timer = StageTimer()
+    request.state.timer = timer
+    started = time.perf_counter()
+
+    try:
+        response = await call_next(request)
+    except Exception:
+        _record(request, timer, time.perf_counter() - started, status_code=500, failed_stage=None)
+        raise
+
+    total = time.perf_counter() - started
+    failed_stage = response.headers.get(FAILED_STAGE_HEADER)
+    _record(request, timer, total, response.status_code, failed_stage)
+
+    timer.add("total", total)
+    response.headers["Server-Timing"] = timer.server_timing()
+    return response
+
+
+def _record(request: Request, timer: StageTimer, total: float, status_code: int,
+            failed_stage: str | None) -> None:
+    route = request.scope.get("route")
+    route_path = route.path if route is not None else "unmatched"
+
+    REQUEST_SECONDS.observe(total, method=request.method, route=route_path, status=str(status_code))
+    for stage, seconds in timer.stages.items():
+        STAGE_SECONDS.observe(seconds, route=route_path, stage=stage)
+
+    if status_code >= 400:
+        ERRORS.inc(
+            route=route_path,
+            stage=failed_stage or timer.failed_stage or "handler",
+            status=str(status_code),
+        )
@@ -0,0 +1,159 @@
+from __future__ import annotations
+
+import asyncio
+import concurrent.futures
+import multiprocessing
+import threading
+from collections.abc import Callable
+from typing import Any
+
+from fastapi import HTTPException, status
+
+
+class WorkerError(Exception):
+    """
+    Picklable stand-in for an ``HTTPException`` raised inside a worker process.
+
+    ``timings`` are the seconds per stage the job spent before failing, when
+    the exception carried them (see :func:`stage_timings`).
+    """
+
+    def __init__(self, status_code: int, detail: Any, headers: dict[str, str] | None = None,
+                 timings: dict[str, float] | None = None):
+        super().__init__(status_code, detail, headers, timings)
+        self.status_code = status_code
+        self.detail = detail
+        self.headers = headers
+        self.timings = timings
+
+
+def stage_timings(exc: HTTPException) -> dict[str, float]:
+    """Seconds per stage a failed job spent, attached as ``exc.timings`` by the job, else empty."""
+    return getattr(exc, "timings", None) or {}
+
+
+def _invoke(fn: Callable[..., Any], *args: Any) -> Any:
+    try:
+        return fn(*args)
+    except HTTPException as exc:
+        raise WorkerError(exc.status_code, exc.detail, exc.headers, stage_timings(exc)) from None
+
+
+class WorkerPool:
+    """
+    Bounded pool for blocking CV work, awaited from the event loop.
+
+    At most ``max_workers + max_queue`` jobs are admitted at once; anything
+    beyond that is rejected with 503 right away instead of queueing without
+    limit. A slot is only released when its job really finishes, so a job
+    that outlives its timeout still counts against the bound.
+
+    ``initializer`` runs once in every worker thread or process before it
+    takes its first job.
+    """
+
+    def __init__(self, kind: str, max_workers: int, max_queue: int,
+                 timeout_seconds: float, initializer: Callable[[], Any] | None = None):
+        if kind not in ("thread", "process"):
+            raise ValueError(f"Unsupported worker pool kind: {kind}")
+        if max_workers < 1:
+            raise ValueError("max_workers must be >= 1")
+        if max_queue < 0:
+            raise ValueError("max_queue must be >= 0")
+
+        self.kind = kind
+        self.max_workers = max_workers
+        self.max_queue = max_queue
+        self.timeout_seconds = timeout_seconds
+        self.initializer = initializer
+
+        self._executor: concurrent.futures.Executor | None = None
+        self._executor_lock = threading.Lock()
+        self._in_flight = 0
+        self._in_flight_lock = threading.Lock()
+
+    @property
+    def capacity(self) -> int:
+        return self.max_workers + self.max_queue
+
+    @property
+    def in_flight(self) -> int:
+        return self._in_flight
+
+    async def run(self, fn: Callable[..., Any], *args: Any) -> Any:
+        with self._in_flight_lock:
+            if self._in_flight >= self.capacity:
+                raise HTTPException(
+                    status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+                    detail="Server is busy, try again later",
+                )
+            self._in_flight += 1
+
+        try:
+            future = self._get_executor().submit(_invoke, fn, *args)
+        except BaseException:
+            self._release()
+            raise
+        future.add_done_callback(lambda _: self._release())
+
+        try:
+            return await asyncio.wait_for(asyncio.wrap_future(future), self.timeout_seconds)
+        except asyncio.TimeoutError as exc:
+            future.cancel()
+            raise HTTPException(
+                status_code=status.HTTP_504_GATEWAY_TIMEOUT,
+                detail="Route generation timed out",
+            ) from exc
+        except WorkerError as exc:
+            http_exc = HTTPException(status_code=exc.status_code, detail=exc.detail, headers=exc.headers)
+            http_exc.timings = exc.timings
+            raise http_exc from exc
+
+    async def start(self, probe_fn: Callable[[], Any]) -> list[Any]:
+        """
+        Start all workers up front and return ``probe_fn()`` from each job.
+
+        One job is submitted per worker. Executors only spawn a worker when
+        none is idle, so every worker is started (and has run the
+        initializer) provided the jobs outlast their own submission - which
+        any real warmup does. Not bounded by the queue limit or the timeout.
+        """
+        executor = self._get_executor()
+        futures = [asyncio.wrap_future(executor.submit(probe_fn)) for _ in range(self.max_workers)]
+        return list(await asyncio.gather(*futures))
+
+    def shutdown(self) -> None:
+        with self._executor_lock:
+            if self._executor is not None:
+                self._executor.shutdown(wait=False, cancel_futures=True)
+                self._executor = None
+
+    def stats(self) -> dict:
+        return {
+            "kind": self.kind,
+            "maxWorkers": self.max_workers,
+            "maxQueue": self.max_queue,
+            "inFlight": self._in_flight,
+        }
+
+    def _get_executor(self) -> concurrent.futures.Executor:
+        with self._executor_lock:
+            if self._executor is None:
+                if self.kind == "thread":
+                    self._executor = concurrent.futures.ThreadPoolExecutor(
+                        max_workers=self.max_workers,
+                        thread_name_prefix="boulder-worker",
+                        initializer=self.initializer,
+                    )
+                else:
+                    # torch does not survive fork() after it has been initialised
+                    self._executor = concurrent.futures.ProcessPoolExecutor(
+                        max_workers=self.max_workers,
+                        mp_context=multiprocessing.get_context("spawn"),
+                        initializer=self.initializer,
+                    )
+            return self._executor
+
+    def _release(self) -> None:
+        with self._in_flight_lock:
+            self._in_flight -= 1
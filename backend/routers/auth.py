@@ -0,0 +1,70 @@
+import os
+
+from fastapi import APIRouter, HTTPException, Request, status
+from pydantic import BaseModel
+
+from api import telemetry, user_store
+
+router = APIRouter()
+
+
+class GoogleAuthBody(BaseModel):
+    idToken: str
+
+
+@router.post("/api/auth/google")
+def authenticate_google(request: Request, body: GoogleAuthBody) -> dict:
+    timer = telemetry.get_timer(request)
+    client_id = os.getenv("GOOGLE_OAUTH_IOS_CLIENT_ID")
+    if not client_id:
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail="Missing GOOGLE_OAUTH_IOS_CLIENT_ID",
+        )
+
+    try:
+        with timer.stage("verify_token"):
+            payload = _verify_google_id_token(body.idToken, client_id)
+    except ValueError as exc:
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Invalid Google ID token",
+        ) from exc
+
+    email = payload.get("email", "")
+    google_sub = payload.get("sub", "")
+    if not email or not google_sub:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Invalid token payload",
+        )
+
+    with timer.stage("store_write"):
+        result = user_store.upsert_google_user(
+            google_sub=google_sub,
+            email=email,
+            given_name=payload.get("given_name"),
+            family_name=payload.get("family_name"),
+            picture_url=payload.get("picture"),
+        )
+
+    user = result["user"]
+    return {
+        "user": {
+            "id": user["id"],
+            "email": user["email"],
+            "firstName": user.get("firstName") or "",
+            "lastName": user.get("lastName") or "",
+            "photoURL": user.get("photoURL"),
+        },
+        "token": result["token"],
+        "isNewUser": result["isNewUser"],
+    }
+
+
+def _verify_google_id_token(token: str, client_id: str) -> dict:
+    # google-auth pulls in requests/urllib3/cryptography; only load it when used
+    from google.auth.transport import requests
+    from google.oauth2 import id_token
+
+    return id_token.verify_oauth2_token(token, requests.Request(), audience=client_id)
@@ -0,0 +1,279 @@
+import asyncio
+import io
+import secrets
+import time
+from collections.abc import Callable
+from contextlib import asynccontextmanager
+from typing import Any
+
+from fastapi import APIRouter, FastAPI, Header, HTTPException, Query, Request, UploadFile, status
+from starlette.responses import JSONResponse, Response, StreamingResponse
+
+from api import boulder_pipeline, telemetry
+from api.readiness import Readiness
+from api.worker_pool import WorkerPool, stage_timings
+from src import config, objects_detector
+from src.image_decode import read_image_size
+from src.metrics import Gauge
+from src.result_cache import CacheEntry, ResultCache
+from src.route_encoding import EncodingStats, OutputFormat, negotiate_output_format
+
+router = APIRouter()
+
+worker_pool = WorkerPool(
+    kind=config.WORKER_POOL_KIND,
+    max_workers=config.WORKER_POOL_SIZE,
+    max_queue=config.WORKER_POOL_MAX_QUEUE,
+    timeout_seconds=config.WORKER_POOL_TIMEOUT_SECONDS,
+    initializer=objects_detector.warm_up if config.MODEL_PRELOAD else None,
+)
+
+readiness = Readiness()
+
+result_cache = ResultCache(
+    max_memory_bytes=config.RESULT_CACHE_MAX_MEMORY_BYTES,
+    disk_dir=config.RESULT_CACHE_DIR,
+)
+
+encoding_stats = EncodingStats()
+
+
+@asynccontextmanager
+async def lifespan(_: FastAPI):
+    warmup_task = None
+    if config.MODEL_PRELOAD:
+        # in the background, so /health and /ready answer while the model loads
+        warmup_task = asyncio.create_task(_warm_up_workers())
+    else:
+        readiness.mark_ready(warmup_seconds=0.0)
+    yield
+    if warmup_task is not None:
+        warmup_task.cancel()
+    worker_pool.shutdown()
+
+
+async def _warm_up_workers() -> None:
+    started = time.perf_counter()
+    try:
+        statuses = await worker_pool.start(objects_detector.warm_up)
+    except Exception as exc:
+        readiness.mark_failed(f"Worker startup failed: {exc}")
+        return
+
+    failed = [worker_status for worker_status in statuses if not worker_status["warm"]]
+    if failed:
+        readiness.mark_failed(f"Model warmup failed: {failed[0]['error']}")
+    else:
+        readiness.mark_ready(warmup_seconds=time.perf_counter() - started)
+
+
+telemetry.registry.register(Gauge(
+    "boulder_worker_pool_in_flight",
+    "Route generation jobs running or queued on the worker pool.",
+    lambda: worker_pool.in_flight,
+))
+
+
+@router.get("/ready")
+async def ready() -> JSONResponse:
+    """Readiness probe: 503 until the model is loaded and warmed up in every worker."""
+    status_code = status.HTTP_200_OK if readiness.is_ready else status.HTTP_503_SERVICE_UNAVAILABLE
+    return JSONResponse(status_code=status_code, content=readiness.to_dict())
+
+
+@router.get("/boulder/stats")
+async def boulder_stats() -> dict:
+    batcher = objects_detector.get_batcher()
+    detector = objects_detector.settings()
+    return {
+        "detector": {**detector.cache_params(), "modelPath": str(detector.model_path), "source": detector.source},
+        "workerPool": worker_pool.stats(),
+        "detectionBatcher": batcher.stats() if batcher is not None else None,
+        "resultCache": result_cache.stats(),
+        "nearDuplicateIndex": boulder_pipeline.near_duplicate_index.stats(),
+        "encoding": encoding_stats.stats(),
+    }
+
+
+@router.delete("/boulder/cache")
+async def invalidate_boulder_cache(authorization: str | None = Header(None)) -> dict:
+    """Drop cached results and reusable detections. Needs ``Authorization: Bearer <ADMIN_TOKEN>``."""
+    require_admin(authorization)
+    await asyncio.get_running_loop().run_in_executor(None, result_cache.invalidate)
+    boulder_pipeline.near_duplicate_index.clear()
+    return {"message": "ok"}
+
+
+def require_admin(authorization: str | None) -> None:
+    if not config.ADMIN_TOKEN:
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Ops endpoints are disabled, set ADMIN_TOKEN",
+        )
+
+    scheme, _, token = (authorization or "").partition(" ")
+    if scheme.lower() != "bearer" or not secrets.compare_digest(token.encode(), config.ADMIN_TOKEN.encode()):
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Invalid admin token",
+            headers={"WWW-Authenticate": "Bearer"},
+        )
+
+
+@router.post("/boulder/generate")
+async def generate_boulder(
+    request: Request,
+    file: UploadFile,
+    format: str | None = Query(None, description="png, jpeg, webp or overlay (transparent PNG)"),
+    quality: int | None = Query(None, ge=1, le=100, description="JPEG/WebP quality"),
+    accept: str | None = Header(None),
+) -> StreamingResponse:
+    """
+    Generate a boulder route from an image.
+
+    - Detect holds with YOLO
+    - Plan a simple bottom-to-top route
+    - Return the annotated image, PNG by default
+
+    The output format comes from the ``format`` query parameter, else from the
+    ``Accept`` header. ``overlay`` returns only the boxes and route lines on a
+    transparent background, which is far smaller than the full photo.
+
+    The CV pipeline runs on the worker pool so the event loop stays free.
+    Repeated uploads of the same photo are answered from the result cache,
+    without waiting for a worker.
+    """
+    try:
+        output_format = negotiate_output_format(format, quality, accept)
+    except ValueError as exc:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(exc)) from exc
+
+    entry, headers = await _run_pipeline(
+        request, "boulder/generate", file, boulder_pipeline.generate_route, output_format,
+        output=output_format.cache_key(), output_format=output_format,
+    )
+    headers["Vary"] = "Accept"
+    return StreamingResponse(io.BytesIO(entry.body), media_type=entry.media_type, headers=headers)
+
+
+@router.post("/boulder/route")
+async def generate_boulder_route(
+    request: Request,
+    file: UploadFile,
+    routes: int = Query(1, ge=1, le=config.MAXIMUM_ROUTES_PER_REQUEST,
+                        description="Number of diverse routes to plan on the photo"),
+    deadline_ms: int | None = Query(None, ge=1, le=config.MAXIMUM_ROUTE_DEADLINE_MS,
+                                    description="Plan a body-aware route, the best found within this time"),
+) -> Response:
+    """
+    Same as /boulder/generate, but returns the route geometry as compact JSON.
+
+    No overlay is drawn and no image is encoded: the response carries the
+    detected holds, the route as ordered hold indices and the image scale, so
+    the client can draw the overlay on the photo it already has.
+
+    With ``routes`` above 1 the response also lists up to that many routes
+    that share few holds, all planned on one detection of the photo.
+
+    With ``deadline_ms`` the route is planned for a climber's body instead,
+    scaled by the ArUco marker in the photo. The search keeps improving its
+    best route until the deadline and returns it with its positions, and
+    whether the search was exhaustive, so the time spent planning is bounded.
+    """
+    if deadline_ms is not None and routes > 1:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST,
+                            detail="deadline_ms plans a single route, it cannot be combined with routes")
+
+    entry, headers = await _run_pipeline(
+        request, "boulder/route", file, boulder_pipeline.generate_route_geometry, routes, deadline_ms,
+        output="json", route_count=routes, deadline_ms=deadline_ms,
+    )
+    return Response(content=entry.body, media_type=entry.media_type, headers=headers)
+
+
+async def _run_pipeline(request: Request, name: str, file: UploadFile, pipeline_fn: Callable[..., Any],
+                        *pipeline_args: Any, output: str, output_format: OutputFormat | None = None,
+                        route_count: int = 1, deadline_ms: int | None = None) -> tuple[CacheEntry, dict[str, str]]:
+    timer = telemetry.get_timer(request)
+    started = time.perf_counter()
+
+    with timer.stage("read"):
+        contents = await file.read()
+
+    with timer.stage("validate"):
+        validate_file(file, contents)
+    print(
+        f"[{name}] received filename={file.filename} "
+        f"content_type={file.content_type} bytes={len(contents)}"
+    )
+
+    loop = asyncio.get_running_loop()
+    params = boulder_pipeline.cache_params(output, route_count, deadline_ms)
+    with timer.stage("cache"):
+        cache_key, entry = await loop.run_in_executor(None, result_cache.lookup, contents, params)
+    cache_hit = entry is not None
+    telemetry.CACHE_LOOKUPS.inc(result="hit" if cache_hit else "miss")
+
+    if not cache_hit:
+        submitted = time.perf_counter()
+        try:
+            result = await worker_pool.run(pipeline_fn, contents, *pipeline_args)
+        except HTTPException as exc:
+            # overridden by the failed-stage header for errors inside the pipeline
+            timer.failed_stage = "worker_pool"
+            timings = stage_timings(exc)
+            if timings:
+                timer.add("queue", max(0.0, time.perf_counter() - submitted - sum(timings.values())))
+                timer.merge(timings)
+            raise
+        # time spent waiting for a free worker (and on inter-process transfer)
+        timer.add("queue", max(0.0, time.perf_counter() - submitted - sum(result.timings.values())))
+        timer.merge(result.timings)
+
+        telemetry.DETECTED_HOLDS.observe(len(result.detected_objects))
+        telemetry.ROUTE_HOLDS.observe(result.route_length)
+        if output_format is not None:
+            encoding_stats.record(output_format, result.encode_seconds, len(result.body))
+
+        entry = result.to_cache_entry()
+        if result.model_fingerprint != params["detect"]["model"]:
+            # the worker loaded other weights than the key was made for
+            print(f"[{name}] not caching, the model changed to {result.model_fingerprint}")
+        else:
+            with timer.stage("cache_store"):
+                await loop.run_in_executor(None, result_cache.put, cache_key, entry)
+
+    print(
+        f"[{name}] done in {time.perf_counter() - started:.2f}s "
+        f"cache={'hit' if cache_hit else 'miss'}"
+    )
+    headers = {}
+    if entry.near_duplicate_distance is not None:
+        headers["X-Near-Duplicate-Distance"] = str(entry.near_duplicate_distance)
+    return entry, headers
+
+
+def validate_file(file: UploadFile, contents: bytes) -> None:
+    if file.content_type not in config.ACCEPTED_MIME_TYPES:
+        raise HTTPException(
+            status_code=status.HTTP_415_UNSUPPORTED_MEDIA_TYPE,
+            detail="Unsupported file type",
+        )
+
+    if not contents:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Empty file")
+
+    if len(contents) > config.MAXIMUM_FILE_SIZE:
+        raise HTTPException(status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE, detail="Too large")
+
+    # reject decompression bombs from the header alone, before any decoding
+    size = read_image_size(contents)
+    if size is not None:
+        width, height = size
+        if width == 0 or height == 0:
+            raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Invalid image file")
+        if max(width, height) > config.MAXIMUM_IMAGE_DIMENSION or width * height > config.MAXIMUM_IMAGE_PIXELS:
+            raise HTTPException(
+                status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
+                detail="Image dimensions too large",
+            )
@@ -0,0 +1,50 @@
+from fastapi import APIRouter, Request
+from pydantic import BaseModel
+
+from api import session_store, telemetry
+
+router = APIRouter()
+
+
+class ClimbEventBody(BaseModel):
+    status: str
+    attempts: int
+    durationSeconds: int
+
+
+@router.post("/api/users/{user_id}/sessions/today/start")
+def start_today_session(request: Request, user_id: str) -> dict:
+    timer = telemetry.get_timer(request)
+    with timer.stage("store_write"):
+        session_store.start_today_session(user_id)
+    with timer.stage("store_read"):
+        return session_store.get_today_session_stats(user_id)
+
+
+@router.post("/api/users/{user_id}/sessions/today/end")
+def end_today_session(request: Request, user_id: str) -> dict:
+    timer = telemetry.get_timer(request)
+    with timer.stage("store_write"):
+        session_store.end_today_session(user_id)
+    with timer.stage("store_read"):
+        return session_store.get_today_session_stats(user_id)
+
+
+@router.get("/api/users/{user_id}/sessions/today")
+def get_today_session(request: Request, user_id: str) -> dict:
+    with telemetry.get_timer(request).stage("store_read"):
+        return session_store.get_today_session_stats(user_id)
+
+
+@router.post("/api/users/{user_id}/sessions/today/climbs")
+def add_today_climb(request: Request, user_id: str, body: ClimbEventBody) -> dict:
+    timer = telemetry.get_timer(request)
+    with timer.stage("store_write"):
+        session_store.add_climb_event(
+            user_id=user_id,
+            status=body.status,
+            attempts=body.attempts,
+            duration_seconds=body.durationSeconds,
+        )
+    with timer.stage("store_read"):
+        return session_store.get_today_session_stats(user_id)
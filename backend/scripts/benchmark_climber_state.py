@@ -0,0 +1,147 @@
+#!/usr/bin/env python3
+"""
+Benchmark the cost of copying climber positions while generating routes.
+
+RouteGenerator copies the climber once per move. It used to do that with
+copy.deepcopy over nine BodyPart objects and their Points, Colors and
+DetectedObjects; it now copies a ClimberState (two small arrays). For
+routes generated on synthetic walls, this replays every move's copy both
+ways and reports per route:
+
+- blocks/KiB: memory blocks and bytes still allocated after the copies (tracemalloc)
+- time:       time spent copying
+
+The deepcopy side uses the previous classes, kept below as ``Legacy*``.
+
+Usage:
+    python scripts/benchmark_climber_state.py
+    python scripts/benchmark_climber_state.py --routes 50 --holds 600
+"""
+
+import argparse
+import copy
+import os
+import sys
+import time
+import tracemalloc
+from dataclasses import dataclass
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.model.body_proportion import BodyProportion  # noqa: E402
+from src.model.climber import PARTS, Climber  # noqa: E402
+from src.model.detected_object import DetectedObject  # noqa: E402
+from src.model.hold_set import HoldSet  # noqa: E402
+from src.route_generator import RouteGenerator  # noqa: E402
+
+WALL_WIDTH = 1216
+WALL_HEIGHT = 1600
+
+
+@dataclass
+class LegacyPoint:
+    x: int
+    y: int
+
+
+class LegacyBodyPart:
+    def __init__(self, start, end, color, thickness=10, detected_object=None):
+        self.start = start
+        self.end = end
+        self.color = color
+        self.thickness = thickness
+        self.detected_object = detected_object
+
+
+class LegacyClimber:
+    def __init__(self, height: int):
+        self.body_proportion = BodyProportion(height)
+
+
+class Marker:
+    """A fixed 4 px/cm scale instead of a photographed ArUco marker."""
+
+    def convert_cm_to_px(self, cm: float) -> int:
+        return int(cm * 4)
+
+    def convert_px_to_cm(self, px: int) -> float:
+        return px / 4
+
+
+def synthetic_wall(hold_count: int, seed: int) -> HoldSet:
+    rng = np.random.default_rng(seed)
+    centers = rng.integers(0, [WALL_WIDTH, WALL_HEIGHT], size=(hold_count, 2))
+    return HoldSet(bboxes=np.hstack([centers - 10, centers + 10]), class_ids=np.zeros(hold_count),
+                   class_names=("hold",), centers=centers)
+
+
+def legacy_climber(climber: Climber) -> LegacyClimber:
+    """``climber`` in the previous classes, its holds as standalone DetectedObjects."""
+    legacy = LegacyClimber(climber.body_proportion.height)
+    for name in PARTS:
+        part = getattr(climber, name)
+        hold = part.detected_object
+        if hold is not None:
+            hold = DetectedObject(class_name=hold.class_name, bbox=hold.bbox.copy(),
+                                  center=LegacyPoint(hold.center.x, hold.center.y))
+        setattr(legacy, name, LegacyBodyPart(LegacyPoint(part.start.x, part.start.y),
+                                             LegacyPoint(part.end.x, part.end.y),
+                                             part.color, part.thickness, hold))
+    return legacy
+
+
+def measure(copy_fn, positions: list) -> tuple[int, int, float]:
+    """Blocks and bytes kept alive by copying every position but the last, and the copy time."""
+    started = time.perf_counter()
+    copies = [copy_fn(position) for position in positions[:-1]]
+    seconds = time.perf_counter() - started
+    del copies
+
+    # traced separately, tracing slows every allocation down
+    tracemalloc.start()
+    before = tracemalloc.take_snapshot()
+    copies = [copy_fn(position) for position in positions[:-1]]
+    after = tracemalloc.take_snapshot()
+    tracemalloc.stop()
+    stats = after.compare_to(before, "filename")
+    del copies
+    return sum(stat.count_diff for stat in stats), sum(stat.size_diff for stat in stats), seconds
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark climber copies per generated route")
+    parser.add_argument("--routes", type=int, default=20, help="Routes to generate (default: 20)")
+    parser.add_argument("--holds", type=int, default=400, help="Holds per synthetic wall (default: 400)")
+    parser.add_argument("--height", type=int, default=175, help="Climber height in cm (default: 175)")
+    args = parser.parse_args()
+
+    totals = {"deepcopy": [0, 0, 0.0], "state": [0, 0, 0.0]}
+    routes = moves = 0
+    for seed in range(args.routes):
+        generator = RouteGenerator(WALL_WIDTH, WALL_HEIGHT, Marker(), synthetic_wall(args.holds, seed))
+        np.random.seed(seed)
+        try:
+            positions = generator.generate_route(args.height, 40)
+        except ValueError:
+            continue
+        routes += 1
+        moves += len(positions) - 1
+
+        legacy_positions = [legacy_climber(position) for position in positions]
+        for name, copy_fn, replayed in [("deepcopy", copy.deepcopy, legacy_positions),
+                                        ("state", Climber.copy, positions)]:
+            for slot, value in enumerate(measure(copy_fn, replayed)):
+                totals[name][slot] += value
+
+    if not routes:
+        raise SystemExit("no route could be generated, try more --holds")
+    print(f"{routes} routes, {moves / routes:.1f} moves per route")
+    print(f"{'copy':>9s} {'blocks':>8s} {'KiB':>8s} {'time':>9s}")
+    for name, (blocks, size, seconds) in totals.items():
+        print(f"{name:>9s} {blocks / routes:8.0f} {size / 1024 / routes:8.1f} {1000 * seconds / routes:7.2f}ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,116 @@
+#!/usr/bin/env python3
+"""
+Benchmark the upload decode path of /boulder/generate.
+
+Compares the original full-resolution decode + resize against the
+reduced-scale decode in src.image_decode, reporting mean/p95 latency and the
+size of the decoded pixel buffer (the dominant per-request allocation).
+
+Without --images, synthetic phone-sized JPEGs (12 MP and 48 MP) are used.
+
+Usage:
+    python scripts/benchmark_decode.py
+    python scripts/benchmark_decode.py --images path/to/wall/photos --repeat 20
+"""
+
+import argparse
+import os
+import sys
+import time
+
+import cv2
+import imutils
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.image_decode import _choose_decode_flag, decode_image, read_image_size  # noqa: E402
+
+TARGET_WIDTH = 1216
+
+
+def full_decode(contents: bytes) -> np.ndarray:
+    img = cv2.imdecode(np.frombuffer(contents, np.uint8), cv2.IMREAD_COLOR)
+    return imutils.resize(img, width=TARGET_WIDTH)
+
+
+def synthetic_photo(width: int, height: int, seed: int = 0) -> bytes:
+    rng = np.random.default_rng(seed)
+    img = np.full((height, width, 3), 180, dtype=np.uint8)
+    noise = rng.integers(0, 40, size=(height // 8, width // 8, 3), dtype=np.uint8)
+    img += cv2.resize(noise, (width, height), interpolation=cv2.INTER_LINEAR)
+    for _ in range(300):
+        center = (int(rng.integers(0, width)), int(rng.integers(0, height)))
+        color = tuple(int(c) for c in rng.integers(0, 255, size=3))
+        cv2.circle(img, center, int(rng.integers(width // 200, width // 40)), color, -1)
+    _, jpeg = cv2.imencode(".jpg", img, [cv2.IMWRITE_JPEG_QUALITY, 90])
+    return jpeg.tobytes()
+
+
+def load_samples(images_dir: str | None) -> dict[str, bytes]:
+    if images_dir is None:
+        return {
+            "synthetic 4032x3024": synthetic_photo(4032, 3024),
+            "synthetic 8064x6048": synthetic_photo(8064, 6048),
+        }
+
+    samples = {}
+    for name in sorted(os.listdir(images_dir)):
+        if name.lower().endswith((".jpg", ".jpeg", ".png")):
+            with open(os.path.join(images_dir, name), "rb") as image_file:
+                samples[name] = image_file.read()
+    return samples
+
+
+def time_decode(decode, contents: bytes, repeat: int) -> tuple[list[float], np.ndarray]:
+    timings = []
+    img = None
+    for _ in range(repeat):
+        started = time.perf_counter()
+        img = decode(contents)
+        timings.append(time.perf_counter() - started)
+    return timings, img
+
+
+def decoded_buffer_bytes(contents: bytes, flag: int) -> int:
+    return cv2.imdecode(np.frombuffer(contents, np.uint8), flag).nbytes
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark full vs reduced-scale upload decoding")
+    parser.add_argument("--images", "-i", type=str, default=None,
+                        help="Folder with sample wall photos (default: synthetic JPEGs)")
+    parser.add_argument("--repeat", "-r", type=int, default=10,
+                        help="Decodes per image and path (default: 10)")
+    args = parser.parse_args()
+
+    samples = load_samples(args.images)
+    if not samples:
+        print(f"Error: no .jpg/.png images found in {args.images}")
+        sys.exit(1)
+
+    for name, contents in samples.items():
+        size = read_image_size(contents)
+        full_timings, full_img = time_decode(full_decode, contents, args.repeat)
+        reduced_timings, reduced_img = time_decode(
+            lambda data: decode_image(data, TARGET_WIDTH).img, contents, args.repeat
+        )
+        reduced_flag = _choose_decode_flag(size, TARGET_WIDTH)
+
+        print(f"{name}: {len(contents) / 1024:.0f} KiB, header size {size}")
+        for label, timings, flag, img in (
+            ("full", full_timings, cv2.IMREAD_COLOR, full_img),
+            ("reduced", reduced_timings, reduced_flag, reduced_img),
+        ):
+            print(
+                f"  {label:8s} mean {1000 * np.mean(timings):7.1f} ms  "
+                f"p95 {1000 * np.percentile(timings, 95):7.1f} ms  "
+                f"decoded buffer {decoded_buffer_bytes(contents, flag) / 2 ** 20:6.1f} MiB  "
+                f"output {img.shape[1]}x{img.shape[0]}"
+            )
+        speedup = np.mean(full_timings) / np.mean(reduced_timings)
+        print(f"  speedup  {speedup:.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,183 @@
+#!/usr/bin/env python3
+"""
+Benchmark detector backends and precisions against the FP32 baseline.
+
+Every configuration runs in its own spawned process, so memory figures are
+not polluted by the runtimes loaded before it. Reported per configuration:
+
+- latency percentiles of single-image detect() calls and throughput,
+  plus batched throughput with --batch-size > 1
+- peak RSS and the RSS added by loading the model
+- agreement with the baseline detections: mean IoU of matched boxes,
+  hold recall and precision (see src.detection_metrics)
+
+Configurations are backend:precision pairs; by default every one whose
+runtime is installed and whose model file exists next to --model.
+
+Usage:
+    python scripts/benchmark_detection.py --model train4/weights/best.pt --images path/to/wall/photos
+    python scripts/benchmark_detection.py -m train4/weights/best.pt -i photos \
+        --configs pytorch:fp32 onnxruntime:int8 --json results.json
+"""
+
+import argparse
+import concurrent.futures
+import importlib.util
+import json
+import multiprocessing
+import os
+import resource
+import sys
+import time
+from pathlib import Path
+
+import cv2
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.detection_backends import BACKENDS, PRECISIONS, create_backend, default_model_path  # noqa: E402
+from src.detection_metrics import detection_agreement, latency_summary  # noqa: E402
+
+_RUNTIME_MODULES = {"pytorch": "ultralytics", "onnxruntime": "onnxruntime", "openvino": "openvino"}
+
+
+def peak_rss_mib() -> float:
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # kilobytes on Linux, bytes on macOS
+    return peak / 2 ** 20 if sys.platform == "darwin" else peak / 1024
+
+
+def run_config(backend: str, model_path: str, image_paths: list[str], img_size: int,
+               conf: float, warmup: int, repeat: int, batch_size: int) -> dict:
+    """Runs in a fresh process: load one configuration, time it, return its detections."""
+    images = [cv2.imread(path) for path in image_paths]
+    rss_before = peak_rss_mib()
+
+    started = time.perf_counter()
+    detector = create_backend(backend, Path(model_path))
+    load_seconds = time.perf_counter() - started
+    rss_loaded = peak_rss_mib()
+
+    for _ in range(warmup):
+        detector.detect(images[:1], conf=conf, iou=0.7, imgsz=img_size)
+
+    detections = [detector.detect([img], conf=conf, iou=0.7, imgsz=img_size)[0] for img in images]
+
+    single_timings = []
+    for _ in range(repeat):
+        for img in images:
+            started = time.perf_counter()
+            detector.detect([img], conf=conf, iou=0.7, imgsz=img_size)
+            single_timings.append(time.perf_counter() - started)
+
+    result = {
+        "loadSeconds": load_seconds,
+        "modelRssMib": rss_loaded - rss_before,
+        "peakRssMib": peak_rss_mib(),
+        "latency": latency_summary(single_timings),
+        "detections": detections,
+    }
+
+    if batch_size > 1:
+        batch_timings = []
+        for _ in range(repeat):
+            for start in range(0, len(images) - batch_size + 1, batch_size):
+                started = time.perf_counter()
+                detector.detect(images[start:start + batch_size], conf=conf, iou=0.7, imgsz=img_size)
+                batch_timings.append(time.perf_counter() - started)
+        if batch_timings:
+            result["batchLatency"] = latency_summary(batch_timings, images_per_call=batch_size)
+        result["peakRssMib"] = peak_rss_mib()
+
+    return result
+
+
+def available_configs(weights_path: Path) -> list[str]:
+    configs = []
+    for backend in BACKENDS:
+        if importlib.util.find_spec(_RUNTIME_MODULES[backend]) is None:
+            continue
+        for precision in PRECISIONS:
+            if backend == "pytorch" and precision != "fp32":
+                continue
+            if default_model_path(backend, weights_path, precision).exists():
+                configs.append(f"{backend}:{precision}")
+    return configs
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark detection backends and precisions")
+    parser.add_argument("--model", "-m", type=str, required=True,
+                        help="Path to the trained YOLO model (.pt file); exports are looked up next to it")
+    parser.add_argument("--images", "-i", type=str, required=True,
+                        help="Folder with sample wall photos")
+    parser.add_argument("--configs", nargs="*", default=None,
+                        help="backend:precision pairs (default: all available)")
+    parser.add_argument("--baseline", type=str, default="pytorch:fp32",
+                        help="Configuration the others are compared against (default: pytorch:fp32)")
+    parser.add_argument("--size", "-s", type=int, default=1216, help="Input image size (default: 1216)")
+    parser.add_argument("--conf", type=float, default=0.85, help="Confidence threshold (default: 0.85)")
+    parser.add_argument("--iou-threshold", type=float, default=0.5,
+                        help="IoU for a box to count as reproduced (default: 0.5)")
+    parser.add_argument("--warmup", type=int, default=2, help="Untimed warmup calls (default: 2)")
+    parser.add_argument("--repeat", "-r", type=int, default=3, help="Timed passes over the images (default: 3)")
+    parser.add_argument("--batch-size", type=int, default=1, help="Also time batched calls (default: 1, off)")
+    parser.add_argument("--json", type=str, default=None, help="Write the full results to this file")
+    args = parser.parse_args()
+
+    weights_path = Path(args.model)
+    image_paths = [
+        os.path.join(args.images, name) for name in sorted(os.listdir(args.images))
+        if name.lower().endswith((".jpg", ".jpeg", ".png"))
+    ]
+    if not image_paths:
+        print(f"Error: no .jpg/.png images found in {args.images}")
+        sys.exit(1)
+
+    configs = args.configs or available_configs(weights_path)
+    if args.baseline not in configs:
+        configs.insert(0, args.baseline)
+
+    results = {}
+    for config_name in configs:
+        backend, precision = config_name.split(":")
+        model_path = default_model_path(backend, weights_path, precision)
+        if not model_path.exists():
+            print(f"{config_name}: skipped, {model_path} not found")
+            continue
+        print(f"{config_name}: {model_path} on {len(image_paths)} images...")
+        with concurrent.futures.ProcessPoolExecutor(max_workers=1,
+                                                    mp_context=multiprocessing.get_context("spawn")) as pool:
+            results[config_name] = pool.submit(
+                run_config, backend, str(model_path), image_paths, args.size,
+                args.conf, args.warmup, args.repeat, args.batch_size,
+            ).result()
+
+    if args.baseline not in results:
+        print(f"Error: baseline {args.baseline} could not be run")
+        sys.exit(1)
+
+    baseline = results[args.baseline]["detections"]
+    print(f"\n{'config':20s} {'p50':>8s} {'p90':>8s} {'p99':>8s} {'img/s':>7s} {'batch/s':>8s} "
+          f"{'model':>8s} {'peak':>8s} {'IoU':>6s} {'recall':>7s} {'prec':>6s}")
+    for config_name, result in results.items():
+        result["agreement"] = detection_agreement(baseline, result["detections"], args.iou_threshold)
+        latency, agreement = result["latency"], result["agreement"]
+        batch = result.get("batchLatency", {}).get("imagesPerSecond")
+        print(
+            f"{config_name:20s} {latency['p50Ms']:6.1f}ms {latency['p90Ms']:6.1f}ms {latency['p99Ms']:6.1f}ms "
+            f"{latency['imagesPerSecond']:7.2f} {batch if batch is not None else float('nan'):8.2f} "
+            f"{result['modelRssMib']:5.0f}MiB {result['peakRssMib']:5.0f}MiB "
+            f"{agreement['meanIou']:6.3f} {agreement['recall']:7.3f} {agreement['precision']:6.3f}"
+        )
+
+    if args.json:
+        for result in results.values():
+            result["detections"] = [[obj.to_dict() for obj in objs] for objs in result["detections"]]
+        with open(args.json, "w") as json_file:
+            json.dump(results, json_file, indent=2)
+        print(f"\nResults written to {args.json}")
+
+
+if __name__ == "__main__":
+    main()
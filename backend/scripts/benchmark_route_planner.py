@@ -0,0 +1,126 @@
+#!/usr/bin/env python3
+"""
+Benchmark plan_bottom_to_top_route on synthetic walls.
+
+Compares the vectorized planner in src.route_planner against the previous
+per-candidate Python implementation (kept below as ``python_planner``),
+checks that both pick the same route and reports the speedup. Walls are
+uniformly scattered holds; --max-holds sets the route length, which
+multiplies the per-step candidate scan.
+
+Usage:
+    python scripts/benchmark_route_planner.py
+    python scripts/benchmark_route_planner.py --holds 1000 5000 20000 --max-holds 30
+"""
+
+import argparse
+import os
+import sys
+import time
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.model.detected_object import DetectedObject  # noqa: E402
+from src.model.hold_set import HoldSet  # noqa: E402
+from src.route_planner import plan_bottom_to_top_route  # noqa: E402
+
+WALL_WIDTH = 1216
+WALL_HEIGHT = 1600
+
+
+def python_planner(detected_objects, *, img_width: int, img_height: int, max_holds: int = 12,
+                   top_margin_ratio: float = 0.12, side_margin_ratio: float = 0.10,
+                   bottom_region_ratio: float = 0.20, min_vertical_gain_ratio: float = 0.04) -> list:
+    holds = [obj for obj in detected_objects if obj.class_name == "hold"] or list(detected_objects)
+
+    side_min_x = int(round(img_width * side_margin_ratio))
+    side_max_x = int(round(img_width * (1.0 - side_margin_ratio)))
+    central_holds = [h for h in holds if side_min_x <= h.center.x <= side_max_x]
+    if len(central_holds) >= 3:
+        holds = central_holds
+
+    top_y = int(round(img_height * top_margin_ratio))
+    bottom_y = int(round(img_height * (1.0 - bottom_region_ratio)))
+    min_gain_px = max(1, int(round(img_height * min_vertical_gain_ratio)))
+
+    start_candidates = [h for h in holds if h.center.y >= bottom_y] or holds
+    route = [max(start_candidates, key=lambda h: h.center.y)]
+    used = {_obj_key(route[0])}
+
+    while route[-1].center.y > top_y and len(route) < max_holds:
+        current = route[-1]
+        desired_gain = (current.center.y - top_y) / max(1, max_holds - len(route))
+        candidates = [h for h in holds
+                      if _obj_key(h) not in used and (current.center.y - h.center.y) >= min_gain_px]
+        if not candidates:
+            break
+
+        def score(candidate) -> float:
+            gain = current.center.y - candidate.center.y
+            dx = abs(candidate.center.x - current.center.x)
+            return (abs(gain - desired_gain) / img_height) + (0.75 * dx / img_width)
+
+        best = min(candidates, key=score)
+        route.append(best)
+        used.add(_obj_key(best))
+
+    if route[-1].center.y > top_y and len(route) < max_holds:
+        remaining = [h for h in holds if _obj_key(h) not in used]
+        if remaining:
+            finish = min(remaining, key=lambda h: h.center.y)
+            if finish.center.y < route[-1].center.y:
+                route.append(finish)
+    return route
+
+
+def _obj_key(obj) -> tuple[str, int, int, int, int]:
+    x1, y1, x2, y2 = obj.bbox
+    return obj.class_name, int(x1), int(y1), int(x2), int(y2)
+
+
+def synthetic_wall(hold_count: int, seed: int = 0) -> HoldSet:
+    rng = np.random.default_rng(seed)
+    centers = rng.integers(0, [WALL_WIDTH, WALL_HEIGHT], size=(hold_count, 2))
+    half_sizes = rng.integers(5, 30, size=(hold_count, 1))
+    return HoldSet(bboxes=np.hstack([centers - half_sizes, centers + half_sizes]), class_ids=np.zeros(hold_count),
+                   class_names=("hold",), centers=centers)
+
+
+def mean_seconds(fn, repeat: int) -> float:
+    started = time.perf_counter()
+    for _ in range(repeat):
+        fn()
+    return (time.perf_counter() - started) / repeat
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the vectorized route planner")
+    parser.add_argument("--holds", nargs="*", type=int, default=[100, 1000, 5000, 20000],
+                        help="Hold counts to benchmark (default: 100 1000 5000 20000)")
+    parser.add_argument("--max-holds", type=int, default=12, help="Route length limit (default: 12)")
+    parser.add_argument("--repeat", "-r", type=int, default=5, help="Plans per wall and planner (default: 5)")
+    args = parser.parse_args()
+
+    params = {"img_width": WALL_WIDTH, "img_height": WALL_HEIGHT, "max_holds": args.max_holds}
+    print(f"{'holds':>7s} {'python':>11s} {'vectorized':>11s} {'speedup':>8s} {'route':>6s}")
+    for hold_count in args.holds:
+        holds = synthetic_wall(hold_count)
+        # the Python planner gets the DetectedObject list detect() used to return
+        objects = [DetectedObject(class_name=hold.class_name, bbox=hold.bbox.copy(), center=hold.center)
+                   for hold in holds]
+
+        expected = python_planner(objects, **params)
+        actual = plan_bottom_to_top_route(holds, **params)
+        assert [hold.bbox.tolist() for hold in actual] == [obj.bbox.tolist() for obj in expected], \
+            f"routes differ at {hold_count} holds"
+
+        python_seconds = mean_seconds(lambda: python_planner(objects, **params), args.repeat)
+        vectorized_seconds = mean_seconds(lambda: plan_bottom_to_top_route(holds, **params), args.repeat)
+        print(f"{hold_count:7d} {1000 * python_seconds:9.2f}ms {1000 * vectorized_seconds:9.2f}ms "
+              f"{python_seconds / vectorized_seconds:7.1f}x {len(actual):6d}")
+
+
+if __name__ == "__main__":
+    main()
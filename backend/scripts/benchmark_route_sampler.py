@@ -0,0 +1,69 @@
+#!/usr/bin/env python3
+"""
+Benchmark Monte Carlo route sampling on a synthetic wall.
+
+Runs src.route_sampler.sample_routes with an increasing number of worker
+processes and reports trials/sec, the failure rate and the cheapest route
+found. The trial seeds only depend on --seed, so every row finds the same
+routes; only the throughput changes. Worker processes are spawned per
+call, which costs about a second each, so use enough --trials.
+
+Usage:
+    python scripts/benchmark_route_sampler.py
+    python scripts/benchmark_route_sampler.py --trials 5000 --workers 1 4 8 --holds 200
+"""
+
+import argparse
+import os
+import sys
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.model.hold_set import HoldSet  # noqa: E402
+from src.route_sampler import sample_routes  # noqa: E402
+
+WALL_WIDTH = 1216
+WALL_HEIGHT = 1600
+
+
+class Marker:
+    """A fixed 4 px/cm scale instead of a photographed ArUco marker."""
+
+    def convert_cm_to_px(self, cm: float) -> int:
+        return int(cm * 4)
+
+    def convert_px_to_cm(self, px: int) -> float:
+        return px / 4
+
+
+def synthetic_wall(hold_count: int, seed: int = 0) -> HoldSet:
+    rng = np.random.default_rng(seed)
+    centers = rng.integers(0, [WALL_WIDTH, WALL_HEIGHT], size=(hold_count, 2))
+    return HoldSet(bboxes=np.hstack([centers - 10, centers + 10]), class_ids=np.zeros(hold_count),
+                   class_names=("hold",), centers=centers)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark parallel Monte Carlo route sampling")
+    parser.add_argument("--trials", type=int, default=1000, help="Trials per run (default: 1000)")
+    parser.add_argument("--workers", nargs="*", type=int, default=[1, 2, os.cpu_count() or 1],
+                        help="Worker process counts (default: 1 2 <cpu count>)")
+    parser.add_argument("--holds", type=int, default=400, help="Holds on the wall (default: 400)")
+    parser.add_argument("--seed", type=int, default=0, help="Sampling seed (default: 0)")
+    args = parser.parse_args()
+
+    holds = synthetic_wall(args.holds)
+    print(f"{'workers':>7s} {'trials/s':>9s} {'failures':>9s} {'best cost':>10s} {'best seed':>11s}")
+    for workers in dict.fromkeys(args.workers):
+        result = sample_routes(WALL_WIDTH, WALL_HEIGHT, Marker(), holds, trials=args.trials, best=1, seed=args.seed,
+                               workers=workers)
+        stats = result.stats
+        best = result.routes[0] if result.routes else None
+        print(f"{workers:7d} {stats.trials_per_second:9.1f} {stats.failure_rate:8.1%} "
+              f"{best.cost if best else float('nan'):10.1f} {best.seed if best else '-':>11}")
+
+
+if __name__ == "__main__":
+    main()
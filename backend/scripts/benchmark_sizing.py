@@ -0,0 +1,115 @@
+#!/usr/bin/env python3
+"""
+Benchmark fixed square vs adaptive detector input sizing.
+
+Runs objects_detector.detect on each photo in three modes:
+
+- square: the photo letterboxed into an imgsz x imgsz input (the default)
+- rect:   stride-aligned input matching the photo's aspect ratio
+- budget: rect plus the detail budget (--min-hold-px), which keeps a
+          low-resolution probe when the holds are large enough
+
+and reports latency, the share of input pixels spent on padding, the sizes
+the budget picked, and agreement with the square mode's detections.
+
+The configured backend is used (DETECTION_BACKEND, see README); ONNX/OpenVINO
+models need a dynamic-shape export (convert_model.py --dynamic) for rect.
+
+Usage:
+    python scripts/benchmark_sizing.py --images path/to/wall/photos
+    python scripts/benchmark_sizing.py -i photos --min-hold-px 24 --repeat 5
+"""
+
+import argparse
+import os
+import sys
+import time
+from collections import Counter
+
+import cv2
+import numpy as np
+
+# time the detector itself, not the micro-batching wait
+os.environ.setdefault("DETECTION_BATCH_MAX_SIZE", "1")
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src import objects_detector  # noqa: E402
+from src.detection_metrics import detection_agreement, latency_summary  # noqa: E402
+from src.yolo_ops import rect_input_size  # noqa: E402
+
+
+def padding_share(img: np.ndarray, input_width: int, input_height: int) -> float:
+    img_height, img_width = img.shape[:2]
+    ratio = min(input_width / img_width, input_height / img_height)
+    content = round(img_width * ratio) * round(img_height * ratio)
+    return 1 - content / (input_width * input_height)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark square vs rectangular/adaptive detector input")
+    parser.add_argument("--images", "-i", type=str, required=True, help="Folder with sample wall photos")
+    parser.add_argument("--size", "-s", type=int, default=None,
+                        help="Input size / long side (default: the detector's configured size)")
+    parser.add_argument("--min-hold-px", type=int, default=24,
+                        help="Detail budget for the budget mode (default: 24)")
+    parser.add_argument("--probe-size", type=int, default=640, help="Detail budget probe size (default: 640)")
+    parser.add_argument("--repeat", "-r", type=int, default=3, help="Timed passes over the images (default: 3)")
+    args = parser.parse_args()
+
+    images = {
+        name: cv2.imread(os.path.join(args.images, name)) for name in sorted(os.listdir(args.images))
+        if name.lower().endswith((".jpg", ".jpeg", ".png"))
+    }
+    if not images:
+        print(f"Error: no .jpg/.png images found in {args.images}")
+        sys.exit(1)
+
+    imgsz = args.size or objects_detector.settings().imgsz
+    modes = {
+        "square": {"rect": False, "min_hold_px": 0},
+        "rect": {"rect": True, "min_hold_px": 0},
+        "budget": {"rect": True, "min_hold_px": args.min_hold_px, "probe_size": args.probe_size},
+    }
+    print(f"{objects_detector.settings().backend} backend, imgsz {imgsz}, {len(images)} images")
+
+    for img in list(images.values())[:1]:
+        objects_detector.detect(img, imgsz=imgsz)  # load and warm up
+
+    detections, summaries = {}, {}
+    for mode, params in modes.items():
+        timings = []
+        for _ in range(args.repeat):
+            for img in images.values():
+                started = time.perf_counter()
+                objects_detector.detect(img, imgsz=imgsz, **params)
+                timings.append(time.perf_counter() - started)
+        detections[mode] = [objects_detector.detect(img, imgsz=imgsz, **params) for img in images.values()]
+        summaries[mode] = latency_summary(timings)
+
+    square_padding = np.mean([padding_share(img, imgsz, imgsz) for img in images.values()])
+    rect_padding = np.mean([
+        padding_share(img, *rect_input_size(img.shape[1], img.shape[0], imgsz)) for img in images.values()
+    ])
+    budget_sizes = Counter(
+        objects_detector.detail_budget_size(
+            objects_detector.detect(img, imgsz=args.probe_size, rect=True, min_hold_px=0),
+            img.shape[1], img.shape[0], args.probe_size, imgsz, args.min_hold_px,
+        )
+        for img in images.values()
+    )
+
+    print(f"\n{'mode':8s} {'p50':>9s} {'p90':>9s} {'mean':>9s} {'img/s':>7s} {'recall':>7s} {'IoU':>6s} {'padding':>8s}")
+    for mode, summary in summaries.items():
+        agreement = detection_agreement(detections["square"], detections[mode])
+        padding = {"square": square_padding, "rect": rect_padding}.get(mode)
+        print(
+            f"{mode:8s} {summary['p50Ms']:7.1f}ms {summary['p90Ms']:7.1f}ms {summary['meanMs']:7.1f}ms "
+            f"{summary['imagesPerSecond']:7.2f} {agreement['recall']:7.3f} {agreement['meanIou']:6.3f} "
+            f"{'' if padding is None else f'{100 * padding:7.1f}%':>8s}"
+        )
+        print(f"         speedup vs square {summaries['square']['meanMs'] / summary['meanMs']:.2f}x")
+    print("\nDetail budget sizes: " + ", ".join(f"{size}px x{count}" for size, count in sorted(budget_sizes.items())))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,107 @@
+#!/usr/bin/env python3
+"""
+Benchmark hold radius queries as walls grow.
+
+For synthetic walls of increasing hold counts, compares per query:
+
+- scan:    the original per-hold math.sqrt loop of get_objects_around_point
+- numpy:   the same scan vectorized over the HoldSet arrays
+- index:   a HoldIndex (scipy cKDTree) query, plus its one-off build time
+- batched: HoldIndex.within_many over all query points at once
+
+Query radii are an arm's reach (about 1/5 of the wall height), like the
+RouteGenerator's arm and on-top checks.
+
+Usage:
+    python scripts/benchmark_spatial_index.py
+    python scripts/benchmark_spatial_index.py --holds 100 1000 10000 --queries 500
+"""
+
+import argparse
+import math
+import os
+import sys
+import time
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.model.hold_set import HoldSet  # noqa: E402
+from src.model.point import Point  # noqa: E402
+from src.spatial_index import HoldIndex, within_radius  # noqa: E402
+
+WALL_WIDTH = 1216
+WALL_HEIGHT = 1600
+
+
+def synthetic_wall(hold_count: int, seed: int = 0) -> HoldSet:
+    rng = np.random.default_rng(seed)
+    top_left = rng.integers(0, [WALL_WIDTH, WALL_HEIGHT], size=(hold_count, 2))
+    sizes = rng.integers(10, 60, size=(hold_count, 2))
+    return HoldSet(bboxes=np.hstack([top_left, top_left + sizes]), class_ids=np.zeros(hold_count),
+                   class_names=("hold",))
+
+
+def scan(holds: list, point: Point, radius: float) -> list:
+    around = []
+    for hold in holds:
+        x1, y1, x2, y2 = hold.bbox
+        if math.sqrt((x1 - point.x) ** 2 + (y1 - point.y) ** 2) < radius:
+            around.append(hold)
+    return around
+
+
+def per_query_us(fn, points: list[Point], repeat: int) -> float:
+    started = time.perf_counter()
+    for _ in range(repeat):
+        for point in points:
+            fn(point)
+    return 1e6 * (time.perf_counter() - started) / (repeat * len(points))
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark linear vs indexed hold radius queries")
+    parser.add_argument("--holds", nargs="*", type=int, default=[50, 200, 1000, 5000, 20000],
+                        help="Hold counts to benchmark (default: 50 200 1000 5000 20000)")
+    parser.add_argument("--queries", type=int, default=200, help="Query points per wall (default: 200)")
+    parser.add_argument("--repeat", "-r", type=int, default=3, help="Passes over the query points (default: 3)")
+    parser.add_argument("--radius", type=float, default=WALL_HEIGHT / 5,
+                        help=f"Query radius in px (default: {WALL_HEIGHT / 5:.0f})")
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(1)
+    xy = rng.integers(0, [WALL_WIDTH, WALL_HEIGHT], size=(args.queries, 2))
+    points = [Point(int(x), int(y)) for x, y in xy]
+
+    HoldIndex(synthetic_wall(1))  # import scipy outside the build timings
+    print(f"{'holds':>7s} {'scan':>10s} {'numpy':>10s} {'index':>10s} {'batched':>10s} {'build':>9s} "
+          f"{'vs scan':>8s} {'found':>7s}")
+    for hold_count in args.holds:
+        holds = synthetic_wall(hold_count)
+        views = list(holds)
+
+        started = time.perf_counter()
+        index = HoldIndex(holds)
+        build_ms = 1000 * (time.perf_counter() - started)
+
+        # the pure Python scan gets slow on big walls; a few passes are enough there
+        scan_us = per_query_us(lambda point: scan(views, point, args.radius), points[:max(10, 20000 // hold_count)], 1)
+        numpy_us = per_query_us(
+            lambda point: np.flatnonzero(within_radius(holds.bboxes[:, :2], (point.x, point.y), args.radius)),
+            points, args.repeat,
+        )
+        index_us = per_query_us(lambda point: index.within(point, args.radius), points, args.repeat)
+        started = time.perf_counter()
+        for _ in range(args.repeat):
+            batched = index.within_many(xy, args.radius)
+        batched_us = 1e6 * (time.perf_counter() - started) / (args.repeat * len(points))
+
+        assert [found.tolist() for found in batched] == [index.within(point, args.radius).tolist() for point in points]
+        found = np.mean([len(found) for found in batched])
+        print(f"{hold_count:7d} {scan_us:8.1f}us {numpy_us:8.1f}us {index_us:8.1f}us {batched_us:8.1f}us "
+              f"{build_ms:7.2f}ms {scan_us / index_us:7.1f}x {found:7.1f}")
+
+
+if __name__ == "__main__":
+    main()
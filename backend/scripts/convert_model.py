@@ -11,17 +11,35 @@ Supports exporting YOLOv9 models to various formats:
 Requirements:
     pip install ultralytics coremltools torch onnx
 
+With --benchmark, every CPU runtime (PyTorch, ONNX Runtime, OpenVINO) is
+exported and timed at several input sizes on sample images. The fastest
+configuration whose detections still agree with PyTorch at the training
+size is written to a manifest that objects_detector picks up at startup
+(DETECTION_BACKEND=auto, the default).
+
 Usage:
     python convert_model.py --model path/to/model.pt --format onnx
     python convert_model.py --model path/to/model.pt --format coreml
+    python convert_model.py --model path/to/model.pt --benchmark --images path/to/wall/photos
 """
 
 import argparse
+import importlib.util
 import os
+import shutil
 import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
+# runtime backend -> ultralytics export format (None: the .pt weights themselves)
+BENCHMARK_FORMATS = {'pytorch': None, 'onnxruntime': 'onnx', 'openvino': 'openvino'}
+_RUNTIME_MODULES = {'pytorch': 'ultralytics', 'onnxruntime': 'onnxruntime', 'openvino': 'openvino'}
 
-def convert_model(model_path: str, output_format: str, output_path: str = None, img_size: int = 1216):
+
+def convert_model(model_path: str, output_format: str, output_path: str = None, img_size: int = 1216,
+                  int8: bool = False, dynamic: bool = False):
     """
     Convert YOLO model to specified format.
     
@@ -30,6 +48,8 @@ def convert_model(model_path: str, output_format: str, output_path: str = None,
         output_format: Target format (onnx, coreml, tflite, tensorrt)
         output_path: Optional output path
         img_size: Input image size (default: 1216 to match training)
+        int8: TFLite INT8 quantization (ONNX/OpenVINO: see quantize_model.py)
+        dynamic: ONNX/OpenVINO input shape left open, needed for DETECTION_RECT_INPUT
     """
     try:
         from ultralytics import YOLO
@@ -54,9 +74,15 @@ def convert_model(model_path: str, output_format: str, output_path: str = None,
         export_args['nms'] = True  # Include NMS in model
     elif output_format == 'onnx':
         export_args['simplify'] = True
-        export_args['dynamic'] = False
+        export_args['dynamic'] = dynamic
+    elif output_format == 'openvino':
+        export_args['dynamic'] = dynamic
     elif output_format == 'tflite':
-        export_args['int8'] = False  # Set True for quantization
+        export_args['int8'] = int8
+        if int8:
+            # ultralytics calibrates on the validation images listed there
+            export_args['data'] = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))),
+                                               'config.yaml')
     
     result = model.export(**export_args)
     
@@ -66,6 +92,117 @@ def convert_model(model_path: str, output_format: str, output_path: str = None,
     return result
 
 
+def export_for_size(model_path: str, output_format: str, img_size: int, export_dir: Path) -> Path:
+    """
+    Export at img_size and keep the artifact under a size-specific name,
+    since ultralytics always writes to the same path.
+    
+    Returns the file the runtime loads (the .xml for OpenVINO).
+    """
+    exported = Path(convert_model(model_path, output_format, img_size=img_size))
+    stem = Path(model_path).stem
+    suffix = '.onnx' if output_format == 'onnx' else '_openvino_model'
+    target = export_dir / f'{stem}_{img_size}{suffix}'
+    
+    export_dir.mkdir(parents=True, exist_ok=True)
+    if target.is_dir():
+        shutil.rmtree(target)
+    elif target.exists():
+        target.unlink()
+    shutil.move(str(exported), str(target))
+    
+    return target if output_format == 'onnx' else target / f'{stem}.xml'
+
+
+def benchmark_exports(model_path: str, images_dir: str, sizes: list[int], baseline_size: int,
+                      min_recall: float, min_iou: float, repeat: int, manifest_path: Path) -> dict:
+    """
+    Time every CPU runtime at every candidate size and record the fastest
+    one within the accuracy tolerance in the manifest.
+    
+    Accuracy is agreement with PyTorch at baseline_size on the same images:
+    hold recall and mean IoU of the matched boxes.
+    """
+    import cv2
+    from src.detection_backends import create_backend
+    from src.detection_manifest import DetectorSelection, write_manifest
+    from src.detection_metrics import detection_agreement, latency_summary
+    
+    images = [
+        cv2.imread(os.path.join(images_dir, name)) for name in sorted(os.listdir(images_dir))
+        if name.lower().endswith(('.jpg', '.jpeg', '.png'))
+    ]
+    if not images:
+        print(f"Error: no .jpg/.png images found in {images_dir}")
+        sys.exit(1)
+    
+    weights_path = Path(model_path)
+    export_dir = weights_path.parent / 'benchmark'
+    
+    def run(detector, img_size):
+        return [detector.detect([img], conf=0.85, iou=0.7, imgsz=img_size)[0] for img in images]
+    
+    print(f"Baseline: pytorch at {baseline_size}px on {len(images)} images")
+    pytorch = create_backend('pytorch', weights_path)
+    baseline = run(pytorch, baseline_size)
+    
+    candidates = []
+    for backend, output_format in BENCHMARK_FORMATS.items():
+        if importlib.util.find_spec(_RUNTIME_MODULES[backend]) is None:
+            print(f"Skipping {backend}: {_RUNTIME_MODULES[backend]} not installed")
+            continue
+        for img_size in sizes:
+            if output_format is None:
+                artifact, detector = weights_path, pytorch
+            else:
+                artifact = export_for_size(model_path, output_format, img_size, export_dir)
+                detector = create_backend(backend, artifact)
+            
+            detections = run(detector, img_size)  # also warms the runtime up
+            timings = []
+            for _ in range(repeat):
+                for img in images:
+                    started = time.perf_counter()
+                    detector.detect([img], conf=0.85, iou=0.7, imgsz=img_size)
+                    timings.append(time.perf_counter() - started)
+            
+            latency = latency_summary(timings)
+            agreement = detection_agreement(baseline, detections)
+            accepted = agreement['recall'] >= min_recall and agreement['meanIou'] >= min_iou
+            candidates.append({
+                'backend': backend,
+                'precision': 'fp32',
+                'imgsz': img_size,
+                'modelPath': os.path.relpath(artifact, manifest_path.parent),
+                'latency': latency,
+                'agreement': agreement,
+                'accepted': accepted,
+            })
+            print(f"  {backend:12s} {img_size:5d}px  p50 {latency['p50Ms']:7.1f} ms  "
+                  f"recall {agreement['recall']:.3f}  IoU {agreement['meanIou']:.3f}"
+                  f"{'' if accepted else '  (outside tolerance)'}")
+    
+    accepted = [candidate for candidate in candidates if candidate['accepted']]
+    if not accepted:
+        print("Error: no configuration stays within the accuracy tolerance; no manifest written")
+        sys.exit(1)
+    
+    best = min(accepted, key=lambda candidate: candidate['latency']['p50Ms'])
+    selection = DetectorSelection(
+        backend=best['backend'],
+        precision=best['precision'],
+        imgsz=best['imgsz'],
+        model_path=best['modelPath'],
+    )
+    write_manifest(manifest_path, weights_path, selection, candidates,
+                   tolerance={'minRecall': min_recall, 'minIou': min_iou, 'baselineSize': baseline_size})
+    
+    print(f"\nSelected {best['backend']} at {best['imgsz']}px ({best['latency']['p50Ms']:.1f} ms p50)")
+    print(f"Manifest: {manifest_path}")
+    
+    return best
+
+
 def main():
     parser = argparse.ArgumentParser(
         description="Convert YOLOv9 model to various deployment formats"
@@ -95,6 +232,64 @@ def main():
         default=1216,
         help="Input image size (default: 1216)"
     )
+    parser.add_argument(
+        "--dynamic",
+        action="store_true",
+        help="Dynamic input shape for onnx/openvino (rectangular inputs, DETECTION_RECT_INPUT)"
+    )
+    parser.add_argument(
+        "--int8",
+        action="store_true",
+        help="Quantize to INT8 (onnx/openvino need --calibration-images)"
+    )
+    parser.add_argument(
+        "--calibration-images",
+        type=str,
+        default=None,
+        help="Folder of wall photos to calibrate INT8 onnx/openvino models on"
+    )
+    parser.add_argument(
+        "--benchmark",
+        action="store_true",
+        help="Export every CPU runtime at each of --sizes and record the fastest accurate one"
+    )
+    parser.add_argument(
+        "--images", "-i",
+        type=str,
+        default=None,
+        help="Folder of sample wall photos for --benchmark"
+    )
+    parser.add_argument(
+        "--sizes",
+        type=int,
+        nargs="+",
+        default=[640, 832, 1024, 1216],
+        help="Candidate input sizes for --benchmark (default: 640 832 1024 1216)"
+    )
+    parser.add_argument(
+        "--min-recall",
+        type=float,
+        default=0.95,
+        help="Hold recall vs PyTorch at --size a configuration must keep (default: 0.95)"
+    )
+    parser.add_argument(
+        "--min-iou",
+        type=float,
+        default=0.85,
+        help="Mean IoU of matched boxes a configuration must keep (default: 0.85)"
+    )
+    parser.add_argument(
+        "--repeat", "-r",
+        type=int,
+        default=3,
+        help="Timed passes over the images per configuration (default: 3)"
+    )
+    parser.add_argument(
+        "--manifest",
+        type=str,
+        default=None,
+        help="Manifest path (default: detection_manifest.json next to the model)"
+    )
     
     args = parser.parse_args()
     
@@ -103,7 +298,25 @@ def main():
         print(f"Error: Model file not found: {args.model}")
         sys.exit(1)
     
-    convert_model(args.model, args.format, args.output, args.size)
+    if args.benchmark:
+        if not args.images:
+            print("Error: --benchmark needs --images")
+            sys.exit(1)
+        manifest_path = Path(args.manifest or Path(args.model).with_name('detection_manifest.json'))
+        benchmark_exports(args.model, args.images, args.sizes, args.size, args.min_recall, args.min_iou,
+                          args.repeat, manifest_path)
+        return
+    
+    if args.int8 and args.format in ('onnx', 'openvino'):
+        if not args.calibration_images:
+            print("Error: --int8 for onnx/openvino needs --calibration-images")
+            sys.exit(1)
+        from scripts.quantize_model import quantize
+        backend = 'onnxruntime' if args.format == 'onnx' else 'openvino'
+        quantize(args.model, backend, args.calibration_images, args.size)
+        return
+
+    convert_model(args.model, args.format, args.output, args.size, args.int8, args.dynamic)
 
 
 if __name__ == "__main__":
@@ -0,0 +1,188 @@
+#!/usr/bin/env python3
+"""
+Post-training INT8 quantization of the hold detector.
+
+Calibrates on a local folder of wall photos, run through the same letterbox
+preprocessing objects_detector uses at inference time, and writes the INT8
+model where objects_detector finds it for DETECTION_PRECISION=int8:
+
+- onnxruntime: static QDQ quantization   -> best_int8.onnx
+- openvino:    NNCF post-training quant  -> best_int8_openvino_model/best.xml
+
+The detect head (box decoding / DFL) is kept in FP32; quantizing it costs
+far more box precision than it saves time. Missing FP32 exports are created
+with convert_model.py first.
+
+Check the result with scripts/benchmark_detection.py before deploying it.
+
+Requirements:
+    pip install ultralytics onnx onnxruntime        # onnxruntime
+    pip install ultralytics openvino nncf           # openvino
+
+Usage:
+    python scripts/quantize_model.py --model train4/weights/best.pt --backend onnxruntime \
+        --calibration-images path/to/wall/photos
+"""
+
+import argparse
+import os
+import re
+import shutil
+import sys
+from collections.abc import Iterator
+from pathlib import Path
+
+import cv2
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from scripts.convert_model import convert_model  # noqa: E402
+from src.detection_backends import default_model_path  # noqa: E402
+from src.yolo_ops import letterbox, to_input_tensor  # noqa: E402
+
+# ultralytics names submodules model.0 .. model.N; the highest index is the detect head
+_MODULE_INDEX = re.compile(r"model\.(\d+)[/.]")
+
+
+def load_calibration_images(images_dir: str, limit: int) -> list[np.ndarray]:
+    images = []
+    for name in sorted(os.listdir(images_dir)):
+        if name.lower().endswith((".jpg", ".jpeg", ".png")):
+            img = cv2.imread(os.path.join(images_dir, name))
+            if img is not None:
+                images.append(img)
+        if len(images) == limit:
+            break
+    return images
+
+
+def calibration_tensors(images: list[np.ndarray], img_size: int) -> Iterator[np.ndarray]:
+    for img in images:
+        padded, _ = letterbox(img, img_size, img_size)
+        yield to_input_tensor([padded])
+
+
+def head_module_index(node_names: list[str]) -> int | None:
+    indices = [int(match.group(1)) for name in node_names for match in [_MODULE_INDEX.search(name)] if match]
+    return max(indices) if indices else None
+
+
+def quantize_onnx(fp32_path: Path, output_path: Path, images: list[np.ndarray], img_size: int) -> Path:
+    import onnx
+    from onnxruntime.quantization import (CalibrationDataReader, CalibrationMethod, QuantFormat, QuantType,
+                                          quantize_static)
+    from onnxruntime.quantization.shape_inference import quant_pre_process
+
+    class _Reader(CalibrationDataReader):
+        def __init__(self, input_name: str):
+            self._input_name = input_name
+            self._tensors = calibration_tensors(images, img_size)
+
+        def get_next(self) -> dict | None:
+            tensor = next(self._tensors, None)
+            return None if tensor is None else {self._input_name: tensor}
+
+    preprocessed_path = output_path.with_name(f"{output_path.stem}.preprocessed.onnx")
+    quant_pre_process(str(fp32_path), str(preprocessed_path))
+    model = onnx.load(str(preprocessed_path))
+
+    node_names = [node.name for node in model.graph.node]
+    head = head_module_index(node_names)
+    head_nodes = [name for name in node_names if head is not None and f"model.{head}/" in name]
+
+    quantize_static(
+        str(preprocessed_path),
+        str(output_path),
+        calibration_data_reader=_Reader(model.graph.input[0].name),
+        quant_format=QuantFormat.QDQ,
+        per_channel=True,
+        activation_type=QuantType.QUInt8,
+        weight_type=QuantType.QInt8,
+        calibrate_method=CalibrationMethod.MinMax,
+        nodes_to_exclude=head_nodes,
+    )
+    # keep the class names ultralytics stored in the FP32 export
+    quantized = onnx.load(str(output_path))
+    for entry in onnx.load(str(fp32_path)).metadata_props:
+        quantized.metadata_props.append(entry)
+    onnx.save(quantized, str(output_path))
+    preprocessed_path.unlink()
+
+    print(f"  kept {len(head_nodes)} detect head nodes in FP32")
+    return output_path
+
+
+def quantize_openvino(fp32_path: Path, output_path: Path, images: list[np.ndarray], img_size: int) -> Path:
+    import nncf
+    import openvino
+
+    model = openvino.Core().read_model(str(fp32_path))
+    head = head_module_index([op.get_friendly_name() for op in model.get_ops()])
+    ignored_scope = nncf.IgnoredScope(patterns=[rf".*model\.{head}/.*"]) if head is not None else None
+
+    quantized = nncf.quantize(
+        model,
+        nncf.Dataset(list(calibration_tensors(images, img_size))),
+        preset=nncf.QuantizationPreset.MIXED,
+        subset_size=len(images),
+        ignored_scope=ignored_scope,
+    )
+    output_path.parent.mkdir(parents=True, exist_ok=True)
+    openvino.save_model(quantized, str(output_path))
+
+    metadata_path = fp32_path.with_name("metadata.yaml")
+    if metadata_path.exists():
+        shutil.copy(metadata_path, output_path.with_name("metadata.yaml"))
+    return output_path
+
+
+def quantize(model_path: str, backend: str, images_dir: str, img_size: int = 1216,
+             limit: int = 300) -> Path:
+    weights_path = Path(model_path)
+    fp32_path = default_model_path(backend, weights_path, "fp32")
+    output_path = default_model_path(backend, weights_path, "int8")
+
+    if not fp32_path.exists():
+        convert_model(model_path, "onnx" if backend == "onnxruntime" else "openvino", img_size=img_size)
+
+    images = load_calibration_images(images_dir, limit)
+    if not images:
+        print(f"Error: no .jpg/.png images found in {images_dir}")
+        sys.exit(1)
+
+    print(f"Quantizing {fp32_path} for {backend} on {len(images)} calibration images at {img_size}px...")
+    if backend == "onnxruntime":
+        quantize_onnx(fp32_path, output_path, images, img_size)
+    else:
+        quantize_openvino(fp32_path, output_path, images, img_size)
+
+    print("\nQuantization complete!")
+    print(f"Output: {output_path}")
+    print("Serve it with DETECTION_BACKEND={} DETECTION_PRECISION=int8".format(backend))
+    return output_path
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Quantize the hold detector to INT8")
+    parser.add_argument("--model", "-m", type=str, required=True,
+                        help="Path to the trained YOLO model (.pt file)")
+    parser.add_argument("--backend", "-b", type=str, default="onnxruntime", choices=["onnxruntime", "openvino"],
+                        help="Runtime to quantize for (default: onnxruntime)")
+    parser.add_argument("--calibration-images", "-c", type=str, required=True,
+                        help="Folder of representative wall photos")
+    parser.add_argument("--limit", type=int, default=300,
+                        help="Maximum number of calibration images (default: 300)")
+    parser.add_argument("--size", "-s", type=int, default=1216,
+                        help="Input image size (default: 1216)")
+    args = parser.parse_args()
+
+    if not os.path.exists(args.model):
+        print(f"Error: Model file not found: {args.model}")
+        sys.exit(1)
+
+    quantize(args.model, args.backend, args.calibration_images, args.size, args.limit)
+
+
+if __name__ == "__main__":
+    main()
@@ -22,6 +22,36 @@ YOLO_MODEL_PATH = os.path.join(BASE_DIR, os.getenv('YOLO_MODEL_PATH', 'train4/we
 # YOLO_DEVICE = 'mps' if torch.backends.mps.is_available() else 'cpu'
 # Use temporary CPU for now. There is some issue with MPS
 YOLO_DEVICE = 'cpu'
+YOLO_IMAGE_SIZE = int(os.getenv('YOLO_IMAGE_SIZE', '1216'))
+
+# Inference runtime: 'pytorch', 'onnxruntime', 'openvino', or 'auto' for the backend and input size
+# picked by `scripts/convert_model.py --benchmark` (pytorch when there is no valid manifest).
+# Exported models are looked up next to YOLO_MODEL_PATH unless DETECTION_MODEL_PATH is set
+DETECTION_BACKEND = os.getenv('DETECTION_BACKEND', 'auto')
+DETECTION_MODEL_PATH = os.getenv('DETECTION_MODEL_PATH', '')
+DETECTION_MANIFEST_PATH = os.getenv('DETECTION_MANIFEST_PATH',
+                                    os.path.join(os.path.dirname(YOLO_MODEL_PATH), 'detection_manifest.json'))
+DETECTION_PRECISION = os.getenv('DETECTION_PRECISION', 'fp32')  # 'int8': scripts/quantize_model.py output
+
+# Rectangular, stride-aligned network input matching the photo's aspect ratio instead of a square
+# (needs a dynamic-shape export for onnxruntime/openvino: convert_model.py --dynamic)
+DETECTION_RECT_INPUT = os.getenv('DETECTION_RECT_INPUT', 'false').lower() in ('1', 'true', 'yes')
+# Detail budget: probe at DETECTION_DETAIL_PROBE_SIZE and only go up to YOLO_IMAGE_SIZE when small holds
+# would end up below DETECTION_MIN_HOLD_PX in the network input (0 disables the budget)
+DETECTION_MIN_HOLD_PX = int(os.getenv('DETECTION_MIN_HOLD_PX', '0'))
+DETECTION_DETAIL_PROBE_SIZE = int(os.getenv('DETECTION_DETAIL_PROBE_SIZE', '640'))
+
+# Tiled detection for wall panoramas: the photo is kept at up to DETECTION_TILE_SOURCE_WIDTH px and detected
+# in overlapping tiles of DETECTION_TILE_SIZE px (overlap as a fraction of a tile), merged with cross-tile NMS
+DETECTION_TILING = os.getenv('DETECTION_TILING', 'false').lower() in ('1', 'true', 'yes')
+DETECTION_TILE_SOURCE_WIDTH = int(os.getenv('DETECTION_TILE_SOURCE_WIDTH', '4864'))
+DETECTION_TILE_SIZE = int(os.getenv('DETECTION_TILE_SIZE', '1216'))
+DETECTION_TILE_OVERLAP = float(os.getenv('DETECTION_TILE_OVERLAP', '0.2'))
+DETECTION_TILE_CONCURRENCY = int(os.getenv('DETECTION_TILE_CONCURRENCY', '1'))  # tile batches in flight
+
+# Load the model and run warmup inferences at startup; /ready fails until done
+MODEL_PRELOAD = os.getenv('MODEL_PRELOAD', 'true').lower() in ('1', 'true', 'yes')
+MODEL_WARMUP_ITERATIONS = int(os.getenv('MODEL_WARMUP_ITERATIONS', '2'))
 
 MARKER_BBOX_COLOR = Color.green()
 TXT_COLOR = Color.black()
@@ -33,6 +63,14 @@ PROBLEM_STEP_BBOX_COLOR = Color.red()
 ROUTE_LINE_COLOR = Color.blue()
 ROUTE_LINE_WIDTH = 6
 
+# Route planner: 'greedy' picks the best next hold step by step, 'graph' searches all routes of a
+# reachability graph for the cheapest one under the same step scores
+ROUTE_PLANNER = os.getenv('ROUTE_PLANNER', 'greedy')
+# Upper bound of the `routes` option of /boulder/route (diverse routes planned on one detection)
+MAXIMUM_ROUTES_PER_REQUEST = int(os.getenv('MAXIMUM_ROUTES_PER_REQUEST', '5'))
+# Upper bound of the `deadline_ms` option of /boulder/route (anytime body-aware route search)
+MAXIMUM_ROUTE_DEADLINE_MS = int(os.getenv('MAXIMUM_ROUTE_DEADLINE_MS', '5000'))
+
 CLIMBER_HEIGHT_IN_CM = 170
 STEP_RADIUS_IN_CM = 70
 STARTING_STEPS_MAX_DISTANCE_FROM_GROUND_IN_CM = 40
@@ -40,4 +78,32 @@ STARTING_STEPS_MAX_DISTANCE_FROM_GROUND_IN_CM = 40
 LINE_WIDTH = 2
 
 MAXIMUM_FILE_SIZE = 1024 * 1024 * 4  # 4MB
+MAXIMUM_IMAGE_DIMENSION = 12000  # px, checked from the image header before decoding
+MAXIMUM_IMAGE_PIXELS = 64_000_000
 ACCEPTED_MIME_TYPES = ["image/png", "image/jpeg", "image/jpg"]
+
+# Worker pool running the /boulder/generate CV pipeline off the event loop
+WORKER_POOL_KIND = os.getenv('WORKER_POOL_KIND', 'thread')  # 'thread' or 'process'
+WORKER_POOL_SIZE = int(os.getenv('WORKER_POOL_SIZE', '2'))
+WORKER_POOL_MAX_QUEUE = int(os.getenv('WORKER_POOL_MAX_QUEUE', '8'))
+WORKER_POOL_TIMEOUT_SECONDS = float(os.getenv('WORKER_POOL_TIMEOUT_SECONDS', '30'))
+
+# Micro-batching of concurrent YOLO calls (max size 1 disables batching)
+DETECTION_BATCH_MAX_SIZE = int(os.getenv('DETECTION_BATCH_MAX_SIZE', '4'))
+DETECTION_BATCH_MAX_WAIT_MS = float(os.getenv('DETECTION_BATCH_MAX_WAIT_MS', '10'))
+
+# Result cache for /boulder/generate (empty RESULT_CACHE_DIR disables the disk tier)
+RESULT_CACHE_MAX_MEMORY_BYTES = int(os.getenv('RESULT_CACHE_MAX_MEMORY_BYTES', str(1024 * 1024 * 64)))  # 64MB
+RESULT_CACHE_DIR = os.getenv('RESULT_CACHE_DIR', '')
+
+# Bearer token for the ops endpoints (DELETE /boulder/cache); empty disables them
+ADMIN_TOKEN = os.getenv('ADMIN_TOKEN', '')
+
+# Reuse detections of near-duplicate photos (difference hash, 64 bits)
+NEAR_DUPLICATE_INDEX_SIZE = int(os.getenv('NEAR_DUPLICATE_INDEX_SIZE', '256'))  # 0 disables reuse
+NEAR_DUPLICATE_MAX_DISTANCE = int(os.getenv('NEAR_DUPLICATE_MAX_DISTANCE', '6'))
+
+# Default /boulder/generate output: 'png', 'jpeg', 'webp' or 'overlay' (transparent PNG)
+OUTPUT_FORMAT = os.getenv('OUTPUT_FORMAT', 'png')
+JPEG_QUALITY = int(os.getenv('JPEG_QUALITY', '85'))
+WEBP_QUALITY = int(os.getenv('WEBP_QUALITY', '80'))
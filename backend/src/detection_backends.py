@@ -0,0 +1,227 @@
+"""
+Interchangeable runtimes for the YOLO hold detector.
+
+The PyTorch backend runs the ultralytics predictor itself, as the service
+always has, and is the reference the exports are checked against. The
+exported runtimes share the letterbox preprocessing and NMS postprocessing
+of :mod:`src.yolo_ops`, which follow ultralytics'; only their network
+forward pass differs. Given the same weights they return the same
+detections, up to the numeric noise of the runtime.
+"""
+from __future__ import annotations
+
+import ast
+import importlib.util
+import threading
+from pathlib import Path
+
+import cv2
+import numpy as np
+import yaml
+
+from src import config
+from src.model.hold_set import HoldSet
+from src.yolo_ops import letterbox, non_max_suppression, rect_input_size, scale_boxes, to_input_tensor
+
+BACKENDS = ("pytorch", "onnxruntime", "openvino")
+PRECISIONS = ("fp32", "int8")
+# onnxruntime and openvino are optional, see requirements-runtimes.txt
+RUNTIME_MODULES = {"pytorch": "ultralytics", "onnxruntime": "onnxruntime", "openvino": "openvino"}
+
+
+class DetectionBackend:
+    name = ""
+
+    def __init__(self, model_path: Path):
+        self.model_path = model_path
+        self.class_names: dict[int, str] = {}
+        # (width, height) for models exported with a static input shape
+        self.fixed_input_size: tuple[int, int] | None = None
+        self.fixed_batch_size: int | None = None
+
+    def detect(self, imgs: list[cv2.typing.MatLike], conf: float, iou: float,
+               imgsz: int, rect: bool = False) -> list[HoldSet]:
+        """
+        ``rect`` fits the input to the images' aspect ratio (stride-aligned,
+        long side ``imgsz``) instead of padding them to an ``imgsz`` square;
+        a batch shares the smallest shape that holds all of its images.
+        Models exported with a static input shape always use the square.
+        """
+        return [self.to_hold_set(boxes, scores, class_ids)
+                for boxes, scores, class_ids in self.detect_raw(imgs, conf=conf, iou=iou, imgsz=imgsz, rect=rect)]
+
+    def detect_raw(self, imgs: list[cv2.typing.MatLike], conf: float, iou: float,
+                   imgsz: int, rect: bool = False) -> list[tuple[np.ndarray, np.ndarray, np.ndarray]]:
+        """Per image ``(xyxy boxes, scores, class ids)`` after NMS, boxes in image coordinates."""
+        input_width, input_height = self.input_size(imgsz)
+        if rect and self.fixed_input_size is None:
+            sizes = [rect_input_size(img.shape[1], img.shape[0], imgsz) for img in imgs]
+            input_width, input_height = max(width for width, _ in sizes), max(height for _, height in sizes)
+        letterboxed, transforms = [], []
+        for img in imgs:
+            padded, transform = letterbox(img, input_width, input_height)
+            letterboxed.append(padded)
+            transforms.append(transform)
+
+        batch = to_input_tensor(letterboxed)
+        if self.fixed_batch_size == 1:
+            predictions = np.concatenate([self.forward(batch[i:i + 1]) for i in range(len(batch))])
+        else:
+            predictions = self.forward(batch)
+
+        results = []
+        for prediction, transform in zip(predictions, transforms):
+            boxes, scores, class_ids = non_max_suppression(prediction, conf=conf, iou=iou)
+            results.append((scale_boxes(boxes, transform), scores, class_ids))
+        return results
+
+    def input_size(self, imgsz: int) -> tuple[int, int]:
+        if self.fixed_input_size is not None and self.fixed_input_size != (imgsz, imgsz):
+            width, height = self.fixed_input_size
+            raise ValueError(
+                f"{self.model_path.name} was exported for {width}x{height} input, not {imgsz}x{imgsz}; "
+                f"re-export it with --size {imgsz} or set YOLO_IMAGE_SIZE={width}"
+            )
+        return imgsz, imgsz
+
+    def forward(self, batch: np.ndarray) -> np.ndarray:
+        """Raw head output, ``(batch, 4 + num_classes, num_anchors)``."""
+        raise NotImplementedError
+
+    def to_hold_set(self, boxes: np.ndarray, scores: np.ndarray, class_ids: np.ndarray) -> HoldSet:
+        class_count = max([*self.class_names, *class_ids.tolist(), -1]) + 1
+        return HoldSet(
+            bboxes=boxes.astype(int),
+            class_ids=class_ids,
+            class_names=[self.class_names.get(class_id, str(class_id)) for class_id in range(class_count)],
+            confidences=scores,
+        )
+
+
+class PyTorchBackend(DetectionBackend):
+    name = "pytorch"
+
+    def __init__(self, model_path: Path):
+        super().__init__(model_path)
+        from ultralytics import YOLO
+
+        self._yolo = YOLO(str(model_path))
+        self.class_names = dict(self._yolo.names)
+        # the predictor keeps per-call state, so tiles run one batch at a time
+        self._lock = threading.Lock()
+
+    def detect_raw(self, imgs: list[cv2.typing.MatLike], conf: float, iou: float,
+                   imgsz: int, rect: bool = False) -> list[tuple[np.ndarray, np.ndarray, np.ndarray]]:
+        """
+        The ultralytics predictor's boxes. It chooses the input shape itself,
+        already fitted to the aspect ratio when the images share one, so
+        ``rect`` is not needed.
+        """
+        with self._lock:
+            results = self._yolo.predict(list(imgs), conf=conf, iou=iou, imgsz=imgsz,
+                                         device=config.YOLO_DEVICE, verbose=False)
+        return [(result.boxes.xyxy.cpu().numpy(), result.boxes.conf.cpu().numpy(),
+                 result.boxes.cls.cpu().numpy().astype(int)) for result in results]
+
+
+class OnnxRuntimeBackend(DetectionBackend):
+    name = "onnxruntime"
+
+    def __init__(self, model_path: Path):
+        super().__init__(model_path)
+        import onnxruntime
+
+        self._session = onnxruntime.InferenceSession(str(model_path), providers=["CPUExecutionProvider"])
+        model_input = self._session.get_inputs()[0]
+        self._input_name = model_input.name
+        self._set_static_shape(model_input.shape)
+
+        metadata = self._session.get_modelmeta().custom_metadata_map
+        if "names" in metadata:
+            self.class_names = ast.literal_eval(metadata["names"])
+        else:
+            self.class_names = _class_names_from_yaml(Path(config.YOLO_CONFIG_PATH))
+
+    def forward(self, batch: np.ndarray) -> np.ndarray:
+        return self._session.run(None, {self._input_name: batch})[0]
+
+    def _set_static_shape(self, shape: list) -> None:
+        batch_size, _, height, width = shape
+        if isinstance(batch_size, int):
+            self.fixed_batch_size = batch_size
+        if isinstance(height, int) and isinstance(width, int):
+            self.fixed_input_size = (width, height)
+
+
+class OpenVinoBackend(DetectionBackend):
+    name = "openvino"
+
+    def __init__(self, model_path: Path):
+        super().__init__(model_path)
+        import openvino
+
+        core = openvino.Core()
+        model = core.read_model(str(model_path))
+        batch_size, _, height, width = model.inputs[0].get_partial_shape()
+        if batch_size.is_static:
+            self.fixed_batch_size = batch_size.get_length()
+        if height.is_static and width.is_static:
+            self.fixed_input_size = (width.get_length(), height.get_length())
+
+        self._compiled = core.compile_model(model, "CPU")
+        self._lock = threading.Lock()
+
+        metadata_path = model_path.with_name("metadata.yaml")
+        self.class_names = _class_names_from_yaml(
+            metadata_path if metadata_path.exists() else Path(config.YOLO_CONFIG_PATH)
+        )
+
+    def forward(self, batch: np.ndarray) -> np.ndarray:
+        # a compiled model's implicit infer request must not be shared between threads
+        with self._lock:
+            return self._compiled(batch)[0]
+
+
+_BACKEND_CLASSES = {
+    backend.name: backend for backend in (PyTorchBackend, OnnxRuntimeBackend, OpenVinoBackend)
+}
+
+
+def default_model_path(backend: str, weights_path: Path, precision: str = "fp32") -> Path:
+    """
+    Where ``scripts/convert_model.py`` (or ``scripts/quantize_model.py`` for
+    ``precision="int8"``) puts the export of ``weights_path`` for ``backend``.
+    """
+    if precision not in PRECISIONS:
+        raise ValueError(f"Unsupported detection precision: {precision}")
+    suffix = "" if precision == "fp32" else f"_{precision}"
+
+    if backend == "pytorch":
+        if precision != "fp32":
+            raise ValueError("The pytorch backend only runs fp32; quantize for onnxruntime or openvino")
+        return weights_path
+    if backend == "onnxruntime":
+        return weights_path.with_name(f"{weights_path.stem}{suffix}.onnx")
+    if backend == "openvino":
+        return weights_path.with_name(f"{weights_path.stem}{suffix}_openvino_model") / f"{weights_path.stem}.xml"
+    raise ValueError(f"Unsupported detection backend: {backend}")
+
+
+def runtime_installed(backend: str) -> bool:
+    return importlib.util.find_spec(RUNTIME_MODULES[backend]) is not None
+
+
+def create_backend(backend: str, model_path: Path) -> DetectionBackend:
+    if backend not in _BACKEND_CLASSES:
+        raise ValueError(f"Unsupported detection backend: {backend}; choose one of {', '.join(BACKENDS)}")
+    if not model_path.exists():
+        raise FileNotFoundError(
+            f"YOLO model weights not found at {model_path}. "
+            f"Set YOLO_MODEL_PATH (or DETECTION_MODEL_PATH for exported models) in backend/.env."
+        )
+    return _BACKEND_CLASSES[backend](model_path)
+
+
+def _class_names_from_yaml(path: Path) -> dict[int, str]:
+    with open(path) as f:
+        return {int(class_id): name for class_id, name in yaml.safe_load(f)["names"].items()}
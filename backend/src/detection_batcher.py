@@ -0,0 +1,142 @@
+from __future__ import annotations
+
+import queue
+import threading
+import time
+from collections import Counter
+from collections.abc import Callable, Hashable, Sequence
+from concurrent.futures import Future
+from dataclasses import dataclass, field
+from typing import Any
+
+import cv2
+
+from src.metrics import DETECTION_BATCH_FLUSHES, DETECTION_BATCH_SIZE, DETECTION_BATCH_WAIT_SECONDS
+
+
+@dataclass
+class _Request:
+    img: cv2.typing.MatLike
+    params: tuple[tuple[str, Hashable], ...]
+    enqueued_at: float = field(default_factory=time.perf_counter)
+    future: Future = field(default_factory=Future)
+
+
+class DetectionBatcher:
+    """
+    Dynamic micro-batching in front of a batched detector.
+
+    Callers block in :meth:`detect` while a background thread collects the
+    requests that arrive within ``max_wait_ms`` of the first one (up to
+    ``max_batch_size``), runs them as one forward pass and fans the results
+    back out. Only requests with identical detector parameters share a batch.
+    A batch is flushed when it is full or when ``max_wait_ms`` runs out.
+    """
+
+    def __init__(self, detect_batch_fn: Callable[..., list], max_batch_size: int,
+                 max_wait_ms: float):
+        if max_batch_size < 1:
+            raise ValueError("max_batch_size must be >= 1")
+        if max_wait_ms < 0:
+            raise ValueError("max_wait_ms must be >= 0")
+
+        self.max_batch_size = max_batch_size
+        self.max_wait_ms = max_wait_ms
+        self._detect_batch_fn = detect_batch_fn
+        self._queue: queue.Queue[_Request] = queue.Queue()
+        self._backlog: list[_Request] = []
+        self._thread: threading.Thread | None = None
+        self._thread_lock = threading.Lock()
+
+        self._stats_lock = threading.Lock()
+        self._batch_sizes: Counter[int] = Counter()
+        self._flush_reasons: Counter[str] = Counter()
+        self._requests = 0
+        self._wait_seconds_total = 0.0
+        self._wait_seconds_max = 0.0
+        self._inference_seconds_total = 0.0
+
+    def detect(self, img: cv2.typing.MatLike, **params: Hashable) -> Any:
+        request = _Request(img=img, params=tuple(sorted(params.items())))
+        self._ensure_thread()
+        self._queue.put(request)
+        return request.future.result()
+
+    def stats(self) -> dict:
+        with self._stats_lock:
+            batches = sum(self._batch_sizes.values())
+            return {
+                "maxBatchSize": self.max_batch_size,
+                "maxWaitMs": self.max_wait_ms,
+                "batches": batches,
+                "requests": self._requests,
+                "batchSizes": {str(size): count for size, count in sorted(self._batch_sizes.items())},
+                "flushReasons": dict(sorted(self._flush_reasons.items())),
+                "meanBatchSize": self._requests / batches if batches else 0.0,
+                "meanWaitMs": 1000 * self._wait_seconds_total / self._requests if self._requests else 0.0,
+                "maxWaitMsObserved": 1000 * self._wait_seconds_max,
+                "meanInferenceMs": 1000 * self._inference_seconds_total / batches if batches else 0.0,
+            }
+
+    def _ensure_thread(self) -> None:
+        with self._thread_lock:
+            if self._thread is None or not self._thread.is_alive():
+                self._thread = threading.Thread(target=self._run, name="detection-batcher", daemon=True)
+                self._thread.start()
+
+    def _run(self) -> None:
+        while True:
+            batch, flush_reason = self._collect_batch()
+            self._process(batch, flush_reason)
+
+    def _collect_batch(self) -> tuple[list[_Request], str]:
+        # requests held back for having other parameters are served first
+        first = self._backlog.pop(0) if self._backlog else self._queue.get()
+        batch = [first]
+
+        for request in list(self._backlog):
+            if len(batch) >= self.max_batch_size:
+                break
+            if request.params == first.params:
+                self._backlog.remove(request)
+                batch.append(request)
+
+        deadline = first.enqueued_at + self.max_wait_ms / 1000
+        while len(batch) < self.max_batch_size:
+            timeout = deadline - time.perf_counter()
+            try:
+                request = self._queue.get(timeout=timeout) if timeout > 0 else self._queue.get_nowait()
+            except queue.Empty:
+                break
+            if request.params == first.params:
+                batch.append(request)
+            else:
+                self._backlog.append(request)
+
+        return batch, "full" if len(batch) >= self.max_batch_size else "timeout"
+
+    def _process(self, batch: Sequence[_Request], flush_reason: str) -> None:
+        started = time.perf_counter()
+        try:
+            results = self._detect_batch_fn([request.img for request in batch], **dict(batch[0].params))
+        except Exception as exc:
+            for request in batch:
+                request.future.set_exception(exc)
+        else:
+            for request, result in zip(batch, results):
+                request.future.set_result(result)
+
+        finished = time.perf_counter()
+        waits = [started - request.enqueued_at for request in batch]
+        with self._stats_lock:
+            self._batch_sizes[len(batch)] += 1
+            self._flush_reasons[flush_reason] += 1
+            self._requests += len(batch)
+            self._inference_seconds_total += finished - started
+            self._wait_seconds_total += sum(waits)
+            self._wait_seconds_max = max(self._wait_seconds_max, *waits)
+
+        DETECTION_BATCH_SIZE.observe(len(batch))
+        DETECTION_BATCH_FLUSHES.inc(reason=flush_reason)
+        for wait in waits:
+            DETECTION_BATCH_WAIT_SECONDS.observe(wait)
@@ -0,0 +1,79 @@
+"""
+Detector configuration picked by ``scripts/convert_model.py --benchmark``.
+
+The manifest records the fastest backend and input size that stayed within
+the accuracy tolerance, for one specific weights file. A manifest written
+for other weights is ignored, so retraining never silently runs a stale
+export.
+"""
+from __future__ import annotations
+
+import json
+import os
+from dataclasses import asdict, dataclass
+from pathlib import Path
+
+MANIFEST_VERSION = 1
+
+
+@dataclass(frozen=True)
+class DetectorSelection:
+    backend: str
+    precision: str
+    imgsz: int
+    # relative to the manifest's directory
+    model_path: str
+
+
+def weights_fingerprint(weights_path: Path) -> str:
+    stat = os.stat(weights_path)
+    return f"{stat.st_size}:{stat.st_mtime_ns}"
+
+
+def write_manifest(manifest_path: Path, weights_path: Path, selection: DetectorSelection,
+                   candidates: list[dict], tolerance: dict) -> None:
+    manifest = {
+        "version": MANIFEST_VERSION,
+        "weights": weights_path.name,
+        "weightsFingerprint": weights_fingerprint(weights_path),
+        "selected": asdict(selection),
+        "tolerance": tolerance,
+        "candidates": candidates,
+    }
+    manifest_path.parent.mkdir(parents=True, exist_ok=True)
+    tmp_path = manifest_path.with_name(f".{manifest_path.name}.tmp")
+    tmp_path.write_text(json.dumps(manifest, indent=2))
+    os.replace(tmp_path, manifest_path)
+
+
+def load_selection(manifest_path: Path, weights_path: Path) -> tuple[DetectorSelection | None, str]:
+    """
+    The selection recorded in ``manifest_path`` with its model path made
+    absolute, or ``None`` and the reason it cannot be used.
+    """
+    if not manifest_path.exists():
+        return None, f"no manifest at {manifest_path}"
+    try:
+        manifest = json.loads(manifest_path.read_text())
+        selection = DetectorSelection(**manifest["selected"])
+    except (OSError, ValueError, KeyError, TypeError) as exc:
+        return None, f"unreadable manifest {manifest_path}: {exc}"
+
+    if manifest.get("version") != MANIFEST_VERSION:
+        return None, f"manifest version {manifest.get('version')} is not {MANIFEST_VERSION}"
+    try:
+        fingerprint = weights_fingerprint(weights_path)
+    except OSError:
+        return None, f"weights {weights_path} not found"
+    if manifest.get("weightsFingerprint") != fingerprint:
+        return None, f"manifest was benchmarked for other weights than {weights_path}"
+
+    model_path = manifest_path.parent / selection.model_path
+    if not model_path.exists():
+        return None, f"selected model {model_path} not found"
+    return DetectorSelection(
+        backend=selection.backend,
+        precision=selection.precision,
+        imgsz=selection.imgsz,
+        model_path=str(model_path),
+    ), "ok"
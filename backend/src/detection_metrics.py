@@ -0,0 +1,61 @@
+"""Accuracy and latency figures for comparing detector configurations."""
+from __future__ import annotations
+
+from collections.abc import Sequence
+
+import numpy as np
+
+from src.model.detected_object import DetectedObject
+from src.model.hold_set import HoldSet
+from src.yolo_ops import match_boxes
+
+
+def detection_agreement(baseline: Sequence[Sequence[DetectedObject]],
+                        candidate: Sequence[Sequence[DetectedObject]],
+                        iou_threshold: float = 0.5, class_name: str = "hold") -> dict:
+    """
+    How closely ``candidate`` reproduces ``baseline`` over a set of images.
+
+    A candidate box agrees with a baseline box when they overlap by at least
+    ``iou_threshold`` and share the class. ``recall`` is the share of
+    baseline ``class_name`` boxes reproduced, ``precision`` the share of
+    candidate boxes (any class) that have a baseline counterpart, and
+    ``meanIou`` the mean overlap of the matched pairs.
+    """
+    matched_ious = []
+    baseline_total = candidate_total = 0
+    class_total = class_matched = 0
+
+    for expected, actual in zip(baseline, candidate, strict=True):
+        matches = match_boxes(_boxes(expected), _boxes(actual), iou_threshold)
+        matches = [(i, j, iou) for i, j, iou in matches if expected[i].class_name == actual[j].class_name]
+
+        matched_ious.extend(iou for _, _, iou in matches)
+        baseline_total += len(expected)
+        candidate_total += len(actual)
+        class_total += sum(obj.class_name == class_name for obj in expected)
+        class_matched += sum(expected[i].class_name == class_name for i, _, _ in matches)
+
+    return {
+        "meanIou": float(np.mean(matched_ious)) if matched_ious else 0.0,
+        "recall": class_matched / class_total if class_total else 1.0,
+        "precision": len(matched_ious) / candidate_total if candidate_total else 1.0,
+        "baselineBoxes": baseline_total,
+        "candidateBoxes": candidate_total,
+    }
+
+
+def latency_summary(seconds: Sequence[float], images_per_call: int = 1) -> dict:
+    """Percentiles in ms and throughput in images/s of repeated timed calls."""
+    ms = 1000 * np.asarray(seconds)
+    return {
+        "p50Ms": float(np.percentile(ms, 50)),
+        "p90Ms": float(np.percentile(ms, 90)),
+        "p99Ms": float(np.percentile(ms, 99)),
+        "meanMs": float(ms.mean()),
+        "imagesPerSecond": images_per_call * len(ms) / (ms.sum() / 1000) if ms.sum() else 0.0,
+    }
+
+
+def _boxes(detected_objects: Sequence[DetectedObject]) -> np.ndarray:
+    return HoldSet.from_objects(detected_objects).bboxes.astype(float)
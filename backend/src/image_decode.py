@@ -0,0 +1,131 @@
+from __future__ import annotations
+
+import struct
+from dataclasses import dataclass
+
+import cv2
+import imutils
+import numpy as np
+
+_PNG_SIGNATURE = b"\x89PNG\r\n\x1a\n"
+
+# JPEG start-of-frame markers; 0xC4 (DHT), 0xC8 (JPG) and 0xCC (DAC) share the range
+_JPEG_SOF_MARKERS = frozenset(range(0xC0, 0xD0)) - {0xC4, 0xC8, 0xCC}
+# markers without a length field
+_JPEG_STANDALONE_MARKERS = frozenset(range(0xD0, 0xDA)) | {0x01}
+
+# (scale factor, OpenCV flag) from the most to the least reduced decode
+_REDUCED_DECODE_FLAGS = (
+    (8, cv2.IMREAD_REDUCED_COLOR_8),
+    (4, cv2.IMREAD_REDUCED_COLOR_4),
+    (2, cv2.IMREAD_REDUCED_COLOR_2),
+)
+
+
+def read_image_size(contents: bytes) -> tuple[int, int] | None:
+    """
+    Read ``(width, height)`` from a PNG or JPEG header without decoding pixels.
+
+    Returns None when the header can't be parsed. JPEG sizes are as stored,
+    before any EXIF rotation is applied.
+    """
+    if contents.startswith(_PNG_SIGNATURE):
+        if len(contents) < 24 or contents[12:16] != b"IHDR":
+            return None
+        width, height = struct.unpack(">II", contents[16:24])
+        return width, height
+
+    if contents.startswith(b"\xff\xd8"):
+        return _read_jpeg_size(contents)
+
+    return None
+
+
+@dataclass(frozen=True)
+class DecodedImage:
+    img: cv2.typing.MatLike
+    # size of the upload after EXIF rotation, before any downscaling
+    original_width: int
+    original_height: int
+
+    @property
+    def scale(self) -> float:
+        """Factor mapping original image coordinates onto ``img``."""
+        return self.img.shape[1] / self.original_width
+
+    def resized(self, width: int) -> 'DecodedImage':
+        return DecodedImage(
+            img=imutils.resize(self.img, width=width),
+            original_width=self.original_width,
+            original_height=self.original_height,
+        )
+
+
+def decode_image(contents: bytes, target_width: int, resize: bool = True) -> DecodedImage | None:
+    """
+    Decode an upload straight to roughly ``target_width`` pixels wide.
+
+    JPEGs are decoded with libjpeg's DCT scaling (1/2, 1/4 or 1/8) when the
+    photo is large enough, which skips most of the full-resolution work and
+    memory; the result is then resized to exactly ``target_width`` unless
+    ``resize`` is False. Returns None if the bytes are not a decodable image.
+    """
+    size = read_image_size(contents)
+    flag = _choose_decode_flag(size, target_width)
+    img = cv2.imdecode(np.frombuffer(contents, np.uint8), flag)
+    if img is None:
+        return None
+
+    decoded_height, decoded_width = img.shape[:2]
+    if size is None:
+        original_width, original_height = decoded_width, decoded_height
+    elif (size[0] >= size[1]) == (decoded_width >= decoded_height):
+        original_width, original_height = size
+    else:
+        # EXIF orientation swapped the axes while decoding
+        original_height, original_width = size
+
+    decoded = DecodedImage(img=img, original_width=original_width, original_height=original_height)
+    return decoded.resized(target_width) if resize else decoded
+
+
+def _choose_decode_flag(size: tuple[int, int] | None, target_width: int) -> int:
+    if size is None:
+        return cv2.IMREAD_COLOR
+
+    # the header size is pre-EXIF-rotation, so make sure both orientations
+    # still decode to at least the target width
+    shorter_side = min(size)
+    for factor, flag in _REDUCED_DECODE_FLAGS:
+        if shorter_side // factor >= target_width:
+            return flag
+    return cv2.IMREAD_COLOR
+
+
+def _read_jpeg_size(contents: bytes) -> tuple[int, int] | None:
+    offset = 2
+    length = len(contents)
+    while offset + 4 <= length:
+        if contents[offset] != 0xFF:
+            return None
+        marker = contents[offset + 1]
+        if marker == 0xFF:
+            # fill byte before a marker
+            offset += 1
+            continue
+        if marker in _JPEG_STANDALONE_MARKERS:
+            offset += 2
+            continue
+
+        segment_length = struct.unpack(">H", contents[offset + 2:offset + 4])[0]
+        if marker in _JPEG_SOF_MARKERS:
+            if offset + 9 > length:
+                return None
+            height, width = struct.unpack(">HH", contents[offset + 5:offset + 9])
+            return width, height
+        if marker == 0xDA:
+            # start of scan without a frame header
+            return None
+        offset += 2 + segment_length
+
+    return None
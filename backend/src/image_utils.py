@@ -1,31 +1,32 @@
+from collections.abc import Sequence
+
 import cv2
-from PIL import Image
-from IPython.display import display
 
 from src import config
 from src.model.climber import Climber
 from src.model.detected_object import DetectedObject
+from src.model.hold_set import HoldSet
 from src.model.body_part import BodyPart
 from src.model.color import Color
 from src.model.point import Point
 
 
-def draw_bboxes(img: cv2.typing.MatLike, detected_objects: [DetectedObject], bbox_color: Color,
+def draw_bboxes(img: cv2.typing.MatLike, detected_objects: Sequence[DetectedObject], bbox_color: Color,
                 bbox_center_color: Color, line_width: int, draw_labels: bool = True,
                 draw_centers: bool = True, override: bool = True) -> cv2.typing.MatLike:
     if not override:
         img = img.copy()
 
-    for detected_object in detected_objects:
-        x1, y1, x2, y2 = detected_object.bbox
-
+    holds = HoldSet.from_objects(detected_objects)
+    for (x1, y1, x2, y2), (center_x, center_y), class_id in zip(holds.bboxes.tolist(), holds.centers.tolist(),
+                                                                holds.class_ids.tolist()):
         cv2.rectangle(img, (x1, y1), (x2, y2), bbox_color.bgr(), line_width)
 
         if draw_centers:
-            cv2.circle(img, detected_object.center.to_tuple(), 5, bbox_center_color.bgr(), -1)
+            cv2.circle(img, (center_x, center_y), 5, bbox_center_color.bgr(), -1)
 
         if draw_labels:
-            result_name = detected_object.class_name
+            result_name = holds.class_names[class_id]
             cv2.putText(img, result_name, (x1, y1 - 5), cv2.FONT_HERSHEY_PLAIN, 1, bbox_color.bgr(), line_width)
     return img
 
@@ -106,5 +107,9 @@ def draw_climber(img: cv2.typing.MatLike, climber: Climber, body: bool = False,
 
 
 def display_image(img: cv2.typing.MatLike) -> None:
+    # notebook-only helper, keep PIL and IPython off the API import path
+    from IPython.display import display
+    from PIL import Image
+
     preview = cv2.cvtColor(img.copy(), cv2.COLOR_BGR2RGB)  # Converting BGR to RGB
     display(Image.fromarray(preview))
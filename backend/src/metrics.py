@@ -0,0 +1,190 @@
+from __future__ import annotations
+
+import bisect
+import math
+import threading
+import time
+from collections.abc import Callable, Iterator, Sequence
+from contextlib import contextmanager
+
+DEFAULT_LATENCY_BUCKETS = (
+    0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0,
+)
+
+
+class _Metric:
+    kind = ""
+
+    def __init__(self, name: str, help_text: str, label_names: Sequence[str] = ()):
+        self.name = name
+        self.help_text = help_text
+        self.label_names = tuple(label_names)
+        self._lock = threading.Lock()
+
+    def _label_values(self, labels: dict[str, str]) -> tuple[str, ...]:
+        if set(labels) != set(self.label_names):
+            raise ValueError(f"{self.name} expects labels {self.label_names}, got {tuple(labels)}")
+        return tuple(str(labels[name]) for name in self.label_names)
+
+    def _format_labels(self, values: tuple[str, ...], extra: tuple[tuple[str, str], ...] = ()) -> str:
+        pairs = list(zip(self.label_names, values)) + list(extra)
+        if not pairs:
+            return ""
+        return "{" + ",".join(f'{name}="{_escape(value)}"' for name, value in pairs) + "}"
+
+    def render(self) -> list[str]:
+        return [f"# HELP {self.name} {self.help_text}", f"# TYPE {self.name} {self.kind}"] + self._samples()
+
+    def _samples(self) -> list[str]:
+        raise NotImplementedError
+
+
+class Counter(_Metric):
+    kind = "counter"
+
+    def __init__(self, name: str, help_text: str, label_names: Sequence[str] = ()):
+        super().__init__(name, help_text, label_names)
+        self._values: dict[tuple[str, ...], float] = {}
+
+    def inc(self, value: float = 1.0, **labels: str) -> None:
+        key = self._label_values(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0.0) + value
+
+    def value(self, **labels: str) -> float:
+        with self._lock:
+            return self._values.get(self._label_values(labels), 0.0)
+
+    def _samples(self) -> list[str]:
+        with self._lock:
+            return [f"{self.name}{self._format_labels(key)} {_format_value(value)}"
+                    for key, value in sorted(self._values.items())]
+
+
+class Gauge(_Metric):
+    """Gauge read from a callback at scrape time."""
+
+    kind = "gauge"
+
+    def __init__(self, name: str, help_text: str, read_fn: Callable[[], float]):
+        super().__init__(name, help_text)
+        self._read_fn = read_fn
+
+    def _samples(self) -> list[str]:
+        return [f"{self.name} {_format_value(self._read_fn())}"]
+
+
+class Histogram(_Metric):
+    kind = "histogram"
+
+    def __init__(self, name: str, help_text: str, label_names: Sequence[str] = (),
+                 buckets: Sequence[float] = DEFAULT_LATENCY_BUCKETS):
+        super().__init__(name, help_text, label_names)
+        self.buckets = tuple(sorted(buckets))
+        # per label set: [count per bucket..., +Inf count], sum
+        self._values: dict[tuple[str, ...], tuple[list[int], list[float]]] = {}
+
+    def observe(self, value: float, **labels: str) -> None:
+        key = self._label_values(labels)
+        index = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            counts, total = self._values.setdefault(key, ([0] * (len(self.buckets) + 1), [0.0]))
+            counts[index] += 1
+            total[0] += value
+
+    def count(self, **labels: str) -> int:
+        with self._lock:
+            values = self._values.get(self._label_values(labels))
+            return sum(values[0]) if values else 0
+
+    def _samples(self) -> list[str]:
+        lines = []
+        with self._lock:
+            for key, (counts, total) in sorted(self._values.items()):
+                cumulative = 0
+                for bound, count in zip(self.buckets + (math.inf,), counts):
+                    cumulative += count
+                    le = "+Inf" if bound == math.inf else _format_value(bound)
+                    lines.append(f"{self.name}_bucket{self._format_labels(key, (('le', le),))} {cumulative}")
+                lines.append(f"{self.name}_sum{self._format_labels(key)} {_format_value(total[0])}")
+                lines.append(f"{self.name}_count{self._format_labels(key)} {cumulative}")
+        return lines
+
+
+class MetricsRegistry:
+    def __init__(self):
+        self._metrics: list[_Metric] = []
+
+    def register(self, metric: _Metric) -> _Metric:
+        self._metrics.append(metric)
+        return metric
+
+    def render(self) -> str:
+        """Prometheus text exposition format (version 0.0.4)."""
+        lines = []
+        for metric in self._metrics:
+            lines.extend(metric.render())
+        return "\n".join(lines) + "\n"
+
+
+# observed in src/ modules, exported by api.telemetry's registry
+DETECTION_BATCH_SIZE = Histogram(
+    "detection_batch_size",
+    "Images per forward pass of the detection micro-batcher.",
+    buckets=(1, 2, 3, 4, 6, 8, 12, 16, 32),
+)
+DETECTION_BATCH_WAIT_SECONDS = Histogram(
+    "detection_batch_queue_wait_seconds",
+    "Time a detection request waited in the micro-batcher before its batch ran.",
+)
+DETECTION_BATCH_FLUSHES = Counter(
+    "detection_batch_flushes_total",
+    "Micro-batches run, by why they were closed: full (max size reached) or timeout (max wait reached).",
+    ("reason",),
+)
+
+
+class StageTimer:
+    """
+    Accumulates wall-clock seconds per named stage of one request.
+
+    Overhead is two ``perf_counter`` calls per stage. The stage that raised,
+    if any, is kept in ``failed_stage``.
+    """
+
+    def __init__(self):
+        self.stages: dict[str, float] = {}
+        self.failed_stage: str | None = None
+
+    @contextmanager
+    def stage(self, name: str) -> Iterator[None]:
+        started = time.perf_counter()
+        try:
+            yield
+        except BaseException:
+            self.failed_stage = name
+            raise
+        finally:
+            self.add(name, time.perf_counter() - started)
+
+    def add(self, name: str, seconds: float) -> None:
+        self.stages[name] = self.stages.get(name, 0.0) + seconds
+
+    def merge(self, stages: dict[str, float]) -> None:
+        for name, seconds in stages.items():
+            self.add(name, seconds)
+
+    def server_timing(self) -> str:
+        return ", ".join(f"{name};dur={seconds * 1000:.1f}" for name, seconds in self.stages.items())
+
+
+def _format_value(value: float) -> str:
+    if value == math.inf:
+        return "+Inf"
+    if float(value).is_integer():
+        return str(int(value))
+    return repr(float(value))
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
@@ -1,16 +1,85 @@
+from __future__ import annotations
+
 from typing import Optional
 
+from src.model.climber_state import ClimberState
 from src.model.color import Color
 from src.model.detected_object import DetectedObject
+from src.model.hold_set import Hold
 from src.model.point import Point
 
 
 class BodyPart:
+    """
+    A line from ``start`` to ``end``, optionally ending on a hold.
+
+    A body part is a view of one row of a :class:`ClimberState`. One built
+    here owns a one-part state; the parts of a ``Climber`` are views of the
+    climber's state, so changing them changes the climber. Points are read
+    as new :class:`Point` objects and written back by assignment.
+
+    The hold can be any ``DetectedObject``. Climbers whose holds are all
+    :class:`Hold` views of one ``HoldSet``, like the route generators'
+    positions, store them as indices into that set; other holds are kept
+    as they are.
+    """
+
+    __slots__ = ("state", "part")
+
     def __init__(self, start: Point, end: Point,
                  color: Color, thickness: int = 10,
-                 detected_object: Optional[DetectedObject] = None):
-        self.start = start
-        self.end = end
-        self.color = color
-        self.thickness = thickness
-        self.detected_object = detected_object
+                 detected_object: Optional[Hold | DetectedObject] = None):
+        self.state = ClimberState(1)
+        self.part = 0
+        self.state.joints[0] = (start.x, start.y, end.x, end.y)
+        self.state.set_style(0, (color, thickness))
+        self.state.set_hold(0, detected_object)
+
+    @staticmethod
+    def view(state: ClimberState, part: int) -> BodyPart:
+        body_part = BodyPart.__new__(BodyPart)
+        body_part.state = state
+        body_part.part = part
+        return body_part
+
+    @property
+    def start(self) -> Point:
+        x, y = self.state.joints[self.part, :2].tolist()
+        return Point(x, y)
+
+    @start.setter
+    def start(self, point: Point) -> None:
+        self.state.joints[self.part, :2] = (point.x, point.y)
+
+    @property
+    def end(self) -> Point:
+        x, y = self.state.joints[self.part, 2:].tolist()
+        return Point(x, y)
+
+    @end.setter
+    def end(self, point: Point) -> None:
+        self.state.joints[self.part, 2:] = (point.x, point.y)
+
+    @property
+    def color(self) -> Color:
+        return self.state.styles[self.part][0]
+
+    @color.setter
+    def color(self, color: Color) -> None:
+        self.state.set_style(self.part, (color, self.thickness))
+
+    @property
+    def thickness(self) -> int:
+        return self.state.styles[self.part][1]
+
+    @thickness.setter
+    def thickness(self, thickness: int) -> None:
+        self.state.set_style(self.part, (self.color, thickness))
+
+    @property
+    def detected_object(self) -> Optional[Hold | DetectedObject]:
+        return self.state.hold(self.part)
+
+    @detected_object.setter
+    def detected_object(self, detected_object: Optional[Hold | DetectedObject]) -> None:
+        self.state.set_hold(self.part, detected_object)
@@ -1,21 +1,66 @@
+from __future__ import annotations
+
+from typing import Optional
+
 from src.model.body_part import BodyPart
 from src.model.body_proportion import BodyProportion
+from src.model.climber_state import ClimberState
 from src.model.point import Point
 
+PARTS = ("head", "neck", "left_shoulder", "right_shoulder", "trunk", "left_arm", "right_arm", "left_leg", "right_leg")
+
+
+class _Part:
+    """One body part of a climber: reads give a :class:`BodyPart` view, assignments copy a part in."""
+
+    __slots__ = ("index",)
+
+    def __init__(self, name: str):
+        self.index = PARTS.index(name)
+
+    def __get__(self, climber: Climber | None, owner: type) -> Optional[BodyPart]:
+        if climber is None:
+            return self
+        if climber.state.styles[self.index] is None:
+            return None
+        return BodyPart.view(climber.state, self.index)
+
+    def __set__(self, climber: Climber, body_part: Optional[BodyPart]) -> None:
+        if body_part is None:
+            climber.state.clear(self.index)
+        else:
+            climber.state.assign(self.index, body_part.state, body_part.part)
+
 
 class Climber:
-    head: BodyPart = None
-    neck: BodyPart = None
-    left_shoulder: BodyPart = None
-    right_shoulder: BodyPart = None
-    trunk: BodyPart = None
-    left_arm: BodyPart = None
-    right_arm: BodyPart = None
-    left_leg: BodyPart = None
-    right_leg: BodyPart = None
+    """
+    A climber's position: its body proportion and a :class:`ClimberState`.
+
+    :meth:`copy` is cheap, it copies the state's small arrays and shares
+    the proportion and the holds.
+    """
+
+    __slots__ = ("body_proportion", "state")
+
+    head = _Part("head")
+    neck = _Part("neck")
+    left_shoulder = _Part("left_shoulder")
+    right_shoulder = _Part("right_shoulder")
+    trunk = _Part("trunk")
+    left_arm = _Part("left_arm")
+    right_arm = _Part("right_arm")
+    left_leg = _Part("left_leg")
+    right_leg = _Part("right_leg")
 
     def __init__(self, height: int):
         self.body_proportion = BodyProportion(height)
+        self.state = ClimberState(len(PARTS))
+
+    def copy(self) -> Climber:
+        climber = Climber.__new__(Climber)
+        climber.body_proportion = self.body_proportion
+        climber.state = self.state.copy()
+        return climber
 
     def get_top_left_point(self) -> Point:
         return self.head.start
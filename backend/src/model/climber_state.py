@@ -0,0 +1,83 @@
+from __future__ import annotations
+
+import numpy as np
+
+from src.model.color import Color
+from src.model.detected_object import DetectedObject
+from src.model.hold_set import Hold, HoldSet
+
+
+class ClimberState:
+    """
+    Where a climber's body parts are and which holds they use, as small arrays.
+
+    Row ``i`` of ``joints`` is part ``i``'s ``[start_x, start_y, end_x, end_y]``,
+    ``hold_indices`` index ``holds`` (-1 for a part on no hold) and ``styles``
+    are the parts' ``(color, thickness)``, None for a part not placed yet.
+    :meth:`copy` copies the two arrays and shares the rest: ``holds`` is the
+    detection set every position of a route uses, and ``styles`` is a tuple
+    that is replaced, never changed.
+
+    Holds that are not views of ``holds`` (plain ``DetectedObject`` objects,
+    or views of another set) are kept as they are in ``other_holds``, and a
+    part on ``other_holds[k]`` has hold index ``-2 - k``.
+    """
+
+    __slots__ = ("joints", "hold_indices", "styles", "holds", "other_holds")
+
+    def __init__(self, size: int):
+        self.joints = np.zeros((size, 4), dtype=int)
+        self.hold_indices = np.full(size, -1)
+        self.styles: tuple[tuple[Color, int] | None, ...] = (None,) * size
+        self.holds: HoldSet | None = None
+        self.other_holds: tuple[Hold | DetectedObject, ...] = ()
+
+    def copy(self) -> ClimberState:
+        state = ClimberState.__new__(ClimberState)
+        state.joints = self.joints.copy()
+        state.hold_indices = self.hold_indices.copy()
+        state.styles = self.styles
+        state.holds = self.holds
+        state.other_holds = self.other_holds
+        return state
+
+    def single_hold_set(self) -> bool:
+        """Whether every hold of the state is a view of ``holds``."""
+        return not np.any(self.hold_indices < -1)
+
+    def hold(self, part: int) -> Hold | DetectedObject | None:
+        index = int(self.hold_indices[part])
+        if index == -1:
+            return None
+        return self.holds[index] if index >= 0 else self.other_holds[-2 - index]
+
+    def set_hold(self, part: int, hold: Hold | DetectedObject | None) -> None:
+        if hold is None:
+            self.hold_indices[part] = -1
+            return
+        if isinstance(hold, Hold) and self.holds is None:
+            self.holds = hold.holds
+        if isinstance(hold, Hold) and hold.holds is self.holds:
+            self.hold_indices[part] = hold.index
+            return
+        for k, other in enumerate(self.other_holds):
+            if other is hold:
+                break
+        else:
+            k = len(self.other_holds)
+            self.other_holds += (hold,)
+        self.hold_indices[part] = -2 - k
+
+    def set_style(self, part: int, style: tuple[Color, int] | None) -> None:
+        self.styles = self.styles[:part] + (style,) + self.styles[part + 1:]
+
+    def assign(self, part: int, source: ClimberState, source_part: int) -> None:
+        """Make ``part`` a copy of ``source``'s ``source_part``."""
+        self.joints[part] = source.joints[source_part]
+        self.set_hold(part, source.hold(source_part))
+        self.set_style(part, source.styles[source_part])
+
+    def clear(self, part: int) -> None:
+        self.joints[part] = 0
+        self.hold_indices[part] = -1
+        self.set_style(part, None)
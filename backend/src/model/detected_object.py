@@ -12,3 +12,18 @@ class DetectedObject:
 
     def __eq__(self, other):
         return self.class_name == other.class_name and np.array_equal(self.bbox, other.bbox)
+
+    def to_dict(self) -> dict:
+        return {
+            "className": self.class_name,
+            "bbox": [int(value) for value in self.bbox],
+            "center": [self.center.x, self.center.y],
+        }
+
+    @staticmethod
+    def from_dict(data: dict) -> 'DetectedObject':
+        return DetectedObject(
+            class_name=data["className"],
+            bbox=np.array(data["bbox"], dtype=int),
+            center=Point(x=int(data["center"][0]), y=int(data["center"][1])),
+        )
@@ -0,0 +1,196 @@
+from __future__ import annotations
+
+from collections.abc import Callable, Hashable, Iterable, Iterator, Sequence
+from typing import Any, TypeVar
+
+import secrets
+
+import numpy as np
+
+from src.model.detected_object import DetectedObject
+from src.model.point import Point
+
+T = TypeVar("T")
+
+
+class Hold:
+    """
+    One row of a :class:`HoldSet`, usable wherever a ``DetectedObject`` is.
+
+    ``bbox`` is a view into the set's array; nothing is copied. Holds hash
+    and compare by their set's ``source`` and their ``id``, so sets of holds
+    and exclusions are O(1) and holds of different detections never match;
+    a plain ``DetectedObject`` is still compared by class and box.
+    """
+
+    __slots__ = ("holds", "index")
+
+    def __init__(self, holds: HoldSet, index: int):
+        self.holds = holds
+        self.index = index
+
+    @property
+    def id(self) -> int:
+        return int(self.holds.ids[self.index])
+
+    @property
+    def class_name(self) -> str:
+        return self.holds.class_names[self.holds.class_ids[self.index]]
+
+    @property
+    def bbox(self) -> np.ndarray:
+        return self.holds.bboxes[self.index]
+
+    @property
+    def center(self) -> Point:
+        x, y = self.holds.centers[self.index].tolist()
+        return Point(x=x, y=y)
+
+    @property
+    def confidence(self) -> float:
+        return float(self.holds.confidences[self.index])
+
+    def __eq__(self, other):
+        if isinstance(other, Hold):
+            return self.holds.source == other.holds.source and self.id == other.id
+        return self.class_name == other.class_name and np.array_equal(self.bbox, other.bbox)
+
+    def __hash__(self) -> int:
+        return hash((self.holds.source, self.id))
+
+    def __repr__(self) -> str:
+        return f"Hold(id={self.id}, class_name={self.class_name!r}, bbox={self.bbox.tolist()}, center={self.center})"
+
+    def to_dict(self) -> dict:
+        x, y = self.holds.centers[self.index].tolist()
+        return {"className": self.class_name, "bbox": self.bbox.tolist(), "center": [x, y]}
+
+
+class HoldSet(Sequence):
+    """
+    Detections of one image as contiguous arrays.
+
+    ``bboxes`` are int xyxy ``(n, 4)``, ``centers`` int xy ``(n, 2)``,
+    ``class_ids`` index ``class_names`` and ``confidences`` are NaN when
+    unknown. ``ids`` number the holds at detection time (detection order
+    by default) and ``source`` is a random token of that detection; both
+    are kept by subsets and rescaled copies, so a hold is the same hold in
+    every set derived from one detection, and only there. Planning, spatial
+    queries and rendering work on the arrays; indexing and iteration give
+    :class:`Hold` views, created once per set.
+    """
+
+    __slots__ = ("bboxes", "centers", "class_ids", "confidences", "class_names", "ids", "source", "_views",
+                 "_derived")
+
+    def __init__(self, bboxes: np.ndarray, class_ids: np.ndarray, class_names: Sequence[str],
+                 confidences: np.ndarray | None = None, centers: np.ndarray | None = None,
+                 ids: np.ndarray | None = None, source: int | None = None):
+        self.bboxes = np.asarray(bboxes, dtype=int).reshape(-1, 4)
+        self.class_ids = np.asarray(class_ids, dtype=int).reshape(-1)
+        self.class_names = tuple(class_names)
+        if confidences is None:
+            confidences = np.full(len(self.bboxes), np.nan)
+        self.confidences = np.asarray(confidences, dtype=float).reshape(-1)
+        if centers is None:
+            centers = np.rint((self.bboxes[:, :2] + self.bboxes[:, 2:]) / 2)
+        self.centers = np.asarray(centers, dtype=int).reshape(-1, 2)
+        if ids is None:
+            ids = np.arange(len(self.bboxes))
+        self.ids = np.asarray(ids, dtype=int).reshape(-1)
+        # random rather than counted, so sets made in worker processes do not collide either
+        self.source = source if source is not None else secrets.randbits(63)
+        self._views: list[Hold] | None = None
+        self._derived: dict[Hashable, Any] = {}
+
+    @staticmethod
+    def empty(class_names: Sequence[str] = ()) -> HoldSet:
+        return HoldSet(np.zeros((0, 4), dtype=int), np.zeros(0, dtype=int), class_names)
+
+    @staticmethod
+    def from_objects(objects: Iterable[DetectedObject]) -> HoldSet:
+        """
+        ``objects`` as a HoldSet; a HoldSet is returned as it is.
+
+        Holds of one detection keep their ids and source; any other mix is
+        a new detection, numbered in list order.
+        """
+        if isinstance(objects, HoldSet):
+            return objects
+        objects = list(objects)
+        sources = {obj.holds.source if isinstance(obj, Hold) else None for obj in objects}
+        source = sources.pop() if len(sources) == 1 else None
+        class_names = tuple(dict.fromkeys(obj.class_name for obj in objects))
+        class_index = {name: index for index, name in enumerate(class_names)}
+        return HoldSet(
+            bboxes=np.array([obj.bbox for obj in objects], dtype=int).reshape(-1, 4),
+            class_ids=np.array([class_index[obj.class_name] for obj in objects], dtype=int),
+            class_names=class_names,
+            confidences=np.array([getattr(obj, "confidence", np.nan) for obj in objects], dtype=float),
+            centers=np.array([(obj.center.x, obj.center.y) for obj in objects], dtype=int).reshape(-1, 2),
+            ids=[obj.id for obj in objects] if source is not None else np.arange(len(objects)),
+            source=source,
+        )
+
+    def __len__(self) -> int:
+        return len(self.bboxes)
+
+    def __getitem__(self, index):
+        if isinstance(index, (int, np.integer)):
+            return self.views()[index]
+        return self.subset(index)
+
+    def __iter__(self) -> Iterator[Hold]:
+        return iter(self.views())
+
+    def __repr__(self) -> str:
+        return f"HoldSet({len(self)} holds, class_names={self.class_names})"
+
+    def views(self) -> list[Hold]:
+        if self._views is None:
+            self._views = [Hold(self, index) for index in range(len(self))]
+        return self._views
+
+    def cached(self, key: Hashable, build: Callable[[HoldSet], T]) -> T:
+        """``build(self)``, computed once per ``key`` for this set (spatial indexes, graphs)."""
+        if key not in self._derived:
+            self._derived[key] = build(self)
+        return self._derived[key]
+
+    def id_mask(self, holds: Iterable[Hold]) -> np.ndarray:
+        """Mask of the rows that are one of ``holds``, which may come from any set of the same detection."""
+        return np.isin(self.ids, [hold.id for hold in holds if hold.holds.source == self.source])
+
+    def class_mask(self, class_name: str) -> np.ndarray:
+        if class_name not in self.class_names:
+            return np.zeros(len(self), dtype=bool)
+        return self.class_ids == self.class_names.index(class_name)
+
+    def subset(self, selection: np.ndarray | slice | Sequence[int]) -> HoldSet:
+        """A new set of the rows picked by a boolean mask, indices or a slice."""
+        return HoldSet(
+            bboxes=self.bboxes[selection],
+            class_ids=self.class_ids[selection],
+            class_names=self.class_names,
+            confidences=self.confidences[selection],
+            centers=self.centers[selection],
+            ids=self.ids[selection],
+            source=self.source,
+        )
+
+    def rescaled(self, scale_x: float, scale_y: float) -> HoldSet:
+        return HoldSet(
+            bboxes=np.rint(self.bboxes * [scale_x, scale_y, scale_x, scale_y]),
+            class_ids=self.class_ids,
+            class_names=self.class_names,
+            confidences=self.confidences,
+            centers=np.rint(self.centers * [scale_x, scale_y]),
+            ids=self.ids,
+            source=self.source,
+        )
+
+    def to_dicts(self) -> list[dict]:
+        return [
+            {"className": self.class_names[class_id], "bbox": bbox, "center": center}
+            for class_id, bbox, center in zip(self.class_ids.tolist(), self.bboxes.tolist(), self.centers.tolist())
+        ]
@@ -1,72 +1,274 @@
+from __future__ import annotations
+
 import math
+import threading
+import time
+from collections.abc import Sequence
+from dataclasses import dataclass
 from pathlib import Path
 import cv2
-from ultralytics import YOLO
 import numpy as np
 
 from src import config
+from src.detection_backends import DetectionBackend, create_backend, default_model_path, runtime_installed
+from src.detection_batcher import DetectionBatcher
+from src.detection_manifest import load_selection, weights_fingerprint
 from src.model.detected_object import DetectedObject
+from src.model.hold_set import Hold, HoldSet
 from src.model.point import Point
+from src.spatial_index import ANCHORS, hold_index, within_radius
+from src.tiling import detect_tiles, merge_tile_detections, tile_grid
+from src.yolo_ops import STRIDE
 
 
-_MODEL: YOLO | None = None
+_SETTINGS: DetectorSettings | None = None
+_BACKEND: DetectionBackend | None = None
+_BACKEND_LOCK = threading.Lock()
+_BATCHER: DetectionBatcher | None = None
+_BATCHER_LOCK = threading.Lock()
+_WARMUP_LOCK = threading.Lock()
+_WARMUP_STATUS: dict | None = None
 
 
-def _get_model() -> YOLO:
-    global _MODEL
-    if _MODEL is None:
-        model_path = Path(config.YOLO_MODEL_PATH)
-        if not model_path.exists():
-            raise FileNotFoundError(
-                f"YOLO model weights not found at {model_path}. "
-                f"Set YOLO_MODEL_PATH in backend/.env to a local .pt file."
-            )
-        _MODEL = YOLO(str(model_path))
-    return _MODEL
+@dataclass(frozen=True)
+class DetectorSettings:
+    backend: str
+    precision: str
+    # the weights or exported model the backend runs
+    model_path: Path
+    imgsz: int
+    # "config" or the manifest the settings were read from
+    source: str
+    # fingerprint of model_path when the settings were read; they are read
+    # again when the backend loads, so this is the model the process runs
+    model_fingerprint: str = ""
 
+    def cache_params(self) -> dict:
+        return {"backend": self.backend, "precision": self.precision, "imgsz": self.imgsz,
+                "model": self.model_fingerprint}
 
-def detect(img: cv2.typing.MatLike, conf: float = 0.85,
-           imgsz: int = 1216) -> [DetectedObject]:
-    model = _get_model()
 
-    results = model(
-        img,
-        device=config.YOLO_DEVICE,
-        conf=conf,
-        imgsz=imgsz,
-    )
+def settings() -> DetectorSettings:
+    global _SETTINGS
+    if _SETTINGS is None:
+        _SETTINGS = _resolve_settings()
+    return _SETTINGS
+
 
-    result = results[0]
+def _model_fingerprint(model_path: Path) -> str:
+    try:
+        return weights_fingerprint(model_path)
+    except OSError:
+        return "missing"
 
-    bboxes = np.array(result.boxes.xyxy.cpu(), dtype=int)
-    classes = np.array(result.boxes.cls.cpu(), dtype=int)
-    centers = (bboxes[:, :2] + bboxes[:, 2:]) / 2
 
-    detected_objects = []
-    for bbox, class_id, center in zip(bboxes, classes, centers):
-        detected_objects.append(DetectedObject(
-            class_name=result.names[class_id],
-            bbox=bbox,
-            center=Point(
-                x=int(round(center[0])),
-                y=int(round(center[1]))
+def _resolve_settings() -> DetectorSettings:
+    weights_path = Path(config.YOLO_MODEL_PATH)
+    backend, precision = config.DETECTION_BACKEND, config.DETECTION_PRECISION
+
+    if backend == "auto":
+        if config.DETECTION_MANIFEST_PATH:
+            manifest_path = Path(config.DETECTION_MANIFEST_PATH)
+            selection, reason = load_selection(manifest_path, weights_path)
+        else:
+            selection, reason = None, "DETECTION_MANIFEST_PATH is empty"
+        if selection is not None and not runtime_installed(selection.backend):
+            selection, reason = None, f"{manifest_path} selects {selection.backend}, which is not installed"
+        if selection is not None:
+            print(f"[objects_detector] {manifest_path} selects {selection.backend} "
+                  f"{selection.precision} at imgsz={selection.imgsz}")
+            return DetectorSettings(
+                backend=selection.backend,
+                precision=selection.precision,
+                model_path=Path(selection.model_path),
+                imgsz=selection.imgsz,
+                source=str(manifest_path),
+                model_fingerprint=_model_fingerprint(Path(selection.model_path)),
             )
-        ))
+        print(f"[objects_detector] using pytorch, no benchmark manifest: {reason}")
+        backend, precision = "pytorch", "fp32"
+
+    if config.DETECTION_MODEL_PATH:
+        model_path = Path(config.DETECTION_MODEL_PATH)
+    else:
+        model_path = default_model_path(backend, weights_path, precision)
+    return DetectorSettings(
+        backend=backend,
+        precision=precision,
+        model_path=model_path,
+        imgsz=config.YOLO_IMAGE_SIZE,
+        source="config",
+        model_fingerprint=_model_fingerprint(model_path),
+    )
+
+
+def _get_backend() -> DetectionBackend:
+    global _BACKEND, _SETTINGS
+    if _BACKEND is None:
+        with _BACKEND_LOCK:
+            if _BACKEND is None:
+                # fingerprint the weights as they are loaded, not as they were
+                # when settings() was first asked for a cache key
+                _SETTINGS = _resolve_settings()
+                # the runtime (torch, onnxruntime, openvino) is only imported here
+                _BACKEND = create_backend(_SETTINGS.backend, _SETTINGS.model_path)
+                print(f"[objects_detector] {_BACKEND.name} backend loaded {_BACKEND.model_path}")
+    return _BACKEND
+
+
+def warm_up(iterations: int = config.MODEL_WARMUP_ITERATIONS, imgsz: int | None = None) -> dict:
+    """
+    Load the model and run ``iterations`` inferences on a blank image.
+
+    Runs once per process; later calls return the first outcome. Never
+    raises, so it can serve as a worker pool initializer - failures are
+    reported in the returned status instead.
+    """
+    global _WARMUP_STATUS
+    with _WARMUP_LOCK:
+        if _WARMUP_STATUS is None:
+            started = time.perf_counter()
+            imgsz = imgsz or settings().imgsz
+            try:
+                _get_backend()
+                blank = np.full((imgsz, imgsz, 3), 114, dtype=np.uint8)
+                for _ in range(iterations):
+                    detect_batch([blank], imgsz=imgsz)
+                _WARMUP_STATUS = {"warm": True, "seconds": time.perf_counter() - started, "error": None}
+                print(f"[objects_detector] model warm after {_WARMUP_STATUS['seconds']:.2f}s "
+                      f"({iterations} warmup inferences at imgsz={imgsz})")
+            except Exception as exc:
+                print(f"[objects_detector] warmup failed: {exc}")
+                _WARMUP_STATUS = {"warm": False, "seconds": time.perf_counter() - started, "error": str(exc)}
+        return _WARMUP_STATUS
+
+
+def detect(img: cv2.typing.MatLike, conf: float = 0.85, iou: float = 0.7,
+           imgsz: int | None = None, rect: bool = config.DETECTION_RECT_INPUT,
+           min_hold_px: int = config.DETECTION_MIN_HOLD_PX,
+           probe_size: int = config.DETECTION_DETAIL_PROBE_SIZE) -> HoldSet:
+    """
+    Detect holds in ``img``; boxes are in ``img`` coordinates.
+
+    With ``min_hold_px``, ``img`` is first run at ``probe_size``. Those
+    detections are kept when their small holds already span ``min_hold_px``
+    in the network input; otherwise detection is repeated at the smallest
+    size that gets them there, at most ``imgsz``.
+    """
+    imgsz = imgsz or settings().imgsz
+    if min_hold_px <= 0 or probe_size >= imgsz:
+        return _detect_one(img, conf=conf, iou=iou, imgsz=imgsz, rect=rect)
+
+    probe = _detect_one(img, conf=conf, iou=iou, imgsz=probe_size, rect=rect)
+    img_height, img_width = img.shape[:2]
+    budget_size = detail_budget_size(probe, img_width, img_height, probe_size, imgsz, min_hold_px)
+    if budget_size == probe_size:
+        return probe
+    return _detect_one(img, conf=conf, iou=iou, imgsz=budget_size, rect=rect)
+
+
+def detect_batch(imgs: [cv2.typing.MatLike], conf: float = 0.85, iou: float = 0.7,
+                 imgsz: int | None = None, rect: bool = False) -> [HoldSet]:
+    return _get_backend().detect(list(imgs), conf=conf, iou=iou, imgsz=imgsz or settings().imgsz, rect=rect)
+
+
+def detect_tiled(img: cv2.typing.MatLike, conf: float = 0.85, iou: float = 0.7, imgsz: int | None = None,
+                 tile_size: int = config.DETECTION_TILE_SIZE, overlap: float = config.DETECTION_TILE_OVERLAP,
+                 concurrency: int = config.DETECTION_TILE_CONCURRENCY) -> HoldSet:
+    """
+    Detect holds in an image far larger than the detector input, such as a
+    wall panorama, without shrinking it: ``img`` is cut into overlapping
+    ``tile_size`` tiles, each run at ``imgsz``, and the detections are merged
+    across tiles (see :mod:`src.tiling`). Boxes are in ``img`` coordinates.
+
+    Tiles go to the backend in batches of DETECTION_BATCH_MAX_SIZE, with up
+    to ``concurrency`` batches in flight; they bypass the micro-batcher.
+    """
+    backend = _get_backend()
+    imgsz = imgsz or settings().imgsz
+    img_height, img_width = img.shape[:2]
+    tiles = tile_grid(img_width, img_height, tile_size, overlap)
+
+    def detect_raw(crops: list[cv2.typing.MatLike]) -> list:
+        return backend.detect_raw(crops, conf=conf, iou=iou, imgsz=imgsz)
+
+    batch_size = backend.fixed_batch_size or max(config.DETECTION_BATCH_MAX_SIZE, 1)
+    tile_results = detect_tiles(detect_raw, img, tiles, batch_size=batch_size, concurrency=concurrency)
+    boxes, scores, class_ids = merge_tile_detections(tiles, tile_results, img_width, img_height, iou=iou)
+    return backend.to_hold_set(boxes, scores, class_ids)
+
+
+def detail_budget_size(probe_objects: Sequence[DetectedObject], img_width: int, img_height: int,
+                       probe_size: int, max_size: int, min_hold_px: int,
+                       min_holds: int = 8, percentile: float = 10) -> int:
+    """
+    Smallest stride-aligned input size, between ``probe_size`` and
+    ``max_size``, at which the ``percentile``-th smallest hold found by the
+    probe spans ``min_hold_px`` input pixels.
+
+    Holds too small for the probe to see are not counted, so walls where
+    the probe finds fewer than ``min_holds`` go straight to ``max_size``.
+    """
+    if len(probe_objects) < min_holds:
+        return max_size
+
+    bboxes = HoldSet.from_objects(probe_objects).bboxes
+    hold_sides = np.minimum(bboxes[:, 2] - bboxes[:, 0], bboxes[:, 3] - bboxes[:, 1])
+    small_hold_side = float(np.percentile(hold_sides, percentile))
+    if small_hold_side <= 0:
+        return max_size
+
+    # input pixels per image pixel at size s is s / long side
+    required_size = min_hold_px * max(img_width, img_height) / small_hold_side
+    aligned_size = math.ceil(required_size / STRIDE) * STRIDE
+    return int(min(max(aligned_size, probe_size), max_size))
+
+
+def _detect_one(img: cv2.typing.MatLike, **params) -> HoldSet:
+    batcher = get_batcher()
+    if batcher is not None:
+        return batcher.detect(img, **params)
+    return detect_batch([img], **params)[0]
+
 
-    return detected_objects
+def get_batcher() -> DetectionBatcher | None:
+    global _BATCHER
+    if _BATCHER is None and config.DETECTION_BATCH_MAX_SIZE > 1:
+        with _BATCHER_LOCK:
+            if _BATCHER is None:
+                _BATCHER = DetectionBatcher(
+                    detect_batch_fn=detect_batch,
+                    max_batch_size=config.DETECTION_BATCH_MAX_SIZE,
+                    max_wait_ms=config.DETECTION_BATCH_MAX_WAIT_MS,
+                )
+    return _BATCHER
 
 
-def get_objects_around_point(detected_objects: [DetectedObject],
+def get_objects_around_point(detected_objects: Sequence[DetectedObject],
                              point: Point, radius: int,
-                             exclude_detected_objects: [DetectedObject] = ()
+                             exclude_detected_objects: [DetectedObject] = (),
+                             anchor: str = "top_left"
                              ) -> [DetectedObject]:
-    objects_around = []
+    """
+    Objects whose ``anchor`` - the bbox's top-left corner or its center -
+    is closer than ``radius`` to ``point``, in detection order.
 
-    for detected_object in detected_objects:
-        x1, y1, x2, y2 = detected_object.bbox
-        distance = math.sqrt((x1 - point.x) ** 2 + (y1 - point.y) ** 2)
-        if distance < radius:
-            objects_around.append(detected_object)
+    A HoldSet is queried through its cached spatial index and excludes
+    holds by id; other sequences are scanned and compared by value.
+    """
+    if isinstance(detected_objects, HoldSet):
+        indices = hold_index(detected_objects, anchor).within(point, radius)
+        if exclude_detected_objects and all(isinstance(obj, Hold) for obj in exclude_detected_objects):
+            excluded = set(exclude_detected_objects)
+            return [hold for hold in (detected_objects[index] for index in indices.tolist())
+                    if hold not in excluded]
+    elif anchor not in ANCHORS:
+        raise ValueError(f"anchor must be one of {ANCHORS}, not {anchor!r}")
+    else:
+        holds = HoldSet.from_objects(detected_objects)
+        points = holds.bboxes[:, :2] if anchor == "top_left" else holds.centers
+        indices = np.flatnonzero(within_radius(points, (point.x, point.y), radius))
+    objects_around = [detected_objects[index] for index in indices.tolist()]
 
     for exclude_detected_object in exclude_detected_objects:
         if exclude_detected_object in objects_around:
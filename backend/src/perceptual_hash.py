@@ -0,0 +1,132 @@
+from __future__ import annotations
+
+import threading
+from collections import deque
+from collections.abc import Hashable, Sequence
+from dataclasses import dataclass
+
+import cv2
+import numpy as np
+
+from src.model.detected_object import DetectedObject
+from src.model.hold_set import HoldSet
+
+
+def difference_hash(img: cv2.typing.MatLike, hash_size: int = 8) -> int:
+    """
+    64-bit difference hash (dHash) of an image.
+
+    Each bit tells whether a pixel of the ``hash_size + 1`` x ``hash_size``
+    grayscale thumbnail is brighter than its right neighbour, which is stable
+    under re-encoding, small exposure changes and slight camera shifts.
+    """
+    gray = img if len(img.shape) == 2 else cv2.cvtColor(img, cv2.COLOR_BGR2GRAY)
+    thumbnail = cv2.resize(gray, (hash_size + 1, hash_size), interpolation=cv2.INTER_AREA)
+    bits = (thumbnail[:, 1:] > thumbnail[:, :-1]).flatten()
+    return int.from_bytes(np.packbits(bits).tobytes(), "big")
+
+
+def hamming_distance(hash1: int, hash2: int) -> int:
+    return (hash1 ^ hash2).bit_count()
+
+
+def rescale_detected_objects(detected_objects: Sequence[DetectedObject],
+                             scale_x: float, scale_y: float) -> HoldSet:
+    holds = HoldSet.from_objects(detected_objects)
+    if scale_x == 1 and scale_y == 1:
+        return holds
+    return holds.rescaled(scale_x, scale_y)
+
+
+@dataclass(frozen=True)
+class _Fingerprint:
+    value: int
+    img_width: int
+    img_height: int
+    detected_objects: HoldSet
+    detector: Hashable
+
+
+@dataclass(frozen=True)
+class NearDuplicate:
+    distance: int
+    detected_objects: HoldSet
+
+
+class FingerprintIndex:
+    """
+    Bounded index of recent image fingerprints and their detections.
+
+    A lookup matches the closest stored fingerprint within ``max_distance``
+    bits whose aspect ratio is within ``max_aspect_ratio_diff`` and returns
+    its detections rescaled to the size of the new image. Only detections
+    added with the same ``detector`` key, e.g. the detector settings and
+    model fingerprint, are reused.
+    """
+
+    def __init__(self, capacity: int, max_distance: int, max_aspect_ratio_diff: float = 0.05):
+        self.capacity = capacity
+        self.max_distance = max_distance
+        self.max_aspect_ratio_diff = max_aspect_ratio_diff
+
+        self._lock = threading.Lock()
+        self._fingerprints: deque[_Fingerprint] = deque(maxlen=capacity)
+        self.lookups = 0
+        self.reuses = 0
+
+    def find(self, fingerprint: int, img_width: int, img_height: int,
+             detector: Hashable = None) -> NearDuplicate | None:
+        aspect_ratio = img_width / img_height
+        best: tuple[int, _Fingerprint] | None = None
+
+        with self._lock:
+            self.lookups += 1
+            for candidate in self._fingerprints:
+                if candidate.detector != detector:
+                    continue
+                candidate_aspect_ratio = candidate.img_width / candidate.img_height
+                if abs(candidate_aspect_ratio - aspect_ratio) > self.max_aspect_ratio_diff * aspect_ratio:
+                    continue
+                distance = hamming_distance(fingerprint, candidate.value)
+                if distance <= self.max_distance and (best is None or distance < best[0]):
+                    best = distance, candidate
+            if best is None:
+                return None
+            self.reuses += 1
+
+        distance, match = best
+        return NearDuplicate(
+            distance=distance,
+            detected_objects=rescale_detected_objects(
+                match.detected_objects,
+                scale_x=img_width / match.img_width,
+                scale_y=img_height / match.img_height,
+            ),
+        )
+
+    def add(self, fingerprint: int, img_width: int, img_height: int,
+            detected_objects: Sequence[DetectedObject], detector: Hashable = None) -> None:
+        if self.capacity <= 0:
+            return
+        with self._lock:
+            self._fingerprints.append(_Fingerprint(
+                value=fingerprint,
+                img_width=img_width,
+                img_height=img_height,
+                detected_objects=HoldSet.from_objects(detected_objects),
+                detector=detector,
+            ))
+
+    def clear(self) -> None:
+        with self._lock:
+            self._fingerprints.clear()
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "entries": len(self._fingerprints),
+                "capacity": self.capacity,
+                "maxDistance": self.max_distance,
+                "lookups": self.lookups,
+                "reuses": self.reuses,
+            }
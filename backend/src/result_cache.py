@@ -0,0 +1,185 @@
+from __future__ import annotations
+
+import hashlib
+import json
+import os
+import re
+import shutil
+import tempfile
+import threading
+from collections import OrderedDict
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any
+
+from src.model.detected_object import DetectedObject
+
+# entries are stored in disk_dir/<first two hex digits of the key>/
+_SHARD_NAME = re.compile(r"[0-9a-f]{2}")
+
+
+@dataclass(frozen=True)
+class CacheEntry:
+    detected_objects: list[DetectedObject]
+    body: bytes
+    media_type: str
+    # hash distance to the photo whose detections were reused, if any
+    near_duplicate_distance: int | None = None
+
+    def size_bytes(self) -> int:
+        # rough per-object overhead on top of the encoded image
+        return len(self.body) + 200 * len(self.detected_objects)
+
+
+class ResultCache:
+    """
+    Content-addressed cache of /boulder/generate results.
+
+    Keys combine the upload bytes and the parameters, which include the
+    planner/render parameters and the detector settings with the
+    fingerprint of the model that ran, so new weights never serve stale
+    entries. Entries live in an in-memory LRU bounded by ``max_memory_bytes``
+    and, if ``disk_dir`` is set, in an on-disk tier that survives restarts.
+    """
+
+    def __init__(self, max_memory_bytes: int, disk_dir: str | None):
+        self.max_memory_bytes = max_memory_bytes
+        self.disk_dir = Path(disk_dir) if disk_dir else None
+
+        self._lock = threading.Lock()
+        self._memory: OrderedDict[str, CacheEntry] = OrderedDict()
+        self._memory_bytes = 0
+
+        self.memory_hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def make_key(self, contents: bytes, params: dict[str, Any]) -> str:
+        digest = hashlib.sha256(contents)
+        digest.update(json.dumps(params, sort_keys=True, default=str).encode())
+        return digest.hexdigest()
+
+    def lookup(self, contents: bytes, params: dict[str, Any]) -> tuple[str, CacheEntry | None]:
+        key = self.make_key(contents, params)
+        return key, self.get(key)
+
+    def get(self, key: str) -> CacheEntry | None:
+        with self._lock:
+            entry = self._memory.get(key)
+            if entry is not None:
+                self._memory.move_to_end(key)
+                self.memory_hits += 1
+                return entry
+
+        entry = self._read_from_disk(key)
+        with self._lock:
+            if entry is None:
+                self.misses += 1
+                return None
+            self.disk_hits += 1
+            self._store_in_memory(key, entry)
+            return entry
+
+    def put(self, key: str, entry: CacheEntry) -> None:
+        with self._lock:
+            self._store_in_memory(key, entry)
+        self._write_to_disk(key, entry)
+
+    def invalidate(self) -> None:
+        """
+        Drop every entry.
+
+        On disk only the cache's own shard directories are removed, never
+        other files in ``disk_dir``, and without holding the lock, so
+        lookups go on meanwhile. Entries put while it runs may survive.
+        """
+        with self._lock:
+            self._memory.clear()
+            self._memory_bytes = 0
+        if self.disk_dir is None or not self.disk_dir.is_dir():
+            return
+        for shard in self.disk_dir.iterdir():
+            if _SHARD_NAME.fullmatch(shard.name) and shard.is_dir() and not shard.is_symlink():
+                shutil.rmtree(shard, ignore_errors=True)
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "entries": len(self._memory),
+                "memoryBytes": self._memory_bytes,
+                "maxMemoryBytes": self.max_memory_bytes,
+                "diskEnabled": self.disk_dir is not None,
+                "memoryHits": self.memory_hits,
+                "diskHits": self.disk_hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+            }
+
+    def _store_in_memory(self, key: str, entry: CacheEntry) -> None:
+        size = entry.size_bytes()
+        if size > self.max_memory_bytes:
+            return
+
+        previous = self._memory.pop(key, None)
+        if previous is not None:
+            self._memory_bytes -= previous.size_bytes()
+
+        self._memory[key] = entry
+        self._memory_bytes += size
+
+        while self._memory_bytes > self.max_memory_bytes:
+            _, evicted = self._memory.popitem(last=False)
+            self._memory_bytes -= evicted.size_bytes()
+            self.evictions += 1
+
+    def _read_from_disk(self, key: str) -> CacheEntry | None:
+        if self.disk_dir is None:
+            return None
+
+        meta_path, body_path = self._disk_paths(key)
+        try:
+            meta = json.loads(meta_path.read_text())
+            body = body_path.read_bytes()
+        except (OSError, json.JSONDecodeError):
+            return None
+
+        return CacheEntry(
+            detected_objects=[DetectedObject.from_dict(obj) for obj in meta["detectedObjects"]],
+            body=body,
+            media_type=meta["mediaType"],
+            near_duplicate_distance=meta.get("nearDuplicateDistance"),
+        )
+
+    def _write_to_disk(self, key: str, entry: CacheEntry) -> None:
+        if self.disk_dir is None:
+            return
+
+        meta_path, body_path = self._disk_paths(key)
+        meta = {
+            "detectedObjects": [obj.to_dict() for obj in entry.detected_objects],
+            "mediaType": entry.media_type,
+            "nearDuplicateDistance": entry.near_duplicate_distance,
+        }
+        try:
+            meta_path.parent.mkdir(parents=True, exist_ok=True)
+            # body first: an entry only counts once its metadata file exists
+            _write_atomically(body_path, entry.body)
+            _write_atomically(meta_path, json.dumps(meta).encode())
+        except OSError as exc:
+            print(f"[result_cache] failed to write {key}: {exc}")
+
+    def _disk_paths(self, key: str) -> tuple[Path, Path]:
+        directory = self.disk_dir / key[:2]
+        return directory / f"{key}.json", directory / f"{key}.bin"
+
+
+def _write_atomically(path: Path, data: bytes) -> None:
+    fd, tmp_path = tempfile.mkstemp(dir=path.parent, prefix=".tmp-")
+    try:
+        with os.fdopen(fd, "wb") as tmp_file:
+            tmp_file.write(data)
+        os.replace(tmp_path, path)
+    except BaseException:
+        os.unlink(tmp_path)
+        raise
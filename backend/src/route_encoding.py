@@ -0,0 +1,149 @@
+from __future__ import annotations
+
+import threading
+import time
+from dataclasses import dataclass
+
+import cv2
+import numpy as np
+
+from src import config
+
+# format name -> (media type, file extension)
+_FORMATS = {
+    "png": ("image/png", ".png"),
+    "jpeg": ("image/jpeg", ".jpg"),
+    "webp": ("image/webp", ".webp"),
+    # transparent PNG holding only the bboxes and route lines
+    "overlay": ("image/png", ".png"),
+}
+
+_ACCEPT_MEDIA_TYPES = {
+    "image/png": "png",
+    "image/jpeg": "jpeg",
+    "image/jpg": "jpeg",
+    "image/webp": "webp",
+}
+
+
+@dataclass(frozen=True)
+class OutputFormat:
+    name: str
+    quality: int | None = None
+
+    @property
+    def media_type(self) -> str:
+        return _FORMATS[self.name][0]
+
+    @property
+    def is_overlay(self) -> bool:
+        return self.name == "overlay"
+
+    def cache_key(self) -> str:
+        return self.name if self.quality is None else f"{self.name}:{self.quality}"
+
+
+def negotiate_output_format(format_name: str | None, quality: int | None,
+                            accept: str | None) -> OutputFormat:
+    """
+    Pick the output format from the ``format`` query parameter, else from
+    the ``Accept`` header, else ``config.OUTPUT_FORMAT``.
+
+    ``quality`` only applies to the lossy formats and defaults per format.
+    """
+    if format_name is not None:
+        name = format_name.lower()
+        if name == "jpg":
+            name = "jpeg"
+        if name not in _FORMATS:
+            raise ValueError(f"Unsupported output format: {format_name}")
+    else:
+        name = _format_from_accept(accept) or config.OUTPUT_FORMAT
+
+    if name == "jpeg":
+        return OutputFormat(name, quality if quality is not None else config.JPEG_QUALITY)
+    if name == "webp":
+        return OutputFormat(name, quality if quality is not None else config.WEBP_QUALITY)
+    return OutputFormat(name)
+
+
+def new_overlay_canvas(img_width: int, img_height: int) -> np.ndarray:
+    return np.zeros((img_height, img_width, 3), dtype=np.uint8)
+
+
+def encode_image(img: cv2.typing.MatLike, output_format: OutputFormat) -> bytes:
+    if output_format.is_overlay:
+        # everything drawn on the black canvas becomes opaque, the rest transparent
+        blue, green, red = cv2.split(img)
+        _, alpha = cv2.threshold(cv2.max(cv2.max(blue, green), red), 0, 255, cv2.THRESH_BINARY)
+        img = cv2.merge((blue, green, red, alpha))
+        params = []
+    elif output_format.name == "jpeg":
+        params = [cv2.IMWRITE_JPEG_QUALITY, output_format.quality]
+    elif output_format.name == "webp":
+        params = [cv2.IMWRITE_WEBP_QUALITY, output_format.quality]
+    else:
+        params = []
+
+    ok, encoded = cv2.imencode(_FORMATS[output_format.name][1], img, params)
+    if not ok:
+        raise ValueError(f"Failed to encode image as {output_format.name}")
+    return encoded.tobytes()
+
+
+def timed_encode(img: cv2.typing.MatLike, output_format: OutputFormat) -> tuple[bytes, float]:
+    started = time.perf_counter()
+    body = encode_image(img, output_format)
+    return body, time.perf_counter() - started
+
+
+def _format_from_accept(accept: str | None) -> str | None:
+    if not accept:
+        return None
+
+    best_name, best_q = None, 0.0
+    for media_range in accept.split(","):
+        media_type, *params = [part.strip() for part in media_range.split(";")]
+        name = _ACCEPT_MEDIA_TYPES.get(media_type.lower())
+        if name is None:
+            continue
+        q = 1.0
+        for param in params:
+            if param.startswith("q="):
+                try:
+                    q = float(param[2:])
+                except ValueError:
+                    q = 0.0
+        if q > best_q:
+            best_name, best_q = name, q
+    return best_name
+
+
+class EncodingStats:
+    """Per-format encode time and payload size, to pick sensible defaults."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._formats: dict[str, dict[str, float]] = {}
+
+    def record(self, output_format: OutputFormat, seconds: float, size_bytes: int) -> None:
+        with self._lock:
+            stats = self._formats.setdefault(output_format.cache_key(), {
+                "count": 0, "seconds": 0.0, "maxSeconds": 0.0, "bytes": 0,
+            })
+            stats["count"] += 1
+            stats["seconds"] += seconds
+            stats["maxSeconds"] = max(stats["maxSeconds"], seconds)
+            stats["bytes"] += size_bytes
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                key: {
+                    "count": int(stats["count"]),
+                    "meanEncodeMs": 1000 * stats["seconds"] / stats["count"],
+                    "maxEncodeMs": 1000 * stats["maxSeconds"],
+                    "meanBytes": stats["bytes"] / stats["count"],
+                }
+                for key, stats in self._formats.items()
+            }
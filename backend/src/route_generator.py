@@ -1,23 +1,76 @@
-import copy
+from __future__ import annotations
+
+import time
+from dataclasses import dataclass
 
 import numpy as np
 
 from src.aruco_marker import ArucoMarker
 from src.model.body_part import BodyPart
-from src.model.climber import Climber
+from src.model.climber import PARTS, Climber
 from src.model.color import Color
 from src.model.detected_object import DetectedObject
+from src.model.hold_set import HoldSet
 from src import objects_detector, config
 from src.model.point import Point
+from src.route_scoring import LIMBS, COMFORTABLE_REACH, posture_cost, route_cost
+from src.spatial_index import ANCHORS, hold_index
+
+
+@dataclass(frozen=True)
+class AnytimeRoute:
+    positions: list[Climber]
+    cost: float
+    # no search state was dropped and no candidate hold cut by branching,
+    # so a longer deadline would give the same route
+    exhaustive: bool
+    # beam width of the last search that finished before the deadline
+    beam_width: int
+    seconds: float
+
+    def to_dict(self) -> dict:
+        return {
+            "cost": round(self.cost, 1),
+            "exhaustive": self.exhaustive,
+            "beamWidth": self.beam_width,
+            "seconds": round(self.seconds, 4),
+        }
+
+
+@dataclass(frozen=True)
+class _BeamSearch:
+    # a state was dropped from the beam at some point
+    pruned: bool
+    # some foot or hand placement was left out of a position's branching best
+    capped: bool = False
+    positions: list[Climber] | None = None
+    cost: float = 0.0
+    timed_out: bool = False
+    failure: str | None = None
+
+
+# first steps paired with second steps per deadline check
+_STEP_BATCH = 64
+
+
+class _DeadlinePassed(Exception):
+    pass
+
+
+def _check_deadline(deadline: float | None) -> None:
+    if deadline is not None and time.perf_counter() > deadline:
+        raise _DeadlinePassed
 
 
 class RouteGenerator:
     def __init__(self, img_width: int, img_height: int, marker: ArucoMarker,
-                 detected_objects: [DetectedObject]):
+                 detected_objects: [DetectedObject], rng: np.random.Generator | None = None):
+        """Holds are drawn from ``rng``; without one, from the global ``np.random`` state."""
         self.__img_width = img_width
         self.__img_height = img_height
         self.__marker = marker
-        self.__detected_objects = detected_objects
+        self.__detected_objects = HoldSet.from_objects(detected_objects)
+        self.__rng = rng if rng is not None else np.random
 
     def generate_route(self, climber_height_in_cm: int,
                        starting_steps_max_distance_from_ground_in_cm: int) -> [Climber]:
@@ -31,9 +84,131 @@ class RouteGenerator:
 
         return positions
 
+    def generate_route_beam(self, climber_height_in_cm: int, starting_steps_max_distance_from_ground_in_cm: int,
+                            beam_width: int = 8, branching: int = 4, max_moves: int = 40) -> [Climber]:
+        """
+        Deterministic alternative to :meth:`generate_route`: a beam search over positions.
+
+        Each position is expanded into up to ``branching`` foot placements,
+        ranked by stance, each with up to ``branching`` hand placements,
+        ranked by reach. A route costs its moves' :func:`route_cost` plus
+        the :func:`posture_cost` of every position. Positions on the same
+        four holds are one state, whose cheapest route is kept, and the
+        ``beam_width`` cheapest states are expanded further. Returns the
+        cheapest route among the first ones to reach the top, so at most
+        ``max_moves`` rounds of ``beam_width * branching ** 2`` positions
+        are tried; raises ``ValueError`` when no route gets there.
+        """
+        search = self.__beam_search(climber_height_in_cm, starting_steps_max_distance_from_ground_in_cm,
+                                    beam_width, branching, max_moves)
+        if search.positions is None:
+            raise ValueError(search.failure)
+        return search.positions
+
+    def generate_route_anytime(self, climber_height_in_cm: int, starting_steps_max_distance_from_ground_in_cm: int,
+                               deadline_ms: float, branching: int = 4, max_moves: int = 40,
+                               max_beam_width: int = 64) -> AnytimeRoute:
+        """
+        The cheapest route :meth:`generate_route_beam` finds within ``deadline_ms``.
+
+        Beam searches run with widths 1, 2, 4, ... up to ``max_beam_width``,
+        each keeping the best route so far if it finds a cheaper one, until
+        the deadline passes or a search drops no state: a wider beam would
+        find the same route. That search is exhaustive when no placement was
+        left out by ``branching`` either. A search that is
+        still running at the deadline is abandoned, so the search overruns
+        it by at most the placement of one stance or the pairing of one
+        batch of steps. Raises ``TimeoutError`` when the deadline passes
+        before any route is found, ``ValueError`` when there is none.
+
+        The deadline covers the search: the spatial indexes and views of
+        the holds, built once per set (and SciPy, loaded once per process),
+        are made ready before the clock starts.
+        """
+        for anchor in ANCHORS:
+            hold_index(self.__detected_objects, anchor)
+        self.__detected_objects.views()
+
+        started = time.perf_counter()
+        deadline = started + deadline_ms / 1000
+        best = None
+        beam_width = completed_width = 1
+        while True:
+            search = self.__beam_search(climber_height_in_cm, starting_steps_max_distance_from_ground_in_cm,
+                                        beam_width, branching, max_moves, deadline)
+            if search.timed_out:
+                break
+            completed_width = beam_width
+            if search.positions is not None and (best is None or search.cost < best.cost):
+                best = search
+            if not search.pruned or beam_width >= max_beam_width:
+                break
+            beam_width = min(2 * beam_width, max_beam_width)
+
+        if best is None and search.timed_out:
+            raise TimeoutError(f"No route found within {deadline_ms:g} ms")
+        if best is None:
+            raise ValueError(search.failure)
+        return AnytimeRoute(
+            positions=best.positions,
+            cost=best.cost,
+            exhaustive=not search.timed_out and not search.pruned and not search.capped,
+            beam_width=completed_width,
+            seconds=time.perf_counter() - started,
+        )
+
+    def __beam_search(self, climber_height_in_cm: int, starting_steps_max_distance_from_ground_in_cm: int,
+                      beam_width: int, branching: int, max_moves: int, deadline: float | None = None) -> _BeamSearch:
+        """See :meth:`generate_route_beam`; gives up once ``time.perf_counter()`` passes ``deadline``."""
+        climber = Climber(self.__marker.convert_cm_to_px(climber_height_in_cm))
+        bottom_objects = self.__get_bottom_objects_fit_as_steps(starting_steps_max_distance_from_ground_in_cm)
+        pruned = False
+        try:
+            first_positions, capped = self.__candidate_positions(climber, bottom_objects, bottom_objects, branching,
+                                                                 deadline)
+            beam, pruned = self.__cheapest_states([(posture_cost(position), [position])
+                                                   for position in first_positions], beam_width)
+
+            for _ in range(max_moves + 1):
+                if not beam:
+                    return _BeamSearch(pruned=pruned, capped=capped,
+                                       failure="No holds available to continue the route")
+                on_top = [route for route in beam if self.__is_climber_on_top(route[1][-1])]
+                if on_top:
+                    cost, positions = on_top[0]
+                    return _BeamSearch(pruned=pruned, capped=capped, positions=positions, cost=cost)
+
+                expanded = []
+                for cost, positions in beam:
+                    holds_for_first_step, holds_for_second_step = self.__next_step_holds(positions[-1])
+                    next_positions, cut = self.__candidate_positions(positions[-1], holds_for_first_step,
+                                                                     holds_for_second_step, branching, deadline)
+                    capped = capped or cut
+                    for position in next_positions:
+                        position_cost = route_cost([positions[-1], position]) + posture_cost(position)
+                        expanded.append((cost + position_cost, positions + [position]))
+                beam, dropped = self.__cheapest_states(expanded, beam_width)
+                pruned = pruned or dropped
+        except _DeadlinePassed:
+            return _BeamSearch(pruned=pruned, timed_out=True)
+
+        return _BeamSearch(pruned=pruned, capped=capped,
+                           failure=f"No route reaches the top within {max_moves} moves")
+
     def prepare_next_position(self, climber: Climber) -> Climber:
-        new_climber = copy.deepcopy(climber)
+        new_climber = climber.copy()
+        holds_for_first_foot, holds_for_second_foot = self.__next_step_holds(climber)
+
+        self.__prepare_new_position(
+            climber=new_climber,
+            holds_for_first_step=holds_for_first_foot,
+            holds_for_second_step=holds_for_second_foot
+        )
+
+        return new_climber
 
+    def __next_step_holds(self, climber: Climber) -> tuple[np.ndarray, np.ndarray]:
+        """Indices of the holds for the first and the second foot of the move after ``climber``."""
         lower_step_point = climber.get_lower_step_point()
 
         twenty_percent_of_climber_leg_height = climber.body_proportion.leg * 0.2
@@ -60,19 +235,17 @@ class RouteGenerator:
             rectangle_bottom_left_point.x -= extra_width // 2
             rectangle_top_right_point.x += extra_width // 2
 
-        holds_for_first_foot = [hold for hold in self.__detected_objects if
-                                rectangle_bottom_left_point.x <= hold.center.x <= rectangle_top_right_point.x and rectangle_bottom_left_point.y >= hold.center.y >= rectangle_top_right_point.y]
+        centers_index = hold_index(self.__detected_objects, anchor="center")
+        holds_for_first_foot = centers_index.in_y_band(rectangle_top_right_point.y, rectangle_bottom_left_point.y)
+        first_foot_x = self.__detected_objects.centers[holds_for_first_foot, 0]
+        holds_for_first_foot = holds_for_first_foot[
+            (rectangle_bottom_left_point.x <= first_foot_x) & (first_foot_x <= rectangle_top_right_point.x)
+        ]
 
-        holds_for_second_foot = [hold for hold in self.__detected_objects if
-                                 twenty_percent_of_climber_leg_height_point.y >= hold.center.y >= forty_percent_of_climber_leg_height_point.y]
+        holds_for_second_foot = centers_index.in_y_band(forty_percent_of_climber_leg_height_point.y,
+                                                        twenty_percent_of_climber_leg_height_point.y)
 
-        self.__prepare_new_position(
-            climber=new_climber,
-            holds_for_first_step=holds_for_first_foot,
-            holds_for_second_step=holds_for_second_foot
-        )
-
-        return new_climber
+        return holds_for_first_foot, holds_for_second_foot
 
     def prepare_first_position(self, climber_height_in_cm: int,
                                starting_steps_max_distance_from_ground_in_cm: int) -> Climber:
@@ -92,21 +265,32 @@ class RouteGenerator:
         return climber
 
     def __prepare_new_position(self, climber: Climber,
-                               holds_for_first_step: [DetectedObject],
-                               holds_for_second_step: [DetectedObject]) -> None:
-        if not holds_for_first_step or not holds_for_second_step:
+                               holds_for_first_step: np.ndarray,
+                               holds_for_second_step: np.ndarray) -> None:
+        """``holds_for_*_step`` are indices into the detected holds."""
+        if not len(holds_for_first_step) or not len(holds_for_second_step):
             raise ValueError("No holds available to place starting steps")
 
-        starting_step_1_id = np.random.choice(len(holds_for_first_step), 1, replace=False)[0]
-        starting_step_1 = holds_for_first_step[starting_step_1_id]
+        starting_step_1_id = self.__rng.choice(len(holds_for_first_step), 1, replace=False)[0]
+        starting_step_1 = self.__detected_objects[int(holds_for_first_step[starting_step_1_id])]
 
         starting_step_2 = self.__find_hold_in_circle(
-            detected_objects=holds_for_second_step,
+            candidates=holds_for_second_step,
             point=starting_step_1.center,
             radius=self.__marker.convert_cm_to_px(config.STEP_RADIUS_IN_CM),
             exclude_detected_objects=[starting_step_1]
         )
 
+        body_center = self.__place_body(climber, starting_step_1, starting_step_2)
+
+        climber.left_arm = self.__find_hold_for_left_arm(
+            climber, body_center)
+        climber.right_arm = self.__find_hold_for_right_arm(
+            climber, body_center)
+
+    def __place_body(self, climber: Climber, starting_step_1: DetectedObject,
+                     starting_step_2: DetectedObject) -> int:
+        """Stand ``climber`` on the two steps, arms not placed yet; returns the body center x."""
         if starting_step_1.center.x < starting_step_2.center.x:
             starting_left_step = starting_step_1
             starting_right_step = starting_step_2
@@ -216,21 +400,127 @@ class RouteGenerator:
             detected_object=starting_right_step
         )
 
-        climber.left_arm = self.__find_hold_for_left_arm(
-            climber, body_center)
-        climber.right_arm = self.__find_hold_for_right_arm(
-            climber, body_center)
-
-    def __get_bottom_objects_fit_as_steps(self, max_distance_from_ground_in_cm: int) -> [DetectedObject]:
+        return body_center
+
+    def __candidate_positions(self, climber: Climber, holds_for_first_step: np.ndarray,
+                              holds_for_second_step: np.ndarray, branching: int,
+                              deadline: float | None = None) -> tuple[list[Climber], bool]:
+        """
+        Up to ``branching`` best foot placements times ``branching`` best hand placements.
+
+        Also returns whether any placement was left out by ``branching``.
+
+        The second foot is in step reach of the first, as in
+        :meth:`__find_hold_in_circle`; feet are ranked by how close their
+        distance is to shoulder width, hands by how close they are to a
+        comfortable reach. Raises ``_DeadlinePassed`` once
+        ``time.perf_counter()`` passes ``deadline``.
+        """
+        holds = self.__detected_objects
+        _check_deadline(deadline)
+        if not len(holds_for_first_step) or not len(holds_for_second_step):
+            return [], False
+
+        positions = []
+        stances, capped = self.__best_stances(climber, holds_for_first_step, holds_for_second_step, branching,
+                                              deadline)
+        for first, second in stances:
+            _check_deadline(deadline)
+            standing = climber.copy()
+            body_center = self.__place_body(standing, holds[first], holds[second])
+            left_hands = self.__holds_in_arm_reach(standing, standing.left_shoulder.start,
+                                                   lambda x: x < body_center)
+            right_hands = self.__holds_in_arm_reach(standing, standing.right_shoulder.end,
+                                                    lambda x: x > body_center)
+            hands = sorted(
+                ((left_cost + right_cost, left, right)
+                 for left_cost, left in left_hands[:branching] for right_cost, right in right_hands[:branching]),
+                key=lambda hand: hand[0],
+            )
+            capped = capped or max(len(left_hands), len(right_hands), len(hands)) > branching
+            for _, left, right in hands[:branching]:
+                position = standing.copy()
+                position.left_arm = BodyPart(start=standing.left_shoulder.start, end=left.center, color=Color.red(),
+                                             thickness=10, detected_object=left)
+                position.right_arm = BodyPart(start=standing.right_shoulder.end, end=right.center,
+                                              color=Color.red(), thickness=10, detected_object=right)
+                positions.append(position)
+        return positions, capped
+
+    def __best_stances(self, climber: Climber, holds_for_first_step: np.ndarray, holds_for_second_step: np.ndarray,
+                       branching: int, deadline: float | None = None) -> tuple[list[list[int]], bool]:
+        """
+        The ``branching`` foot pairs closest to shoulder width apart, ties in the order they are found,
+        and whether there were more.
+
+        Feet are paired a batch of first steps at a time, checking ``deadline``
+        in between, and only the pairs that can make the cut are sorted.
+        """
+        holds = self.__detected_objects
+        is_second_step = np.zeros(len(holds), dtype=bool)
+        is_second_step[holds_for_second_step] = True
+        step_radius = self.__marker.convert_cm_to_px(config.STEP_RADIUS_IN_CM)
+
+        in_reach = []
+        for start in range(0, len(holds_for_first_step), _STEP_BATCH):
+            _check_deadline(deadline)
+            batch = holds_for_first_step[start:start + _STEP_BATCH]
+            in_reach += hold_index(holds).within_many(holds.centers[batch], step_radius, is_second_step)
+        firsts = np.repeat(holds_for_first_step, [len(seconds) for seconds in in_reach])
+        seconds = np.concatenate(in_reach).astype(int)
+        firsts, seconds = firsts[firsts != seconds], seconds[firsts != seconds]
+        stances = np.linalg.norm((holds.centers[firsts] - holds.centers[seconds]).astype(float), axis=1)
+        comfort = np.abs(stances - 2 * climber.body_proportion.shoulder)
+
+        # every pair is found at most twice, once from each foot, so the
+        # 2 * branching most comfortable rows hold the best branching pairs
+        rows = np.arange(len(comfort))
+        if len(comfort) > 2 * branching:
+            rows = np.flatnonzero(comfort <= np.partition(comfort, 2 * branching - 1)[2 * branching - 1])
+        rows = rows[np.argsort(comfort[rows], kind="stable")]
+        _check_deadline(deadline)
+        # a pair of holds is one stance whichever foot comes first
+        pairs = np.sort(np.column_stack([firsts[rows], seconds[rows]]), axis=1)
+        _, first_seen = np.unique(pairs, axis=0, return_index=True)
+        capped = len(comfort) > 2 * branching or len(first_seen) > branching
+        return pairs[np.sort(first_seen)][:branching].tolist(), capped
+
+    def __holds_in_arm_reach(self, climber: Climber, shoulder: Point, on_side) -> list:
+        """``(cost, hold)`` of the holds a hand can reach from ``shoulder``, most comfortable first."""
+        arm = climber.body_proportion.arm
+        holds = objects_detector.get_objects_around_point(
+            detected_objects=self.__detected_objects,
+            point=shoulder,
+            radius=int(round(arm))
+        )
+        reachable = [
+            (abs(float(np.hypot(hold.center.x - shoulder.x, hold.center.y - shoulder.y)) - COMFORTABLE_REACH * arm),
+             hold)
+            for hold in holds if on_side(hold.center.x)
+        ]
+        return sorted(reachable, key=lambda reach: reach[0])
+
+    def __cheapest_states(self, routes: list, beam_width: int) -> tuple[list, bool]:
+        """The ``beam_width`` cheapest ``(cost, positions)``, one per set of held holds, and whether any was dropped."""
+        limb_rows = [PARTS.index(limb) for limb in LIMBS]
+        states = {}
+        for cost, positions in routes:
+            key = tuple(self.__detected_objects.ids[positions[-1].state.hold_indices[limb_rows]].tolist())
+            if key not in states or cost < states[key][0]:
+                states[key] = (cost, positions)
+        return sorted(states.values(), key=lambda route: route[0])[:beam_width], len(states) > beam_width
+
+    def __get_bottom_objects_fit_as_steps(self, max_distance_from_ground_in_cm: int) -> np.ndarray:
         max_distance_from_ground_in_px = (
             self.__marker.convert_cm_to_px(max_distance_from_ground_in_cm))
 
         # 40 cm of bottom boxes from image but exclude from left and right 15%
-        return [obj for obj in self.__detected_objects if
-                obj.bbox[3] > self.__img_height - max_distance_from_ground_in_px and
-                obj.bbox[0] > 0.15 * self.__img_width and
-                obj.bbox[2] < 0.85 * self.__img_width
-                ]
+        bboxes = self.__detected_objects.bboxes
+        return np.flatnonzero(
+            (bboxes[:, 3] > self.__img_height - max_distance_from_ground_in_px) &
+            (bboxes[:, 0] > 0.15 * self.__img_width) &
+            (bboxes[:, 2] < 0.85 * self.__img_width)
+        )
 
     def __find_hold_for_left_arm(self, climber: Climber,
                                  body_center: int) -> BodyPart:
@@ -249,7 +539,7 @@ class RouteGenerator:
         if not holds:
             raise ValueError("No holds available for left arm")
 
-        random_left_arm_hold_id = np.random.choice(len(holds), 1, replace=False)[0]
+        random_left_arm_hold_id = self.__rng.choice(len(holds), 1, replace=False)[0]
         random_left_arm_hold = holds[random_left_arm_hold_id]
 
         return BodyPart(
@@ -277,7 +567,7 @@ class RouteGenerator:
         if not holds:
             raise ValueError("No holds available for right arm")
 
-        random_right_arm_hold_id = np.random.choice(len(holds), 1, replace=False)[0]
+        random_right_arm_hold_id = self.__rng.choice(len(holds), 1, replace=False)[0]
         random_right_arm_hold = holds[random_right_arm_hold_id]
 
         return BodyPart(
@@ -288,21 +578,26 @@ class RouteGenerator:
             detected_object=random_right_arm_hold
         )
 
-    def __find_hold_in_circle(self, detected_objects: [DetectedObject],
+    def __find_hold_in_circle(self, candidates: np.ndarray,
                               point: Point, radius: int,
                               exclude_detected_objects: [DetectedObject] = ()
                               ) -> DetectedObject:
-        holds_in_circle = objects_detector.get_objects_around_point(
-            detected_objects=detected_objects,
-            point=point,
-            radius=radius,
-            exclude_detected_objects=exclude_detected_objects
-        )
+        is_candidate = np.zeros(len(self.__detected_objects), dtype=bool)
+        is_candidate[candidates] = True
+        holds_in_circle = [
+            hold for hold in objects_detector.get_objects_around_point(
+                detected_objects=self.__detected_objects,
+                point=point,
+                radius=radius,
+                exclude_detected_objects=exclude_detected_objects
+            )
+            if is_candidate[hold.index]
+        ]
 
         if not holds_in_circle:
             raise ValueError("No holds available in reach")
 
-        object_detect_id = np.random.choice(len(holds_in_circle), 1, replace=False)[0]
+        object_detect_id = self.__rng.choice(len(holds_in_circle), 1, replace=False)[0]
         return holds_in_circle[object_detect_id]
 
     def __is_climber_on_top(self, climber: Climber) -> bool:
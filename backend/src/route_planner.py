@@ -1,8 +1,18 @@
 from __future__ import annotations
 
 from collections.abc import Sequence
+from dataclasses import dataclass
+
+import numpy as np
 
 from src.model.detected_object import DetectedObject
+from src.model.hold_set import HoldSet
+from src.spatial_index import hold_index
+
+# extra cost of a hold per earlier route using it, in step-score units (a good step scores ~0.05)
+_REUSE_PENALTY = 0.1
+# cheapest penalized routes checked against max_shared_ratio for every further diverse route
+_DIVERSE_CANDIDATES = 16
 
 
 def plan_bottom_to_top_route(
@@ -32,60 +42,316 @@ def plan_bottom_to_top_route(
     if not detected_objects:
         raise ValueError("No holds detected")
 
-    holds = [obj for obj in detected_objects if obj.class_name == "hold"]
-    if not holds:
-        holds = list(detected_objects)
-
-    side_min_x = int(round(img_width * side_margin_ratio))
-    side_max_x = int(round(img_width * (1.0 - side_margin_ratio)))
-    central_holds = [h for h in holds if side_min_x <= h.center.x <= side_max_x]
-    if len(central_holds) >= 3:
-        holds = central_holds
+    all_holds = HoldSet.from_objects(detected_objects)
+    centers_x, centers_y = all_holds.centers.T
+    pool = _hold_pool(all_holds, img_width, side_margin_ratio)
 
     top_y = int(round(img_height * top_margin_ratio))
-    bottom_y = int(round(img_height * (1.0 - bottom_region_ratio)))
     min_gain_px = max(1, int(round(img_height * min_vertical_gain_ratio)))
+    start_pool = _start_pool(all_holds, pool, img_height, bottom_region_ratio)
 
-    start_candidates = [h for h in holds if h.center.y >= bottom_y]
-    if not start_candidates:
-        start_candidates = holds
+    # everything below works on the pool's arrays, one vector expression per step
+    pool_x, pool_y, pool_ids = centers_x[pool], centers_y[pool], all_holds.ids[pool]
+    start = int(np.flatnonzero(pool == start_pool[np.argmax(centers_y[start_pool])])[0])
+    route = [start]
+    used = pool_ids == pool_ids[start]
 
-    start = max(start_candidates, key=lambda h: h.center.y)
-    route: list[DetectedObject] = [start]
-    used = {_obj_key(start)}
-
-    while route[-1].center.y > top_y and len(route) < max_holds:
-        current = route[-1]
+    while pool_y[route[-1]] > top_y and len(route) < max_holds:
+        current_x, current_y = pool_x[route[-1]], pool_y[route[-1]]
         remaining_budget = max_holds - len(route)
-        desired_gain = (current.center.y - top_y) / max(1, remaining_budget)
+        desired_gain = (current_y - top_y) / max(1, remaining_budget)
+
+        gains = current_y - pool_y
+        candidates = ~used & (gains >= min_gain_px)
+        if not candidates.any():
+            break
+
+        scores = (np.abs(gains - desired_gain) / img_height) + (0.75 * np.abs(pool_x - current_x) / img_width)
+        # argmin picks the first of equal scores, in detection order
+        best = int(np.argmin(np.where(candidates, scores, np.inf)))
+        route.append(best)
+        used |= pool_ids == pool_ids[best]
+
+    if pool_y[route[-1]] > top_y and len(route) < max_holds and not used.all():
+        finish = int(np.argmin(np.where(used, np.iinfo(pool_y.dtype).max, pool_y)))
+        if pool_y[finish] < pool_y[route[-1]]:
+            route.append(finish)
+
+    # the original objects, so callers can match route holds by identity
+    return [detected_objects[index] for index in pool[route].tolist()]
+
+
+@dataclass(frozen=True)
+class RankedRoute:
+    holds: list[DetectedObject]
+    # sum of the step scores of plan_bottom_to_top_route, lower is better
+    cost: float
+
+
+def plan_best_routes(
+    detected_objects: Sequence[DetectedObject],
+    *,
+    img_width: int,
+    img_height: int,
+    count: int = 1,
+    max_holds: int = 12,
+    top_margin_ratio: float = 0.12,
+    side_margin_ratio: float = 0.10,
+    bottom_region_ratio: float = 0.20,
+    min_vertical_gain_ratio: float = 0.04,
+    reach_ratio: float = 0.20,
+) -> list[RankedRoute]:
+    """
+    Up to ``count`` cheapest bottom-to-top routes, best first.
+
+    Holds and margins are chosen like :func:`plan_bottom_to_top_route` and a
+    step costs what that planner's score gives it, but instead of committing
+    to the best next hold this searches every route in a reachability graph:
+    each hold links to the holds at least the minimum gain above it and
+    closer than ``reach_ratio`` of the image height. Routes start at any
+    hold of the bottom region and end at the first hold above the top
+    margin; when none is reachable, they end at the highest reachable hold.
+    The routes differ in at least one hold or in their order.
+
+    The graph is built once per detection set and kept with it, so asking
+    again for more routes or another ``max_holds`` only reruns the search.
+    """
+    graph = _planning_graph(detected_objects, img_width, img_height, max_holds, count, side_margin_ratio,
+                            bottom_region_ratio, min_vertical_gain_ratio, reach_ratio)
+    top_y = int(round(img_height * top_margin_ratio))
+    ranked = _k_best_paths(graph, top_y=top_y, max_holds=max_holds, img_width=img_width, img_height=img_height,
+                           count=count)
+    return [_ranked_route(detected_objects, graph, path, cost) for path, cost in ranked]
+
+
+def plan_diverse_routes(
+    detected_objects: Sequence[DetectedObject],
+    *,
+    img_width: int,
+    img_height: int,
+    count: int = 3,
+    max_shared_ratio: float = 0.5,
+    max_holds: int = 12,
+    top_margin_ratio: float = 0.12,
+    side_margin_ratio: float = 0.10,
+    bottom_region_ratio: float = 0.20,
+    min_vertical_gain_ratio: float = 0.04,
+    reach_ratio: float = 0.20,
+) -> list[RankedRoute]:
+    """
+    Up to ``count`` cheap routes that share few holds, cheapest first.
+
+    The first route is the best one of :func:`plan_best_routes`. Each further
+    route is searched with the holds of the routes before it made more
+    expensive, and must share at most ``max_shared_ratio`` of its holds with
+    each of them; planning stops early when no such route is found.
 
-        candidates: list[DetectedObject] = [
-            h for h in holds
-            if _obj_key(h) not in used and (current.center.y - h.center.y) >= min_gain_px
+    All searches run on the one cached reachability graph, so the hold pool,
+    the start holds and the distances between holds are computed once for
+    all routes. Costs are reported without the reuse penalty.
+    """
+    graph = _planning_graph(detected_objects, img_width, img_height, max_holds, count, side_margin_ratio,
+                            bottom_region_ratio, min_vertical_gain_ratio, reach_ratio)
+    top_y = int(round(img_height * top_margin_ratio))
+    penalty = np.zeros(len(graph.pool))
+    routes: list[tuple[np.ndarray, float]] = []
+    while len(routes) < count:
+        candidates = _k_best_paths(graph, top_y=top_y, max_holds=max_holds, img_width=img_width,
+                                   img_height=img_height, count=_DIVERSE_CANDIDATES if routes else 1,
+                                   hold_penalty=penalty)
+        diverse = [
+            (path, cost) for path, cost in candidates
+            if all(np.isin(path, earlier).mean() <= max_shared_ratio for earlier, _ in routes)
         ]
-        if not candidates:
+        if not diverse:
             break
+        path, cost = diverse[0]
+        routes.append((path, cost - penalty[path].sum()))
+        penalty[path] += _REUSE_PENALTY
+    # the first route is the cheapest of all, later ones may come out in any order
+    routes.sort(key=lambda route: route[1])
+    return [_ranked_route(detected_objects, graph, path, cost) for path, cost in routes]
 
-        def score(candidate: DetectedObject) -> float:
-            gain = current.center.y - candidate.center.y
-            dx = abs(candidate.center.x - current.center.x)
-            return (abs(gain - desired_gain) / img_height) + (0.75 * dx / img_width)
 
-        best = min(candidates, key=score)
-        route.append(best)
-        used.add(_obj_key(best))
+def _planning_graph(detected_objects: Sequence[DetectedObject], img_width: int, img_height: int, max_holds: int,
+                    count: int, side_margin_ratio: float, bottom_region_ratio: float, min_vertical_gain_ratio: float,
+                    reach_ratio: float) -> ReachGraph:
+    if img_width <= 0 or img_height <= 0:
+        raise ValueError("Invalid image dimensions")
+    if max_holds < 2:
+        raise ValueError("max_holds must be >= 2")
+    if count < 1:
+        raise ValueError("count must be >= 1")
+
+    if not detected_objects:
+        raise ValueError("No holds detected")
+
+    return reach_graph(HoldSet.from_objects(detected_objects), img_width=img_width, img_height=img_height,
+                       side_margin_ratio=side_margin_ratio, bottom_region_ratio=bottom_region_ratio,
+                       min_vertical_gain_ratio=min_vertical_gain_ratio, reach_ratio=reach_ratio)
 
-    if route[-1].center.y > top_y and len(route) < max_holds:
-        remaining = [h for h in holds if _obj_key(h) not in used]
-        if remaining:
-            finish = min(remaining, key=lambda h: h.center.y)
-            if finish.center.y < route[-1].center.y:
-                route.append(finish)
 
-    return route
+def _ranked_route(detected_objects: Sequence[DetectedObject], graph: ReachGraph, path: np.ndarray,
+                  cost: float) -> RankedRoute:
+    # the original objects, so callers can match route holds by identity
+    return RankedRoute(holds=[detected_objects[index] for index in graph.pool[path].tolist()], cost=cost)
+
+
+@dataclass(frozen=True)
+class ReachGraph:
+    """
+    Upward moves between the planning pool's holds, as edge arrays.
+
+    ``pool`` are hold indices into the detection set, ``starts`` positions
+    in ``pool``. Edges run from ``sources`` to ``targets`` (positions in
+    ``pool``), with the target's ``gains`` above and ``dx`` beside the
+    source in pixels.
+    """
+
+    pool: np.ndarray
+    pool_y: np.ndarray
+    starts: np.ndarray
+    sources: np.ndarray
+    targets: np.ndarray
+    gains: np.ndarray
+    dx: np.ndarray
+
+
+def reach_graph(holds: HoldSet, *, img_width: int, img_height: int, side_margin_ratio: float = 0.10,
+                bottom_region_ratio: float = 0.20, min_vertical_gain_ratio: float = 0.04,
+                reach_ratio: float = 0.20) -> ReachGraph:
+    """The :class:`ReachGraph` of ``holds`` for these parameters, built on first use and kept with the set."""
+    key = ("reach_graph", img_width, img_height, side_margin_ratio, bottom_region_ratio, min_vertical_gain_ratio,
+           reach_ratio)
+    return holds.cached(key, lambda hold_set: _build_reach_graph(
+        hold_set, img_width, img_height, side_margin_ratio, bottom_region_ratio, min_vertical_gain_ratio, reach_ratio,
+    ))
+
+
+def _build_reach_graph(holds: HoldSet, img_width: int, img_height: int, side_margin_ratio: float,
+                       bottom_region_ratio: float, min_vertical_gain_ratio: float, reach_ratio: float) -> ReachGraph:
+    pool = _hold_pool(holds, img_width, side_margin_ratio)
+    starts = np.flatnonzero(np.isin(pool, _start_pool(holds, pool, img_height, bottom_region_ratio)))
+    min_gain_px = max(1, int(round(img_height * min_vertical_gain_ratio)))
 
+    in_pool = np.zeros(len(holds), dtype=bool)
+    in_pool[pool] = True
+    # pool is sorted, so a hold's position in it is a binary search away
+    pairs = np.searchsorted(pool, hold_index(holds, "center").pairs_within(img_height * reach_ratio, in_pool))
 
-def _obj_key(obj: DetectedObject) -> tuple[str, int, int, int, int]:
-    x1, y1, x2, y2 = obj.bbox
-    return obj.class_name, int(x1), int(y1), int(x2), int(y2)
+    pool_x, pool_y = holds.centers[pool].T
+    # every close pair is one move, from the lower hold up to the higher one
+    first_is_lower = pool_y[pairs[:, 0]] > pool_y[pairs[:, 1]]
+    sources = np.where(first_is_lower, pairs[:, 0], pairs[:, 1])
+    targets = np.where(first_is_lower, pairs[:, 1], pairs[:, 0])
+    gains = pool_y[sources] - pool_y[targets]
+    upward = gains >= min_gain_px
+    sources, targets = sources[upward], targets[upward]
+    return ReachGraph(pool=pool, pool_y=pool_y, starts=starts, sources=sources, targets=targets,
+                      gains=gains[upward], dx=np.abs(pool_x[targets] - pool_x[sources]))
 
+
+def _k_best_paths(graph: ReachGraph, *, top_y: int, max_holds: int, img_width: int, img_height: int,
+                  count: int, hold_penalty: np.ndarray | None = None) -> list[tuple[np.ndarray, float]]:
+    """
+    The ``count`` cheapest start-to-top paths of at most ``max_holds`` holds.
+
+    A step's score depends on how many holds the route already has, so the
+    search runs layer by layer over route lengths, keeping the ``count``
+    cheapest partial paths into every hold. Upward edges make the graph
+    acyclic, so all kept paths are distinct. ``hold_penalty`` is added to
+    the cost of every path for each pool hold it uses.
+    """
+    if hold_penalty is None:
+        hold_penalty = np.zeros(len(graph.pool))
+    size = len(graph.pool)
+    at_top = graph.pool_y <= top_y
+    # a route ends at its first hold above the top margin, like the greedy planner's
+    climbing = ~at_top[graph.sources]
+    sources, targets = graph.sources[climbing], graph.targets[climbing]
+    gains, dx, source_y = graph.gains[climbing], graph.dx[climbing], graph.pool_y[graph.sources[climbing]]
+
+    costs = np.full((size, count), np.inf)
+    costs[graph.starts, 0] = hold_penalty[graph.starts]
+    # per route length: costs and the (hold, rank) each kept path came from
+    layers = [(costs, np.full((size, count), -1), np.full((size, count), -1))]
+    for length in range(1, max_holds):
+        previous = layers[-1][0]
+        desired_gain = (source_y - top_y) / max(1, max_holds - length)
+        step = (np.abs(gains - desired_gain) / img_height) + (0.75 * dx / img_width) + hold_penalty[targets]
+
+        # an edge can only add one of a hold's cheapest paths if its own cheapest path into the
+        # hold is among the ``count`` cheapest, which prunes most edges before ranks are expanded
+        cheapest = previous[sources, 0] + step
+        edges = np.flatnonzero(np.isfinite(cheapest))
+        if not edges.size:
+            break
+        edges = edges[np.lexsort((cheapest[edges], targets[edges]))]
+        edges = edges[_group_slots(targets[edges]) < count]
+
+        candidates = (previous[sources[edges]] + step[edges, None]).ravel()
+        reached = np.flatnonzero(np.isfinite(candidates))
+        edge, rank = np.divmod(reached, count)
+        edge, candidates = edges[edge], candidates[reached]
+        # cheapest first within each target hold; ties keep edge and rank order
+        order = np.lexsort((candidates, targets[edge]))
+        candidates, edge, rank = candidates[order], edge[order], rank[order]
+        to = targets[edge]
+        slot = _group_slots(to)
+        keep = slot < count
+
+        costs = np.full((size, count), np.inf)
+        from_hold, from_rank = np.full((size, count), -1), np.full((size, count), -1)
+        costs[to[keep], slot[keep]] = candidates[keep]
+        from_hold[to[keep], slot[keep]] = sources[edge[keep]]
+        from_rank[to[keep], slot[keep]] = rank[keep]
+        layers.append((costs, from_hold, from_rank))
+
+    all_costs = np.stack([layer[0] for layer in layers])  # (length, hold, rank)
+    ends = np.isfinite(all_costs) & at_top[None, :, None]
+    if not ends.any():
+        reached = np.isfinite(all_costs)
+        highest = graph.pool_y[reached.any(axis=(0, 2))].min()
+        ends = reached & (graph.pool_y == highest)[None, :, None]
+
+    lengths, holds, ranks = np.nonzero(ends)
+    best = np.lexsort((ranks, holds, lengths, all_costs[lengths, holds, ranks]))[:count]
+    paths = []
+    for length, hold, rank in zip(lengths[best].tolist(), holds[best].tolist(), ranks[best].tolist()):
+        cost = float(all_costs[length, hold, rank])
+        path = [hold]
+        while length > 0:
+            _, from_hold, from_rank = layers[length]
+            hold, rank = int(from_hold[hold, rank]), int(from_rank[hold, rank])
+            path.append(hold)
+            length -= 1
+        paths.append((np.array(path[::-1]), cost))
+    return paths
+
+
+def _group_slots(keys: np.ndarray) -> np.ndarray:
+    """Position of every element within its run of equal ``keys`` (which are sorted)."""
+    group_start = np.flatnonzero(np.r_[True, keys[1:] != keys[:-1]])
+    return np.arange(len(keys)) - np.repeat(group_start, np.diff(np.r_[group_start, len(keys)]))
+
+
+def _hold_pool(holds: HoldSet, img_width: int, side_margin_ratio: float) -> np.ndarray:
+    """Ascending indices of the holds to plan on: class ``hold`` (else everything), central ones if enough."""
+    centers_x = holds.centers[:, 0]
+    pool = np.flatnonzero(holds.class_mask("hold"))
+    if not pool.size:
+        pool = np.arange(len(holds))
+
+    side_min_x = int(round(img_width * side_margin_ratio))
+    side_max_x = int(round(img_width * (1.0 - side_margin_ratio)))
+    central_pool = pool[(side_min_x <= centers_x[pool]) & (centers_x[pool] <= side_max_x)]
+    if len(central_pool) >= 3:
+        pool = central_pool
+    return pool
+
+
+def _start_pool(holds: HoldSet, pool: np.ndarray, img_height: int, bottom_region_ratio: float) -> np.ndarray:
+    """The pool's holds in the bottom region, or the whole pool if there are none."""
+    bottom_y = int(round(img_height * (1.0 - bottom_region_ratio)))
+    start_pool = pool[holds.centers[pool, 1] >= bottom_y]
+    return start_pool if start_pool.size else pool
@@ -0,0 +1,149 @@
+"""
+Monte Carlo sampling of body-aware routes.
+
+:class:`RouteGenerator` draws every hold at random and raises ``ValueError``
+when a move finds no hold, so one call gives one random route or an error.
+:func:`sample_routes` runs many independent trials, each with its own
+seeded ``np.random.Generator``, optionally over a process pool, scores the
+routes that complete and keeps the cheapest. Any route is replayed exactly
+from its seed::
+
+    RouteGenerator(..., rng=np.random.default_rng(seed)).generate_route(...)
+"""
+from __future__ import annotations
+
+import multiprocessing
+import time
+from collections.abc import Sequence
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass
+from itertools import chain, repeat
+
+import numpy as np
+
+from src import config
+from src.aruco_marker import ArucoMarker
+from src.model.climber import Climber
+from src.model.detected_object import DetectedObject
+from src.model.hold_set import HoldSet
+from src.route_generator import RouteGenerator
+from src.route_scoring import route_cost
+
+
+@dataclass(frozen=True)
+class SampledRoute:
+    seed: int
+    cost: float
+    positions: list[Climber]
+
+
+@dataclass(frozen=True)
+class SamplingStats:
+    trials: int
+    failures: int
+    seconds: float
+    workers: int
+
+    @property
+    def trials_per_second(self) -> float:
+        return self.trials / self.seconds if self.seconds > 0 else 0.0
+
+    @property
+    def failure_rate(self) -> float:
+        return self.failures / self.trials if self.trials else 0.0
+
+    def to_dict(self) -> dict:
+        return {
+            "trials": self.trials,
+            "failures": self.failures,
+            "failureRate": round(self.failure_rate, 4),
+            "seconds": round(self.seconds, 4),
+            "trialsPerSecond": round(self.trials_per_second, 1),
+            "workers": self.workers,
+        }
+
+
+@dataclass(frozen=True)
+class SamplingResult:
+    # cheapest first
+    routes: list[SampledRoute]
+    stats: SamplingStats
+
+
+def sample_routes(img_width: int, img_height: int, marker: ArucoMarker, detected_objects: Sequence[DetectedObject],
+                  *, trials: int = 200, best: int = 5, seed: int = 0, workers: int = 1,
+                  climber_height_in_cm: int = config.CLIMBER_HEIGHT_IN_CM,
+                  starting_steps_max_distance_from_ground_in_cm: int =
+                  config.STARTING_STEPS_MAX_DISTANCE_FROM_GROUND_IN_CM) -> SamplingResult:
+    """
+    Generate ``trials`` random routes and return the ``best`` cheapest ones.
+
+    Trial seeds are derived from ``seed``, so the result does not depend on
+    ``workers``. With more than one worker the trials run in that many
+    processes, which only send back costs; the kept routes are replayed
+    from their seeds here, on ``detected_objects`` itself.
+    """
+    if trials < 1:
+        raise ValueError("trials must be >= 1")
+    if best < 1:
+        raise ValueError("best must be >= 1")
+    if workers < 1:
+        raise ValueError("workers must be >= 1")
+
+    job = _Trials(img_width, img_height, marker, HoldSet.from_objects(detected_objects),
+                  climber_height_in_cm, starting_steps_max_distance_from_ground_in_cm)
+    seeds = np.random.SeedSequence(seed).generate_state(trials).tolist()
+
+    started = time.perf_counter()
+    if workers == 1:
+        costs = job.costs(seeds)
+    else:
+        # workers get their own copy of the holds, without the indexes built here
+        remote_job = job.without_caches()
+        chunk_size = -(-trials // workers)
+        chunks = [seeds[start:start + chunk_size] for start in range(0, trials, chunk_size)]
+        # torch does not survive fork() after it has been initialised
+        with ProcessPoolExecutor(max_workers=workers, mp_context=multiprocessing.get_context("spawn")) as executor:
+            costs = list(chain.from_iterable(executor.map(_Trials.costs, repeat(remote_job), chunks)))
+    seconds = time.perf_counter() - started
+
+    # cheapest first, ties in trial order
+    completed = sorted((cost, trial) for trial, cost in enumerate(costs) if cost is not None)[:best]
+    routes = [SampledRoute(seed=seeds[trial], cost=cost, positions=job.generate(seeds[trial]))
+              for cost, trial in completed]
+    stats = SamplingStats(trials=trials, failures=costs.count(None), seconds=seconds, workers=workers)
+    return SamplingResult(routes=routes, stats=stats)
+
+
+@dataclass(frozen=True)
+class _Trials:
+    img_width: int
+    img_height: int
+    marker: ArucoMarker
+    holds: HoldSet
+    climber_height_in_cm: int
+    starting_steps_max_distance_from_ground_in_cm: int
+
+    def generate(self, seed: int) -> list[Climber]:
+        generator = RouteGenerator(self.img_width, self.img_height, self.marker, self.holds,
+                                   rng=np.random.default_rng(seed))
+        return generator.generate_route(self.climber_height_in_cm,
+                                        self.starting_steps_max_distance_from_ground_in_cm)
+
+    def costs(self, seeds: list[int]) -> list[float | None]:
+        """The route cost of every seed, None where the route could not be completed."""
+        costs = []
+        for seed in seeds:
+            try:
+                costs.append(route_cost(self.generate(seed)))
+            except ValueError:
+                costs.append(None)
+        return costs
+
+    def without_caches(self) -> _Trials:
+        holds = self.holds
+        plain_holds = HoldSet(bboxes=holds.bboxes, class_ids=holds.class_ids, class_names=holds.class_names,
+                              confidences=holds.confidences, centers=holds.centers, ids=holds.ids,
+                              source=holds.source)
+        return _Trials(self.img_width, self.img_height, self.marker, plain_holds, self.climber_height_in_cm,
+                       self.starting_steps_max_distance_from_ground_in_cm)
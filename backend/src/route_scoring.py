@@ -0,0 +1,63 @@
+"""
+Costs of body-aware routes and climber positions, lower is better.
+
+:func:`route_cost` prices the moves of a route with the biometric cost
+function; :func:`posture_cost` prices how comfortably a climber stands in
+one position. Both are in image pixels, so they add up.
+"""
+from __future__ import annotations
+
+import math
+from collections.abc import Sequence
+
+import numpy as np
+
+from src.model.climber import PARTS, Climber
+
+LIMBS = ("left_arm", "right_arm", "left_leg", "right_leg")
+
+# a hand is most comfortable on a hold at this fraction of the arm length from its shoulder
+COMFORTABLE_REACH = 0.8
+
+
+def route_cost(positions: Sequence[Climber]) -> float:
+    """
+    Cost of a route under the biometric cost function.
+
+    Every move of a limb to another hold costs the distance between the two
+    holds, times ``2 ** (3 * overshoot / reach)`` for the part of it beyond
+    the limb's reach (the arm or leg length). Every position must stand on
+    views of one ``HoldSet``, as the route generators' positions do.
+    """
+    if len(positions) < 2:
+        return 0.0
+    limb_rows = [PARTS.index(limb) for limb in LIMBS]
+    holds = positions[0].state.holds
+    if any(position.state.holds is not holds or (position.state.other_holds and not position.state.single_hold_set())
+           for position in positions):
+        raise ValueError("route_cost needs positions on the holds of one HoldSet")
+    hold_indices = np.array([position.state.hold_indices[limb_rows] for position in positions])
+    centers = holds.centers[hold_indices].astype(float)
+
+    body_proportion = positions[0].body_proportion
+    reach = np.array([body_proportion.arm, body_proportion.arm, body_proportion.leg, body_proportion.leg])
+    distances = np.linalg.norm(centers[1:] - centers[:-1], axis=2)
+    factors = np.where(distances <= reach, 1.0, 2.0 ** (3 * (distances - reach) / reach))
+    moved = hold_indices[1:] != hold_indices[:-1]
+    return float((distances * factors)[moved].sum())
+
+
+def posture_cost(climber: Climber) -> float:
+    """
+    How far a position is from a comfortable stance.
+
+    The feet should be about shoulder width apart and each hand at
+    :data:`COMFORTABLE_REACH` of the arm length from its shoulder; the
+    cost is the sum of the deviations.
+    """
+    body_proportion = climber.body_proportion
+    stance = math.dist(climber.left_leg.end.to_tuple(), climber.right_leg.end.to_tuple())
+    cost = abs(stance - 2 * body_proportion.shoulder)
+    for arm in (climber.left_arm, climber.right_arm):
+        cost += abs(math.dist(arm.start.to_tuple(), arm.end.to_tuple()) - COMFORTABLE_REACH * body_proportion.arm)
+    return cost
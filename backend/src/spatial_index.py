@@ -0,0 +1,93 @@
+"""
+Range queries over the holds of one detection set.
+
+A :class:`HoldIndex` is built once per :class:`HoldSet` and anchor (see
+:func:`hold_index`) and answers radius, batched radius, pair and y-band
+queries without scanning every hold. Results are hold indices in ascending order,
+i.e. in detection order, so callers that pick among them get the same
+holds as a linear scan would give.
+"""
+from __future__ import annotations
+
+from collections.abc import Sequence
+
+import numpy as np
+
+from src.model.hold_set import HoldSet
+from src.model.point import Point
+
+# where a hold's distance is measured from: its bbox's top-left corner
+# (what get_objects_around_point always did) or its center
+ANCHORS = ("top_left", "center")
+
+# the tree's own distance test is <= radius in floats; widen it and filter exactly
+_RADIUS_SLACK = 1e-6
+
+
+class HoldIndex:
+    def __init__(self, holds: HoldSet, anchor: str = "top_left"):
+        if anchor not in ANCHORS:
+            raise ValueError(f"anchor must be one of {ANCHORS}, not {anchor!r}")
+        # scipy is only needed once a route is generated, keep it off the API import path
+        from scipy.spatial import cKDTree
+
+        self.holds = holds
+        self.anchor = anchor
+        self.points = (holds.bboxes[:, :2] if anchor == "top_left" else holds.centers).astype(float)
+        self._tree = cKDTree(self.points) if len(holds) else None
+        self._y_order = np.argsort(self.points[:, 1], kind="stable")
+        self._sorted_y = self.points[self._y_order, 1]
+
+    def within(self, point: Point, radius: float, mask: np.ndarray | None = None) -> np.ndarray:
+        """Holds whose anchor is closer than ``radius`` to ``point``, optionally only where ``mask``."""
+        if self._tree is None or radius <= 0:
+            return np.zeros(0, dtype=int)
+        candidates = self._tree.query_ball_point((point.x, point.y), radius + _RADIUS_SLACK)
+        return self._exact(np.array(candidates, dtype=int), (point.x, point.y), radius, mask)
+
+    def within_many(self, points: Sequence[Point] | np.ndarray, radius: float,
+                    mask: np.ndarray | None = None) -> list[np.ndarray]:
+        """:meth:`within` for many points in one tree traversal; ``points`` are Points or an ``(n, 2)`` array."""
+        if not isinstance(points, np.ndarray):
+            points = [(point.x, point.y) for point in points]
+        xy = np.asarray(points, dtype=float).reshape(-1, 2)
+        if self._tree is None or radius <= 0:
+            return [np.zeros(0, dtype=int) for _ in xy]
+        candidates = self._tree.query_ball_point(xy, radius + _RADIUS_SLACK)
+        return [self._exact(np.array(found, dtype=int), center, radius, mask)
+                for found, center in zip(candidates, xy)]
+
+    def pairs_within(self, radius: float, mask: np.ndarray | None = None) -> np.ndarray:
+        """``(m, 2)`` array of the index pairs ``i < j`` whose anchors are closer than ``radius``, sorted."""
+        if self._tree is None or radius <= 0:
+            return np.zeros((0, 2), dtype=int)
+        pairs = self._tree.query_pairs(radius + _RADIUS_SLACK, output_type="ndarray").astype(int)
+        if mask is not None:
+            pairs = pairs[mask[pairs[:, 0]] & mask[pairs[:, 1]]]
+        distances = np.sqrt(((self.points[pairs[:, 0]] - self.points[pairs[:, 1]]) ** 2).sum(axis=1))
+        pairs = pairs[distances < radius]
+        return pairs[np.lexsort((pairs[:, 1], pairs[:, 0]))]
+
+    def in_y_band(self, y_min: float, y_max: float, mask: np.ndarray | None = None) -> np.ndarray:
+        """Holds whose anchor has ``y_min <= y <= y_max``."""
+        start = np.searchsorted(self._sorted_y, y_min, side="left")
+        stop = np.searchsorted(self._sorted_y, y_max, side="right")
+        indices = np.sort(self._y_order[start:stop])
+        return indices if mask is None else indices[mask[indices]]
+
+    def _exact(self, candidates: np.ndarray, center: tuple[float, float], radius: float,
+               mask: np.ndarray | None) -> np.ndarray:
+        candidates.sort()
+        if mask is not None:
+            candidates = candidates[mask[candidates]]
+        return candidates[within_radius(self.points[candidates], center, radius)]
+
+
+def hold_index(holds: HoldSet, anchor: str = "top_left") -> HoldIndex:
+    """The index of ``holds`` for ``anchor``, built on first use and kept with the set."""
+    return holds.cached(("hold_index", anchor), lambda hold_set: HoldIndex(hold_set, anchor))
+
+
+def within_radius(points: np.ndarray, center: tuple[float, float], radius: float) -> np.ndarray:
+    """Mask of ``points`` strictly closer than ``radius`` to ``center``."""
+    return np.sqrt(((points - center) ** 2).sum(axis=1)) < radius
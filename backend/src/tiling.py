@@ -0,0 +1,139 @@
+"""
+Sliced inference for images much larger than the detector input.
+
+The image is cut into overlapping square tiles, each tile is detected at
+the network's input size, and the per-tile detections are shifted to image
+coordinates and merged with a cross-tile NMS. The overlap has to be at
+least as wide as the largest hold so that every hold lies whole in some
+tile; the partial boxes of holds cut by a tile edge then lose the merge
+against those whole ones.
+"""
+from __future__ import annotations
+
+import math
+from collections.abc import Callable, Sequence
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+
+import cv2
+import numpy as np
+
+from src.yolo_ops import box_iou
+
+# a box this close to a tile side that is not an image side was cut by the tile
+_TILE_EDGE_PX = 2
+
+# (tiles) -> per tile (xyxy boxes, scores, class ids) in tile coordinates
+DetectRawFn = Callable[[list[cv2.typing.MatLike]], list[tuple[np.ndarray, np.ndarray, np.ndarray]]]
+
+
+@dataclass(frozen=True)
+class Tile:
+    x: int
+    y: int
+    width: int
+    height: int
+
+    def crop(self, img: cv2.typing.MatLike) -> cv2.typing.MatLike:
+        return img[self.y:self.y + self.height, self.x:self.x + self.width]
+
+
+def tile_grid(img_width: int, img_height: int, tile_size: int, overlap: float) -> list[Tile]:
+    """
+    Row-major tiles of ``tile_size`` covering the image, neighbours sharing
+    at least ``overlap`` of a tile. Tiles are spread evenly, so the last
+    row and column end exactly at the image border.
+    """
+    if tile_size <= 0:
+        raise ValueError("tile_size must be > 0")
+    if not 0 <= overlap < 1:
+        raise ValueError("overlap must be in [0, 1)")
+
+    xs = _tile_offsets(img_width, tile_size, overlap)
+    ys = _tile_offsets(img_height, tile_size, overlap)
+    return [
+        Tile(x=x, y=y, width=min(tile_size, img_width), height=min(tile_size, img_height))
+        for y in ys for x in xs
+    ]
+
+
+def detect_tiles(detect_raw: DetectRawFn, img: cv2.typing.MatLike, tiles: Sequence[Tile],
+                 batch_size: int = 1, concurrency: int = 1) -> list[tuple[np.ndarray, np.ndarray, np.ndarray]]:
+    """
+    Run ``detect_raw`` on the tiles of ``img`` in batches of ``batch_size``,
+    up to ``concurrency`` batches at a time. Results are in tile order.
+    """
+    crops = [tile.crop(img) for tile in tiles]
+    batches = [crops[start:start + batch_size] for start in range(0, len(crops), max(batch_size, 1))]
+    if concurrency <= 1 or len(batches) == 1:
+        results = [detect_raw(batch) for batch in batches]
+    else:
+        with ThreadPoolExecutor(max_workers=min(concurrency, len(batches)),
+                                thread_name_prefix="detect-tile") as executor:
+            results = list(executor.map(detect_raw, batches))
+    return [tile_result for batch_results in results for tile_result in batch_results]
+
+
+def merge_tile_detections(tiles: Sequence[Tile], tile_results: Sequence[tuple[np.ndarray, np.ndarray, np.ndarray]],
+                          img_width: int, img_height: int, iou: float,
+                          min_overlap: float = 0.6) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """
+    Cross-tile NMS: shift every tile's boxes to image coordinates and keep
+    one box per hold.
+
+    Two boxes of a class are the same hold when their IoU exceeds ``iou``
+    or when ``min_overlap`` of the smaller one lies inside the other - a
+    hold cut by a tile edge only overlaps a fraction of its whole box.
+    Boxes touching an inner tile edge lose to uncut ones, then the higher
+    score wins.
+    """
+    all_boxes, all_scores, all_class_ids, all_cut = [], [], [], []
+    for tile, (boxes, scores, class_ids) in zip(tiles, tile_results, strict=True):
+        boxes = np.asarray(boxes, dtype=float).reshape(-1, 4)
+        all_boxes.append(boxes + [tile.x, tile.y, tile.x, tile.y])
+        all_scores.append(np.asarray(scores, dtype=float))
+        all_class_ids.append(np.asarray(class_ids, dtype=int))
+        all_cut.append(_cut_by_tile_edge(boxes, tile, img_width, img_height))
+
+    boxes = np.concatenate(all_boxes) if all_boxes else np.zeros((0, 4))
+    scores = np.concatenate(all_scores) if all_scores else np.zeros(0)
+    class_ids = np.concatenate(all_class_ids) if all_class_ids else np.zeros(0, dtype=int)
+    cut = np.concatenate(all_cut) if all_cut else np.zeros(0, dtype=bool)
+
+    # uncut boxes first, each group by descending score
+    order = np.lexsort((-scores, cut))
+    areas = np.prod(boxes[:, 2:] - boxes[:, :2], axis=1)
+    kept = []
+    while order.size:
+        best = order[0]
+        kept.append(best)
+        rest = order[1:]
+        overlaps = box_iou(boxes[best:best + 1], boxes[rest])[0]
+        intersections = overlaps * (areas[best] + areas[rest]) / (1 + overlaps)
+        covered = intersections / (np.minimum(areas[best], areas[rest]) + 1e-9)
+        same_hold = (class_ids[rest] == class_ids[best]) & ((overlaps > iou) | (covered > min_overlap))
+        order = rest[~same_hold]
+
+    kept = np.array(kept, dtype=int)
+    return boxes[kept], scores[kept], class_ids[kept]
+
+
+def _tile_offsets(length: int, tile_size: int, overlap: float) -> list[int]:
+    if length <= tile_size:
+        return [0]
+    count = math.ceil((length - tile_size) / (tile_size * (1 - overlap))) + 1
+    step = (length - tile_size) / (count - 1)
+    return [round(index * step) for index in range(count)]
+
+
+def _cut_by_tile_edge(boxes: np.ndarray, tile: Tile, img_width: int, img_height: int) -> np.ndarray:
+    cut = np.zeros(len(boxes), dtype=bool)
+    if tile.x > 0:
+        cut |= boxes[:, 0] <= _TILE_EDGE_PX
+    if tile.y > 0:
+        cut |= boxes[:, 1] <= _TILE_EDGE_PX
+    if tile.x + tile.width < img_width:
+        cut |= boxes[:, 2] >= tile.width - _TILE_EDGE_PX
+    if tile.y + tile.height < img_height:
+        cut |= boxes[:, 3] >= tile.height - _TILE_EDGE_PX
+    return cut
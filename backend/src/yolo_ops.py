@@ -0,0 +1,139 @@
+from __future__ import annotations
+
+import math
+from dataclasses import dataclass
+
+import cv2
+import numpy as np
+
+LETTERBOX_COLOR = (114, 114, 114)
+# largest downsampling factor of the YOLOv8/v9 backbone; input sides must be multiples of it
+STRIDE = 32
+
+
+@dataclass(frozen=True)
+class Letterbox:
+    """How an image was fitted into the network input, to map boxes back."""
+
+    ratio: float
+    pad_x: float
+    pad_y: float
+    img_width: int
+    img_height: int
+
+
+def letterbox(img: cv2.typing.MatLike, input_width: int, input_height: int) -> tuple[np.ndarray, Letterbox]:
+    """
+    Resize ``img`` keeping its aspect ratio and pad it to the input size,
+    centered, with the grey ultralytics pads with.
+    """
+    img_height, img_width = img.shape[:2]
+    ratio = min(input_width / img_width, input_height / img_height)
+    resized_width, resized_height = round(img_width * ratio), round(img_height * ratio)
+    pad_x, pad_y = (input_width - resized_width) / 2, (input_height - resized_height) / 2
+
+    if (resized_width, resized_height) != (img_width, img_height):
+        img = cv2.resize(img, (resized_width, resized_height), interpolation=cv2.INTER_LINEAR)
+    top, bottom = round(pad_y - 0.1), round(pad_y + 0.1)
+    left, right = round(pad_x - 0.1), round(pad_x + 0.1)
+    padded = cv2.copyMakeBorder(img, top, bottom, left, right, cv2.BORDER_CONSTANT, value=LETTERBOX_COLOR)
+
+    return padded, Letterbox(ratio=ratio, pad_x=pad_x, pad_y=pad_y, img_width=img_width, img_height=img_height)
+
+
+def rect_input_size(img_width: int, img_height: int, imgsz: int, stride: int = STRIDE) -> tuple[int, int]:
+    """
+    Smallest stride-aligned ``(width, height)`` holding the image scaled so
+    its long side is ``imgsz``, instead of the full ``imgsz`` square.
+    """
+    ratio = imgsz / max(img_width, img_height)
+    return (
+        math.ceil(round(img_width * ratio) / stride) * stride,
+        math.ceil(round(img_height * ratio) / stride) * stride,
+    )
+
+
+def to_input_tensor(imgs: list[np.ndarray]) -> np.ndarray:
+    """BGR uint8 HWC images -> float32 NCHW RGB batch in [0, 1]."""
+    batch = np.stack(imgs)[..., ::-1].transpose(0, 3, 1, 2)
+    return np.ascontiguousarray(batch, dtype=np.float32) / 255.0
+
+
+def non_max_suppression(prediction: np.ndarray, conf: float, iou: float,
+                        max_det: int = 300) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """
+    Class-aware NMS over one raw YOLOv8/v9 head output.
+
+    ``prediction`` is ``(4 + num_classes, num_anchors)``: center x, center y,
+    width, height, then one score per class. Returns xyxy boxes, scores and
+    class ids, best first.
+    """
+    scores_per_class = prediction[4:]
+    class_ids = scores_per_class.argmax(axis=0)
+    scores = scores_per_class[class_ids, np.arange(prediction.shape[1])]
+
+    keep = scores > conf
+    cx, cy, w, h = prediction[:4, keep]
+    boxes = np.stack((cx - w / 2, cy - h / 2, cx + w / 2, cy + h / 2), axis=1)
+    scores, class_ids = scores[keep], class_ids[keep]
+
+    # offset boxes per class so a single NMS pass never suppresses across classes
+    offsets = class_ids[:, None].astype(boxes.dtype) * 7680
+    kept = _greedy_nms(boxes + offsets, scores, iou)[:max_det]
+    return boxes[kept], scores[kept], class_ids[kept]
+
+
+def scale_boxes(boxes: np.ndarray, transform: Letterbox) -> np.ndarray:
+    """Map xyxy boxes from network input back onto the original image."""
+    boxes = boxes.copy()
+    boxes[:, [0, 2]] = (boxes[:, [0, 2]] - transform.pad_x) / transform.ratio
+    boxes[:, [1, 3]] = (boxes[:, [1, 3]] - transform.pad_y) / transform.ratio
+    boxes[:, [0, 2]] = boxes[:, [0, 2]].clip(0, transform.img_width)
+    boxes[:, [1, 3]] = boxes[:, [1, 3]].clip(0, transform.img_height)
+    return boxes
+
+
+def box_iou(boxes1: np.ndarray, boxes2: np.ndarray) -> np.ndarray:
+    """Pairwise IoU of two sets of xyxy boxes, shape ``(len(boxes1), len(boxes2))``."""
+    top_left = np.maximum(boxes1[:, None, :2], boxes2[None, :, :2])
+    bottom_right = np.minimum(boxes1[:, None, 2:], boxes2[None, :, 2:])
+    intersection = np.prod(np.clip(bottom_right - top_left, 0, None), axis=2)
+    area1 = np.prod(boxes1[:, 2:] - boxes1[:, :2], axis=1)
+    area2 = np.prod(boxes2[:, 2:] - boxes2[:, :2], axis=1)
+    return intersection / (area1[:, None] + area2[None, :] - intersection + 1e-9)
+
+
+def match_boxes(boxes1: np.ndarray, boxes2: np.ndarray,
+                iou_threshold: float) -> list[tuple[int, int, float]]:
+    """
+    Pair boxes of two detection sets one-to-one, highest IoU first.
+
+    Returns ``(index1, index2, iou)`` for every pair above ``iou_threshold``.
+    """
+    if len(boxes1) == 0 or len(boxes2) == 0:
+        return []
+    ious = box_iou(boxes1.astype(float), boxes2.astype(float))
+    matches = []
+    used1, used2 = set(), set()
+    for flat_index in ious.ravel().argsort()[::-1]:
+        index1, index2 = divmod(int(flat_index), ious.shape[1])
+        iou = float(ious[index1, index2])
+        if iou < iou_threshold:
+            break
+        if index1 in used1 or index2 in used2:
+            continue
+        used1.add(index1)
+        used2.add(index2)
+        matches.append((index1, index2, iou))
+    return matches
+
+
+def _greedy_nms(boxes: np.ndarray, scores: np.ndarray, iou: float) -> np.ndarray:
+    order = scores.argsort()[::-1]
+    kept = []
+    while order.size:
+        best = order[0]
+        kept.append(best)
+        overlaps = box_iou(boxes[best:best + 1], boxes[order[1:]])[0]
+        order = order[1:][overlaps <= iou]
+    return np.array(kept, dtype=int)
@@ -0,0 +1,40 @@
+import pytest
+from fastapi.testclient import TestClient
+
+from api.app_factory import create_app
+from routers import boulder
+from src import config
+from src.result_cache import CacheEntry
+
+
+@pytest.fixture
+def client():
+    with TestClient(create_app(title="test", routers=[boulder.router])) as test_client:
+        yield test_client
+
+
+def test_dropping_the_cache_needs_the_admin_token(client, monkeypatch) -> None:
+    # given
+    monkeypatch.setattr(config, "ADMIN_TOKEN", "s3cret")
+    boulder.result_cache.put("key", CacheEntry(detected_objects=[], body=b"png", media_type="image/png"))
+
+    # when
+    anonymous = client.delete("/boulder/cache")
+    wrong_token = client.delete("/boulder/cache", headers={"Authorization": "Bearer guess"})
+    admin = client.delete("/boulder/cache", headers={"Authorization": "Bearer s3cret"})
+
+    # then
+    assert anonymous.status_code == wrong_token.status_code == 401
+    assert admin.status_code == 200
+    assert boulder.result_cache.get("key") is None
+
+
+def test_dropping_the_cache_is_disabled_without_an_admin_token(client, monkeypatch) -> None:
+    # given
+    monkeypatch.setattr(config, "ADMIN_TOKEN", "")
+
+    # when
+    response = client.delete("/boulder/cache", headers={"Authorization": "Bearer "})
+
+    # then
+    assert response.status_code == 403
@@ -0,0 +1,140 @@
+from dataclasses import replace
+
+import cv2
+import numpy as np
+import pytest
+from fastapi.testclient import TestClient
+
+from api import boulder_pipeline
+from api.app_factory import create_app
+from routers import boulder
+from src import config, objects_detector
+from src.model.hold_set import HoldSet
+from src.route_scoring import LIMBS
+
+
+def _wall(seed: int = 3, count: int = 400) -> HoldSet:
+    rng = np.random.default_rng(seed)
+    centers = rng.integers(0, [1216, 1600], size=(count, 2))
+    return HoldSet(bboxes=np.hstack([centers - 10, centers + 10]), class_ids=np.zeros(count), class_names=("hold",),
+                   centers=centers)
+
+
+def _photo(shade: int = 255) -> bytes:
+    """A blank 1216 px wide wall with a 7 cm ArUco marker at about 4 px/cm."""
+    img = np.full((1600, 1216, 3), shade, dtype=np.uint8)
+    marker = cv2.aruco.generateImageMarker(cv2.aruco.getPredefinedDictionary(config.MARKER_ARUCO_DICT), 0, 28)
+    img[1500:1528, 40:68] = marker[..., None]
+    return cv2.imencode(".png", img)[1].tobytes()
+
+
+@pytest.fixture
+def client(monkeypatch):
+    holds = _wall()
+    # no detector here: every photo shows the synthetic wall
+    monkeypatch.setattr(boulder_pipeline, "_detect", lambda img, tiling_img=None: holds)
+    boulder.result_cache.invalidate()
+    boulder_pipeline.near_duplicate_index.clear()
+    with TestClient(create_app(title="test", routers=[boulder.router])) as test_client:
+        yield test_client
+    boulder.result_cache.invalidate()
+    boulder_pipeline.near_duplicate_index.clear()
+
+
+def _post(client: TestClient, query: str, photo: bytes | None = None):
+    return client.post(f"/boulder/route?{query}", files={"file": ("wall.png", photo or _photo(), "image/png")})
+
+
+def test_route_geometry_of_several_routes(client) -> None:
+    # when
+    response = _post(client, "routes=2")
+
+    # then
+    assert response.status_code == 200
+    geometry = response.json()
+    assert geometry["classNames"] == ["hold"]
+    assert geometry["routes"][0] == geometry["route"]
+    assert all(0 <= index < len(_wall()) for route in geometry["routes"] for index in route)
+    assert "positions" not in geometry
+
+
+def test_deadline_plans_a_body_aware_route(client) -> None:
+    # when
+    response = _post(client, "deadline_ms=2000")
+
+    # then
+    assert response.status_code == 200
+    geometry = response.json()
+    assert len(geometry["holds"]) == len(_wall())
+    assert set(geometry["search"]) == {"cost", "exhaustive", "beamWidth", "seconds"}
+    assert geometry["search"]["seconds"] <= 2.0 + 0.05
+    positions = geometry["positions"]
+    assert positions and all(len(position) == len(LIMBS) for position in positions)
+    assert geometry["route"] == list(dict.fromkeys(index for position in positions for index in position))
+    assert "routes" not in geometry
+
+
+def test_deadline_cannot_be_combined_with_several_routes(client) -> None:
+    # when
+    response = _post(client, "deadline_ms=100&routes=2")
+
+    # then
+    assert response.status_code == 400
+    assert "deadline_ms" in response.json()["detail"]
+
+
+def test_running_out_of_time_is_a_gateway_timeout(client) -> None:
+    # when
+    response = _post(client, "deadline_ms=1")
+
+    # then
+    assert response.status_code == 504
+    assert response.json()["detail"] == "No route found within 1 ms, try a longer deadline_ms"
+    assert response.headers["X-Failed-Stage"] == "plan"
+
+
+def test_cached_response_keeps_the_near_duplicate_distance(client) -> None:
+    # given
+    _post(client, "routes=1")
+
+    # when
+    reused = _post(client, "routes=1", _photo(shade=250))
+    cached = _post(client, "routes=1", _photo(shade=250))
+
+    # then
+    assert reused.headers["X-Near-Duplicate-Distance"] == "0"
+    assert cached.headers["X-Near-Duplicate-Distance"] == "0"
+    assert boulder.result_cache.stats()["memoryHits"] == 1
+
+
+def test_results_of_a_model_loaded_during_the_request_are_not_cached(client, monkeypatch) -> None:
+    # given
+    holds = _wall()
+    monkeypatch.setattr(objects_detector, "_SETTINGS", objects_detector.settings())
+
+    def detect_with_new_weights(img, tiling_img=None):
+        objects_detector._SETTINGS = replace(objects_detector._SETTINGS, model_fingerprint="new weights")
+        return holds
+
+    monkeypatch.setattr(boulder_pipeline, "_detect", detect_with_new_weights)
+
+    # when
+    response = _post(client, "routes=1")
+
+    # then
+    assert response.status_code == 200
+    assert boulder.result_cache.stats()["entries"] == 0
+
+
+def test_detections_of_replaced_weights_are_not_reused(client, monkeypatch) -> None:
+    # given
+    _post(client, "routes=1")
+    monkeypatch.setattr(objects_detector, "_SETTINGS",
+                        replace(objects_detector.settings(), model_fingerprint="new weights"))
+
+    # when
+    response = _post(client, "routes=1", _photo(shade=250))
+
+    # then
+    assert response.status_code == 200
+    assert "X-Near-Duplicate-Distance" not in response.headers
@@ -0,0 +1,77 @@
+import numpy as np
+import pytest
+
+from src.model.body_part import BodyPart
+from src.model.climber import Climber
+from src.model.color import Color
+from src.model.detected_object import DetectedObject
+from src.model.hold_set import HoldSet
+from src.model.point import Point
+from src.route_scoring import route_cost
+
+
+def _holds() -> HoldSet:
+    return HoldSet(bboxes=[[0, 0, 10, 10], [20, 20, 30, 30]], class_ids=[0, 0], class_names=("hold",))
+
+
+def test_parts_are_views_of_the_climber_state() -> None:
+    # given
+    holds = _holds()
+    climber = Climber(height=800)
+
+    # when
+    climber.left_leg = BodyPart(start=Point(5, 50), end=Point(5, 5), color=Color.blue(), detected_object=holds[0])
+    climber.left_leg.end = Point(25, 25)
+    climber.left_leg.detected_object = holds[1]
+
+    # then
+    assert climber.head is None
+    assert climber.left_leg.start == Point(5, 50)
+    assert climber.left_leg.end == Point(25, 25)
+    assert climber.left_leg.color == Color.blue() and climber.left_leg.thickness == 10
+    assert climber.left_leg.detected_object is holds[1]
+    assert climber.state.joints[climber.left_leg.part].tolist() == [5, 50, 25, 25]
+
+
+def test_copies_are_independent_and_share_the_holds() -> None:
+    # given
+    holds = _holds()
+    climber = Climber(height=800)
+    climber.right_arm = BodyPart(start=Point(0, 0), end=Point(5, 5), color=Color.red(), detected_object=holds[0])
+
+    # when
+    moved = climber.copy()
+    moved.right_arm = BodyPart(start=Point(0, 0), end=Point(25, 25), color=Color.green(), detected_object=holds[1])
+
+    # then
+    assert (climber.right_arm.end, climber.right_arm.color) == (Point(5, 5), Color.red())
+    assert climber.right_arm.detected_object is holds[0]
+    assert moved.right_arm.detected_object is holds[1]
+    assert moved.state.holds is climber.state.holds
+    assert moved.body_proportion is climber.body_proportion
+
+
+def test_body_parts_keep_plain_detections_and_holds_of_other_sets() -> None:
+    # given
+    holds, other_holds = _holds(), _holds()
+    detection = DetectedObject("hold", np.array([0, 0, 10, 10]), Point(5, 5))
+    climber = Climber(height=800)
+    climber.left_arm = BodyPart(start=Point(0, 0), end=Point(5, 5), color=Color.red(), detected_object=holds[0])
+
+    # when
+    climber.right_arm = BodyPart(start=Point(0, 0), end=Point(5, 5), color=Color.red(), detected_object=detection)
+    climber.left_leg = BodyPart(start=Point(0, 0), end=Point(5, 5), color=Color.red(),
+                                detected_object=other_holds[1])
+    moved = climber.copy()
+    moved.right_arm.detected_object = holds[1]
+
+    # then
+    assert climber.left_arm.detected_object is holds[0]
+    assert climber.right_arm.detected_object is detection
+    assert climber.left_leg.detected_object is other_holds[1]
+    assert moved.right_arm.detected_object is holds[1]
+    assert moved.left_leg.detected_object is other_holds[1]
+    assert not climber.state.single_hold_set()
+    with pytest.raises(ValueError, match="one HoldSet"):
+        route_cost([climber, moved])
+
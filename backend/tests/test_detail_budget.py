@@ -0,0 +1,46 @@
+import numpy as np
+
+from src.model.detected_object import DetectedObject
+from src.model.point import Point
+from src.objects_detector import detail_budget_size
+
+
+def _holds(side: int, count: int) -> list[DetectedObject]:
+    return [
+        DetectedObject(class_name="hold", bbox=np.array([i * 100, 0, i * 100 + side, side]),
+                       center=Point(x=i * 100 + side // 2, y=side // 2))
+        for i in range(count)
+    ]
+
+
+def test_large_holds_keep_the_probe_size() -> None:
+    # given: 60 px holds in a 3000 px photo are 12.8 px at 640
+    probe = _holds(side=60, count=20)
+
+    # when
+    size = detail_budget_size(probe, 2250, 3000, probe_size=640, max_size=1216, min_hold_px=12)
+
+    # then
+    assert size == 640
+
+
+def test_small_holds_raise_the_size_to_the_next_stride() -> None:
+    # given: 40 px holds in a 3000 px photo need 1050 for 14 px and 1500 (capped) for 20 px
+    probe = _holds(side=40, count=20)
+
+    # when
+    size = detail_budget_size(probe, 2250, 3000, probe_size=640, max_size=1216, min_hold_px=14)
+    capped = detail_budget_size(probe, 2250, 3000, probe_size=640, max_size=1216, min_hold_px=20)
+
+    # then
+    assert size == 1056
+    assert capped == 1216
+
+
+def test_too_few_probe_holds_use_the_full_size() -> None:
+    # when
+    size = detail_budget_size(_holds(side=200, count=3), 2250, 3000, probe_size=640, max_size=1216,
+                              min_hold_px=12)
+
+    # then
+    assert size == 1216
@@ -0,0 +1,221 @@
+import importlib.util
+import os
+from pathlib import Path
+
+import cv2
+import numpy as np
+import pytest
+
+from src import config
+from src.detection_backends import DetectionBackend, create_backend, default_model_path
+from src.yolo_ops import letterbox, match_boxes, non_max_suppression, rect_input_size, scale_boxes
+
+# folder of wall photos for the cross-backend parity check; skipped when unset
+PARITY_IMAGES_DIR = os.getenv("DETECTION_PARITY_IMAGES")
+PARITY_MIN_IOU = 0.9
+PARITY_MAX_UNMATCHED_RATIO = 0.02
+
+
+class _CannedBackend(DetectionBackend):
+    """Returns a fixed raw head output, to exercise the shared pre/postprocessing."""
+
+    name = "canned"
+
+    def __init__(self, prediction: np.ndarray):
+        super().__init__(Path("canned.onnx"))
+        self.class_names = {0: "hold", 1: "volume"}
+        self.batches = []
+        self._prediction = prediction
+
+    def forward(self, batch: np.ndarray) -> np.ndarray:
+        self.batches.append(batch)
+        return np.repeat(self._prediction[None], len(batch), axis=0)
+
+
+def _raw_prediction(boxes_cxcywh: list, class_scores: list) -> np.ndarray:
+    return np.concatenate([np.array(boxes_cxcywh, dtype=np.float32).T,
+                           np.array(class_scores, dtype=np.float32).T])
+
+
+def test_letterbox_keeps_aspect_ratio_and_centers_padding() -> None:
+    # given
+    img = np.zeros((300, 600, 3), dtype=np.uint8)
+
+    # when
+    padded, transform = letterbox(img, 640, 640)
+
+    # then
+    assert padded.shape == (640, 640, 3)
+    assert transform.ratio == pytest.approx(640 / 600)
+    assert transform.pad_x == 0
+    assert transform.pad_y == pytest.approx((640 - 320) / 2)
+    assert tuple(padded[0, 0]) == (114, 114, 114)
+    assert tuple(padded[320, 320]) == (0, 0, 0)
+
+
+def test_scale_boxes_inverts_letterbox() -> None:
+    # given
+    img = np.zeros((900, 1200, 3), dtype=np.uint8)
+    _, transform = letterbox(img, 640, 640)
+    original = np.array([[100.0, 200.0, 400.0, 500.0]])
+    letterboxed = original * transform.ratio + [transform.pad_x, transform.pad_y, transform.pad_x, transform.pad_y]
+
+    # when
+    restored = scale_boxes(letterboxed, transform)
+
+    # then
+    np.testing.assert_allclose(restored, original, atol=1e-6)
+
+
+def test_nms_suppresses_overlaps_within_a_class_only() -> None:
+    # given
+    prediction = _raw_prediction(
+        boxes_cxcywh=[[100, 100, 50, 50], [102, 102, 50, 50], [101, 101, 50, 50], [300, 300, 40, 40]],
+        class_scores=[[0.9, 0.0], [0.8, 0.0], [0.0, 0.7], [0.1, 0.2]],
+    )
+
+    # when
+    boxes, scores, class_ids = non_max_suppression(prediction, conf=0.5, iou=0.7)
+
+    # then
+    np.testing.assert_allclose(scores, [0.9, 0.7], rtol=1e-6)
+    assert class_ids.tolist() == [0, 1]
+    np.testing.assert_allclose(boxes[0], [75, 75, 125, 125])
+
+
+def test_letterbox_matches_ultralytics() -> None:
+    # given
+    augment = pytest.importorskip("ultralytics.data.augment")
+    img = np.random.default_rng(0).integers(0, 256, (333, 517, 3), dtype=np.uint8)
+
+    # when
+    padded, _ = letterbox(img, 640, 480)
+
+    # then
+    np.testing.assert_array_equal(padded, augment.LetterBox(new_shape=(480, 640), auto=False)(image=img))
+
+
+def test_nms_matches_ultralytics() -> None:
+    # given
+    torch = pytest.importorskip("torch")
+    ops = pytest.importorskip("ultralytics.utils.ops")
+    rng = np.random.default_rng(0)
+    centers = rng.uniform(0, 640, (2, 2000))
+    sizes = rng.uniform(10, 80, (2, 2000))
+    prediction = np.concatenate([centers, sizes, rng.uniform(0, 1, (2, 2000))]).astype(np.float32)
+
+    # when
+    boxes, scores, class_ids = non_max_suppression(prediction, conf=0.25, iou=0.7)
+    [expected] = ops.non_max_suppression(torch.from_numpy(prediction[None]), conf_thres=0.25, iou_thres=0.7)
+
+    # then
+    expected = expected.numpy()
+    np.testing.assert_allclose(boxes, expected[:, :4], atol=1e-3)
+    np.testing.assert_allclose(scores, expected[:, 4], rtol=1e-6)
+    assert class_ids.tolist() == expected[:, 5].astype(int).tolist()
+
+
+def test_backend_maps_detections_back_to_image_coordinates() -> None:
+    # given: a 1280x640 photo letterboxed into 640x640 is halved and padded by 160 px vertically
+    prediction = _raw_prediction(
+        boxes_cxcywh=[[100, 260, 20, 40], [500, 400, 60, 60]],
+        class_scores=[[0.95, 0.01], [0.02, 0.9]],
+    )
+    backend = _CannedBackend(prediction)
+    img = np.zeros((640, 1280, 3), dtype=np.uint8)
+
+    # when
+    [detected_objects] = backend.detect([img], conf=0.5, iou=0.7, imgsz=640)
+
+    # then
+    assert backend.batches[0].shape == (1, 3, 640, 640)
+    assert [obj.class_name for obj in detected_objects] == ["hold", "volume"]
+    assert detected_objects[0].bbox.tolist() == [180, 160, 220, 240]
+    assert (detected_objects[0].center.x, detected_objects[0].center.y) == (200, 200)
+    assert detected_objects[1].bbox.tolist() == [940, 420, 1060, 540]
+
+
+def test_rect_input_size_is_stride_aligned_and_keeps_aspect_ratio() -> None:
+    # when and then
+    assert rect_input_size(3024, 4032, 1216) == (928, 1216)
+    assert rect_input_size(1216, 1216, 1216) == (1216, 1216)
+    assert rect_input_size(4000, 1000, 640) == (640, 160)
+
+
+def test_rect_batch_uses_smallest_shape_holding_every_image() -> None:
+    # given: a portrait 3:4 photo and a landscape 2:1 photo; a box at the portrait input's center
+    prediction = _raw_prediction(boxes_cxcywh=[[240, 320, 48, 64]], class_scores=[[0.9, 0.0]])
+    backend = _CannedBackend(prediction)
+    portrait = np.zeros((1280, 960, 3), dtype=np.uint8)
+    landscape = np.zeros((300, 600, 3), dtype=np.uint8)
+
+    # when
+    [portrait_objects] = backend.detect([portrait], conf=0.5, iou=0.7, imgsz=640, rect=True)
+    backend.detect([portrait, landscape], conf=0.5, iou=0.7, imgsz=640, rect=True)
+
+    # then
+    assert backend.batches[0].shape == (1, 3, 640, 480)
+    assert backend.batches[1].shape == (2, 3, 640, 640)
+    assert portrait_objects[0].bbox.tolist() == [432, 576, 528, 704]
+
+
+def test_rect_is_ignored_for_static_exports() -> None:
+    # given
+    backend = _CannedBackend(_raw_prediction([[0, 0, 1, 1]], [[0.0, 0.0]]))
+    backend.fixed_input_size = (640, 640)
+
+    # when
+    backend.detect([np.zeros((1200, 900, 3), dtype=np.uint8)], conf=0.5, iou=0.7, imgsz=640, rect=True)
+
+    # then
+    assert backend.batches[0].shape == (1, 3, 640, 640)
+
+
+def test_static_input_size_mismatch_is_reported() -> None:
+    # given
+    backend = _CannedBackend(_raw_prediction([[0, 0, 1, 1]], [[0.0, 0.0]]))
+    backend.fixed_input_size = (1216, 1216)
+
+    # when and then
+    with pytest.raises(ValueError, match="--size 640"):
+        backend.detect([np.zeros((100, 100, 3), dtype=np.uint8)], conf=0.5, iou=0.7, imgsz=640)
+
+
+@pytest.mark.parametrize("backend", ["onnxruntime", "openvino"])
+def test_exported_backend_matches_pytorch(backend: str) -> None:
+    # given
+    for module in ("torch", "ultralytics", backend):
+        if importlib.util.find_spec(module) is None:
+            pytest.skip(f"{module} is not installed")
+    weights_path = Path(config.YOLO_MODEL_PATH)
+    exported_path = default_model_path(backend, weights_path)
+    if not weights_path.exists() or not exported_path.exists():
+        pytest.skip(f"needs {weights_path} and its {backend} export at {exported_path}")
+    if not PARITY_IMAGES_DIR:
+        pytest.skip("set DETECTION_PARITY_IMAGES to a folder of wall photos")
+
+    reference = create_backend("pytorch", weights_path)
+    candidate = create_backend(backend, exported_path)
+    imgsz = candidate.fixed_input_size[0] if candidate.fixed_input_size else config.YOLO_IMAGE_SIZE
+    img_paths = sorted(Path(PARITY_IMAGES_DIR).glob("*.jp*g"))
+    assert img_paths, f"no JPEG images in {PARITY_IMAGES_DIR}"
+
+    for img_path in img_paths:
+        img = cv2.imread(str(img_path))
+
+        # when
+        [expected] = reference.detect([img], conf=0.25, iou=0.7, imgsz=imgsz)
+        [actual] = candidate.detect([img], conf=0.25, iou=0.7, imgsz=imgsz)
+
+        # then
+        matches = match_boxes(
+            np.array([obj.bbox for obj in expected]).reshape(-1, 4),
+            np.array([obj.bbox for obj in actual]).reshape(-1, 4),
+            iou_threshold=PARITY_MIN_IOU,
+        )
+        assert all(expected[i].class_name == actual[j].class_name for i, j, _ in matches), img_path.name
+        unmatched = len(expected) + len(actual) - 2 * len(matches)
+        assert unmatched <= PARITY_MAX_UNMATCHED_RATIO * max(len(expected), 1) + 1, (
+            f"{img_path.name}: {len(expected)} pytorch vs {len(actual)} {backend} boxes, "
+            f"{len(matches)} matched at IoU >= {PARITY_MIN_IOU}"
+        )
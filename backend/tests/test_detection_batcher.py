@@ -0,0 +1,103 @@
+import threading
+
+import pytest
+
+from src.detection_batcher import DetectionBatcher
+from src.metrics import DETECTION_BATCH_FLUSHES, DETECTION_BATCH_SIZE, DETECTION_BATCH_WAIT_SECONDS
+
+
+class _FakeDetector:
+    def __init__(self):
+        self.batches = []
+        self.lock = threading.Lock()
+
+    def __call__(self, imgs, **params):
+        with self.lock:
+            self.batches.append((len(imgs), params))
+        return [f"{img}:{params['conf']}" for img in imgs]
+
+
+def _detect_concurrently(batcher: DetectionBatcher, requests: list) -> dict:
+    results = {}
+    start = threading.Barrier(len(requests))
+
+    def worker(img, conf):
+        start.wait()
+        results[img] = batcher.detect(img, conf=conf)
+
+    threads = [threading.Thread(target=worker, args=request) for request in requests]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return results
+
+
+def test_concurrent_requests_share_one_batch() -> None:
+    # given
+    detector = _FakeDetector()
+    batcher = DetectionBatcher(detector, max_batch_size=4, max_wait_ms=200)
+
+    # when
+    results = _detect_concurrently(batcher, [(f"img{i}", 0.5) for i in range(4)])
+
+    # then
+    assert results == {f"img{i}": f"img{i}:0.5" for i in range(4)}
+    assert [size for size, _ in detector.batches] == [4]
+    assert batcher.stats()["batchSizes"] == {"4": 1}
+
+
+def test_batches_are_capped_at_max_batch_size() -> None:
+    # given
+    detector = _FakeDetector()
+    batcher = DetectionBatcher(detector, max_batch_size=2, max_wait_ms=200)
+
+    # when
+    _detect_concurrently(batcher, [(f"img{i}", 0.5) for i in range(5)])
+
+    # then
+    assert all(size <= 2 for size, _ in detector.batches)
+    assert batcher.stats()["requests"] == 5
+
+
+def test_requests_with_different_params_are_not_mixed() -> None:
+    # given
+    detector = _FakeDetector()
+    batcher = DetectionBatcher(detector, max_batch_size=4, max_wait_ms=100)
+
+    # when
+    results = _detect_concurrently(batcher, [("a", 0.5), ("b", 0.9), ("c", 0.5)])
+
+    # then
+    assert results == {"a": "a:0.5", "b": "b:0.9", "c": "c:0.5"}
+    assert sorted(size for size, _ in detector.batches) == [1, 2]
+
+
+def test_detector_errors_are_raised_in_every_caller() -> None:
+    # given
+    def failing_detector(imgs, **params):
+        raise RuntimeError("inference failed")
+
+    batcher = DetectionBatcher(failing_detector, max_batch_size=2, max_wait_ms=0)
+
+    # when and then
+    with pytest.raises(RuntimeError):
+        batcher.detect("img", conf=0.5)
+
+
+def test_flush_reasons_and_waits_are_exported_as_metrics() -> None:
+    # given
+    batcher = DetectionBatcher(_FakeDetector(), max_batch_size=2, max_wait_ms=100)
+    flushes_before = {reason: DETECTION_BATCH_FLUSHES.value(reason=reason) for reason in ("full", "timeout")}
+    batches_before, waits_before = DETECTION_BATCH_SIZE.count(), DETECTION_BATCH_WAIT_SECONDS.count()
+
+    # when
+    _detect_concurrently(batcher, [("a", 0.5), ("b", 0.5)])
+    batcher.detect("c", conf=0.5)
+
+    # then
+    assert batcher.stats()["flushReasons"] == {"full": 1, "timeout": 1}
+    assert DETECTION_BATCH_FLUSHES.value(reason="full") == flushes_before["full"] + 1
+    assert DETECTION_BATCH_FLUSHES.value(reason="timeout") == flushes_before["timeout"] + 1
+    assert DETECTION_BATCH_SIZE.count() == batches_before + 2
+    assert DETECTION_BATCH_WAIT_SECONDS.count() == waits_before + 3
@@ -0,0 +1,106 @@
+import os
+from pathlib import Path
+
+import pytest
+
+from src import config, objects_detector
+from src.detection_backends import DetectionBackend
+from src.detection_manifest import DetectorSelection, load_selection, weights_fingerprint, write_manifest
+
+
+def _setup(tmp_path: Path) -> tuple[Path, Path, DetectorSelection]:
+    weights_path = tmp_path / "best.pt"
+    weights_path.write_bytes(b"weights")
+    (tmp_path / "benchmark").mkdir()
+    (tmp_path / "benchmark" / "best_832.onnx").write_bytes(b"onnx")
+    selection = DetectorSelection(backend="onnxruntime", precision="fp32", imgsz=832,
+                                  model_path="benchmark/best_832.onnx")
+    return weights_path, tmp_path / "detection_manifest.json", selection
+
+
+def test_selection_round_trips_with_absolute_model_path(tmp_path: Path) -> None:
+    # given
+    weights_path, manifest_path, selection = _setup(tmp_path)
+    write_manifest(manifest_path, weights_path, selection, candidates=[], tolerance={"minRecall": 0.95})
+
+    # when
+    loaded, reason = load_selection(manifest_path, weights_path)
+
+    # then
+    assert reason == "ok"
+    assert (loaded.backend, loaded.precision, loaded.imgsz) == ("onnxruntime", "fp32", 832)
+    assert Path(loaded.model_path) == tmp_path / "benchmark" / "best_832.onnx"
+
+
+def test_manifest_for_other_weights_is_ignored(tmp_path: Path) -> None:
+    # given
+    weights_path, manifest_path, selection = _setup(tmp_path)
+    write_manifest(manifest_path, weights_path, selection, candidates=[], tolerance={})
+    weights_path.write_bytes(b"retrained weights")
+    os.utime(weights_path, ns=(0, 0))
+
+    # when
+    loaded, reason = load_selection(manifest_path, weights_path)
+
+    # then
+    assert loaded is None
+    assert "other weights" in reason
+
+
+def test_missing_manifest_or_model_is_reported(tmp_path: Path) -> None:
+    # given
+    weights_path, manifest_path, selection = _setup(tmp_path)
+
+    # when
+    missing_manifest, _ = load_selection(manifest_path, weights_path)
+    write_manifest(manifest_path, weights_path, selection, candidates=[], tolerance={})
+    (tmp_path / "benchmark" / "best_832.onnx").unlink()
+    missing_model, reason = load_selection(manifest_path, weights_path)
+
+    # then
+    assert missing_manifest is None
+    assert missing_model is None
+    assert "not found" in reason
+
+
+def test_auto_backend_falls_back_to_pytorch_when_the_selected_runtime_is_missing(
+        tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> None:
+    # given
+    weights_path, manifest_path, selection = _setup(tmp_path)
+    write_manifest(manifest_path, weights_path, selection, candidates=[], tolerance={})
+    monkeypatch.setattr(config, "YOLO_MODEL_PATH", str(weights_path))
+    monkeypatch.setattr(config, "DETECTION_BACKEND", "auto")
+    monkeypatch.setattr(config, "DETECTION_MANIFEST_PATH", str(manifest_path))
+    monkeypatch.setattr(config, "DETECTION_MODEL_PATH", "")
+    monkeypatch.setattr(objects_detector, "runtime_installed", lambda backend: backend == "pytorch")
+
+    # when
+    settings = objects_detector._resolve_settings()
+
+    # then
+    assert (settings.backend, settings.precision, settings.source) == ("pytorch", "fp32", "config")
+    assert settings.model_path == weights_path
+
+
+def test_model_fingerprint_is_read_again_when_the_backend_loads(tmp_path: Path,
+                                                                 monkeypatch: pytest.MonkeyPatch) -> None:
+    # given
+    weights_path = tmp_path / "best.pt"
+    weights_path.write_bytes(b"weights")
+    monkeypatch.setattr(config, "YOLO_MODEL_PATH", str(weights_path))
+    monkeypatch.setattr(config, "DETECTION_BACKEND", "pytorch")
+    monkeypatch.setattr(config, "DETECTION_MODEL_PATH", "")
+    monkeypatch.setattr(objects_detector, "_SETTINGS", None)
+    monkeypatch.setattr(objects_detector, "_BACKEND", None)
+    monkeypatch.setattr(objects_detector, "create_backend",
+                        lambda backend, model_path: DetectionBackend(model_path))
+    first_key = objects_detector.settings().cache_params()
+
+    # when
+    weights_path.write_bytes(b"retrained weights")
+    objects_detector._get_backend()
+    loaded_key = objects_detector.settings().cache_params()
+
+    # then
+    assert loaded_key["model"] == weights_fingerprint(weights_path)
+    assert loaded_key != first_key
@@ -0,0 +1,51 @@
+import numpy as np
+import pytest
+
+from src.detection_metrics import detection_agreement, latency_summary
+from src.model.detected_object import DetectedObject
+from src.model.point import Point
+
+
+def _obj(class_name: str, x1: int, y1: int, x2: int, y2: int) -> DetectedObject:
+    return DetectedObject(
+        class_name=class_name,
+        bbox=np.array([x1, y1, x2, y2]),
+        center=Point(x=(x1 + x2) // 2, y=(y1 + y2) // 2),
+    )
+
+
+def test_identical_detections_agree_fully() -> None:
+    # given
+    detections = [[_obj("hold", 0, 0, 10, 10), _obj("volume", 50, 50, 90, 90)]]
+
+    # when
+    agreement = detection_agreement(detections, detections)
+
+    # then
+    assert agreement["meanIou"] == pytest.approx(1.0)
+    assert agreement["recall"] == 1.0
+    assert agreement["precision"] == 1.0
+
+
+def test_missed_and_misclassified_holds_lower_recall() -> None:
+    # given
+    baseline = [[_obj("hold", 0, 0, 10, 10), _obj("hold", 20, 20, 30, 30)], [_obj("hold", 0, 0, 10, 10)]]
+    candidate = [[_obj("hold", 0, 0, 10, 11), _obj("volume", 20, 20, 30, 30)], []]
+
+    # when
+    agreement = detection_agreement(baseline, candidate)
+
+    # then
+    assert agreement["recall"] == pytest.approx(1 / 3)
+    assert agreement["precision"] == pytest.approx(1 / 2)
+    assert agreement["meanIou"] == pytest.approx(100 / 110)
+
+
+def test_latency_summary_reports_percentiles_and_throughput() -> None:
+    # when
+    summary = latency_summary([0.01] * 99 + [0.1], images_per_call=2)
+
+    # then
+    assert summary["p50Ms"] == pytest.approx(10)
+    assert summary["p99Ms"] > summary["p90Ms"]
+    assert summary["imagesPerSecond"] == pytest.approx(200 / 1.09)
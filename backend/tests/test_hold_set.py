@@ -0,0 +1,123 @@
+import pickle
+
+import numpy as np
+
+from src.model.detected_object import DetectedObject
+from src.model.hold_set import HoldSet
+from src.model.point import Point
+from src.objects_detector import get_objects_around_point
+
+
+def _holds() -> HoldSet:
+    return HoldSet(
+        bboxes=np.array([[0, 0, 10, 10], [100, 50, 121, 71], [40, 40, 60, 60]]),
+        class_ids=np.array([0, 1, 0]),
+        class_names=("hold", "volume"),
+        confidences=np.array([0.9, 0.8, 0.7]),
+    )
+
+
+def test_views_behave_like_detected_objects() -> None:
+    # given
+    holds = _holds()
+
+    # when
+    volume = holds[1]
+
+    # then
+    assert volume.class_name == "volume"
+    assert volume.center == Point(x=110, y=60)
+    assert volume.confidence == 0.8
+    assert volume == DetectedObject(class_name="volume", bbox=np.array([100, 50, 121, 71]), center=Point(110, 60))
+    assert volume.to_dict() == {"className": "volume", "bbox": [100, 50, 121, 71], "center": [110, 60]}
+    assert holds[-1] is holds[2]
+    assert [hold.to_dict() for hold in holds] == holds.to_dicts()
+
+
+def test_views_share_the_set_arrays() -> None:
+    # given
+    holds = _holds()
+
+    # then
+    assert np.shares_memory(holds[0].bbox, holds.bboxes)
+
+
+def test_from_objects_round_trips_detected_objects() -> None:
+    # given
+    objects = [DetectedObject(class_name=hold.class_name, bbox=hold.bbox.copy(), center=hold.center)
+               for hold in _holds()]
+
+    # when
+    holds = HoldSet.from_objects(objects)
+
+    # then
+    assert list(holds) == objects
+    assert holds.class_mask("hold").tolist() == [True, False, True]
+    assert HoldSet.from_objects(holds) is holds
+
+
+def test_subset_and_rescale() -> None:
+    # when
+    holds = _holds().subset(_holds().class_mask("hold")).rescaled(0.5, 2)
+
+    # then
+    assert holds.bboxes.tolist() == [[0, 0, 5, 20], [20, 80, 30, 120]]
+    assert holds.centers.tolist() == [[2, 10], [25, 100]]
+    assert holds.confidences.tolist() == [0.9, 0.7]
+
+
+def test_objects_around_point_measures_from_top_left_corner() -> None:
+    # given
+    holds = _holds()
+
+    # when
+    around = get_objects_around_point(holds, Point(x=0, y=0), radius=57, exclude_detected_objects=[holds[0]])
+
+    # then
+    assert around == [holds[2]]
+    assert around[0] is holds[2]
+
+
+def test_holds_hash_and_compare_by_id_across_derived_sets() -> None:
+    # given
+    holds = HoldSet(bboxes=[[0, 0, 10, 10], [0, 0, 10, 10], [5, 5, 9, 9]], class_ids=[0, 0, 0],
+                    class_names=("hold",), ids=[7, 8, 9])
+
+    # when
+    rescaled = holds.subset([1, 2]).rescaled(2, 2)
+
+    # then
+    assert holds[0] != holds[1]
+    assert rescaled[0] == holds[1]
+    assert {holds[1], holds[2]} == set(rescaled)
+    assert holds.id_mask([rescaled[1]]).tolist() == [False, False, True]
+
+
+def test_holds_of_separate_detections_are_never_equal() -> None:
+    # given: the same boxes and ids, detected twice
+    first = HoldSet(bboxes=[[0, 0, 10, 10], [5, 5, 9, 9]], class_ids=[0, 0], class_names=("hold",))
+    second = HoldSet(bboxes=[[0, 0, 10, 10], [5, 5, 9, 9]], class_ids=[0, 0], class_names=("hold",))
+
+    # when
+    mixed = HoldSet.from_objects([first[1], second[0]])
+
+    # then
+    assert first[0] != second[0]
+    assert len({first[0], second[0]}) == 2
+    assert first.id_mask([second[0]]).tolist() == [False, False]
+    assert mixed[0] != first[1] and mixed[1] != second[0]
+    assert get_objects_around_point(first, Point(x=0, y=0), radius=20, exclude_detected_objects=[second[0]]) \
+        == list(first)
+    assert HoldSet.from_objects([first[1], first[0]])[0] == first[1]
+    assert pickle.loads(pickle.dumps(first))[1] == first[1]
+
+
+def test_exclusion_removes_exactly_the_excluded_hold() -> None:
+    # given: two holds with the same box
+    holds = HoldSet(bboxes=[[0, 0, 10, 10], [0, 0, 10, 10]], class_ids=[0, 0], class_names=("hold",))
+
+    # when
+    around = get_objects_around_point(holds, Point(x=0, y=0), radius=5, exclude_detected_objects=[holds[1]])
+
+    # then
+    assert [hold.id for hold in around] == [0]
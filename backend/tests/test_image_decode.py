@@ -0,0 +1,63 @@
+import cv2
+import numpy as np
+
+from src.image_decode import decode_image, read_image_size
+
+
+def _encode(ext: str, width: int, height: int) -> bytes:
+    img = np.zeros((height, width, 3), dtype=np.uint8)
+    cv2.rectangle(img, (width // 4, height // 4), (width // 2, height // 2), (0, 255, 0), -1)
+    _, encoded = cv2.imencode(ext, img)
+    return encoded.tobytes()
+
+
+def test_read_png_size_from_header() -> None:
+    # when
+    size = read_image_size(_encode(".png", 320, 240))
+
+    # then
+    assert size == (320, 240)
+
+
+def test_read_jpeg_size_from_header() -> None:
+    # when
+    size = read_image_size(_encode(".jpg", 4032, 3024))
+
+    # then
+    assert size == (4032, 3024)
+
+
+def test_read_size_of_garbage_returns_none() -> None:
+    # when and then
+    assert read_image_size(b"not an image") is None
+    assert read_image_size(b"\xff\xd8\xff") is None
+
+
+def test_decode_large_jpeg_straight_to_target_width() -> None:
+    # given
+    contents = _encode(".jpg", 4032, 3024)
+
+    # when
+    decoded = decode_image(contents, target_width=1216)
+
+    # then
+    assert decoded.img.shape == (912, 1216, 3)
+    assert (decoded.original_width, decoded.original_height) == (4032, 3024)
+    assert round(decoded.scale, 4) == round(1216 / 4032, 4)
+
+
+def test_decode_small_image_is_resized_to_target_width() -> None:
+    # given
+    contents = _encode(".png", 608, 400)
+
+    # when
+    decoded = decode_image(contents, target_width=1216)
+
+    # then
+    assert decoded.img.shape == (800, 1216, 3)
+    assert decoded.scale == 2
+
+
+def test_decode_invalid_image_returns_none() -> None:
+    # when and then
+    assert decode_image(b"\xff\xd8garbage", target_width=1216) is None
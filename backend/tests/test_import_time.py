@@ -0,0 +1,73 @@
+import subprocess
+import sys
+from pathlib import Path
+
+import pytest
+
+BACKEND_DIR = Path(__file__).resolve().parent.parent
+
+# cold import budgets in ms, generous enough for slow CI machines;
+# importing torch alone blows through both
+IMPORT_BUDGETS_MS = {
+    "api.main": 2500,
+    "api.accounts_main": 1500,
+}
+
+# must only be imported on first use, never while the app starts
+DEFERRED_MODULES = {
+    "api.main": ("torch", "ultralytics", "google.oauth2", "google.auth.transport", "PIL", "IPython"),
+    "api.accounts_main": ("torch", "ultralytics", "google.oauth2", "google.auth.transport", "PIL", "IPython",
+                          "cv2", "numpy"),
+}
+
+
+def _import_profile(module: str) -> list[tuple[str, int, int]]:
+    """(module, self us, cumulative us) per import, as reported by ``python -X importtime``."""
+    completed = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        cwd=BACKEND_DIR,
+        capture_output=True,
+        text=True,
+        timeout=120,
+    )
+    assert completed.returncode == 0, completed.stderr[-2000:]
+
+    profile = []
+    for line in completed.stderr.splitlines():
+        if not line.startswith("import time:") or "[us]" in line:
+            continue
+        self_us, cumulative_us, name = line[len("import time:"):].split("|")
+        profile.append((name.strip(), int(self_us), int(cumulative_us)))
+    return profile
+
+
+def _report(profile: list[tuple[str, int, int]], top: int = 15) -> str:
+    slowest = sorted(profile, key=lambda entry: entry[1], reverse=True)[:top]
+    return "\n".join(f"{self_us / 1000:8.1f} ms  {name}" for name, self_us, _ in slowest)
+
+
+@pytest.mark.parametrize("module", sorted(IMPORT_BUDGETS_MS))
+def test_cold_import_stays_within_budget(module: str) -> None:
+    # given
+    budget_ms = IMPORT_BUDGETS_MS[module]
+
+    # when
+    profile = _import_profile(module)
+
+    # then
+    total_ms = next(cumulative_us for name, _, cumulative_us in profile if name == module) / 1000
+    print(f"\n{module}: {total_ms:.0f} ms cold import, slowest modules:\n{_report(profile)}")
+    assert total_ms <= budget_ms, f"{module} took {total_ms:.0f} ms to import:\n{_report(profile)}"
+
+
+@pytest.mark.parametrize("module", sorted(DEFERRED_MODULES))
+def test_heavy_modules_are_not_imported_at_startup(module: str) -> None:
+    # when
+    imported = {name for name, _, _ in _import_profile(module)}
+
+    # then
+    leaked = sorted(
+        name for name in imported
+        if any(name == deferred or name.startswith(deferred + ".") for deferred in DEFERRED_MODULES[module])
+    )
+    assert not leaked, f"{module} imports {leaked} at startup"
@@ -0,0 +1,67 @@
+import time
+
+import pytest
+
+from src.metrics import Counter, Histogram, MetricsRegistry, StageTimer
+
+
+def test_histogram_renders_cumulative_buckets() -> None:
+    # given
+    registry = MetricsRegistry()
+    histogram = registry.register(Histogram("stage_seconds", "Stage latency.", ("stage",), buckets=(0.1, 1.0)))
+
+    # when
+    histogram.observe(0.05, stage="decode")
+    histogram.observe(0.5, stage="decode")
+    histogram.observe(5.0, stage="decode")
+
+    # then
+    lines = registry.render().splitlines()
+    assert "# TYPE stage_seconds histogram" in lines
+    assert 'stage_seconds_bucket{stage="decode",le="0.1"} 1' in lines
+    assert 'stage_seconds_bucket{stage="decode",le="1"} 2' in lines
+    assert 'stage_seconds_bucket{stage="decode",le="+Inf"} 3' in lines
+    assert 'stage_seconds_sum{stage="decode"} 5.55' in lines
+    assert 'stage_seconds_count{stage="decode"} 3' in lines
+
+
+def test_counter_is_kept_per_label_set() -> None:
+    # given
+    registry = MetricsRegistry()
+    counter = registry.register(Counter("errors_total", "Errors.", ("stage",)))
+
+    # when
+    counter.inc(stage="detect")
+    counter.inc(stage="detect")
+    counter.inc(stage="decode")
+
+    # then
+    assert counter.value(stage="detect") == 2
+    assert 'errors_total{stage="decode"} 1' in registry.render().splitlines()
+
+
+def test_metric_rejects_unknown_labels() -> None:
+    # given
+    counter = Counter("errors_total", "Errors.", ("stage",))
+
+    # when and then
+    with pytest.raises(ValueError):
+        counter.inc(route="/boulder/generate")
+
+
+def test_stage_timer_records_stages_and_failed_stage() -> None:
+    # given
+    timer = StageTimer()
+
+    # when
+    with timer.stage("decode"):
+        time.sleep(0.01)
+    with pytest.raises(RuntimeError):
+        with timer.stage("detect"):
+            raise RuntimeError("model failed")
+
+    # then
+    assert list(timer.stages) == ["decode", "detect"]
+    assert timer.stages["decode"] >= 0.01
+    assert timer.failed_stage == "detect"
+    assert timer.server_timing().startswith("decode;dur=")
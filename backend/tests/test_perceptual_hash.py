@@ -0,0 +1,93 @@
+import cv2
+import numpy as np
+
+from src.model.detected_object import DetectedObject
+from src.model.point import Point
+from src.perceptual_hash import FingerprintIndex, difference_hash, hamming_distance
+
+
+def _wall(width: int = 600, height: int = 800, seed: int = 0) -> np.ndarray:
+    rng = np.random.default_rng(seed)
+    img = np.full((height, width, 3), 200, dtype=np.uint8)
+    for _ in range(40):
+        x, y = int(rng.integers(0, width)), int(rng.integers(0, height))
+        color = tuple(int(c) for c in rng.integers(0, 255, size=3))
+        cv2.circle(img, (x, y), int(rng.integers(10, 60)), color, -1)
+    return img
+
+
+def _hold(x: int, y: int) -> DetectedObject:
+    return DetectedObject(class_name="hold", bbox=np.array([x - 10, y - 10, x + 10, y + 10]), center=Point(x=x, y=y))
+
+
+def test_reencoded_photo_has_close_hash() -> None:
+    # given
+    img = _wall()
+    _, jpeg = cv2.imencode(".jpg", img, [cv2.IMWRITE_JPEG_QUALITY, 60])
+    reencoded = cv2.imdecode(jpeg, cv2.IMREAD_COLOR)
+    brighter = cv2.convertScaleAbs(img, alpha=1.0, beta=15)
+
+    # when
+    distance_reencoded = hamming_distance(difference_hash(img), difference_hash(reencoded))
+    distance_brighter = hamming_distance(difference_hash(img), difference_hash(brighter))
+
+    # then
+    assert distance_reencoded <= 4
+    assert distance_brighter <= 4
+
+
+def test_different_walls_have_distant_hashes() -> None:
+    # when
+    distance = hamming_distance(difference_hash(_wall(seed=1)), difference_hash(_wall(seed=2)))
+
+    # then
+    assert distance > 10
+
+
+def test_index_reuses_detections_rescaled_to_new_image() -> None:
+    # given
+    index = FingerprintIndex(capacity=8, max_distance=6)
+    img = _wall()
+    index.add(difference_hash(img), 600, 800, [_hold(100, 200)])
+    resized = cv2.resize(img, (300, 400), interpolation=cv2.INTER_AREA)
+
+    # when
+    match = index.find(difference_hash(resized), 300, 400)
+
+    # then
+    assert match is not None
+    assert match.distance <= 6
+    assert match.detected_objects[0].center == Point(x=50, y=100)
+    assert list(match.detected_objects[0].bbox) == [45, 95, 55, 105]
+
+
+def test_index_ignores_far_hashes_and_other_aspect_ratios() -> None:
+    # given
+    index = FingerprintIndex(capacity=8, max_distance=6)
+    img = _wall()
+    fingerprint = difference_hash(img)
+    index.add(fingerprint, 600, 800, [_hold(100, 200)])
+
+    # when
+    other_wall = index.find(difference_hash(_wall(seed=3)), 600, 800)
+    other_aspect_ratio = index.find(fingerprint, 800, 600)
+
+    # then
+    assert other_wall is None
+    assert other_aspect_ratio is None
+    assert index.stats()["reuses"] == 0
+
+
+def test_index_only_reuses_detections_of_the_same_detector() -> None:
+    # given
+    index = FingerprintIndex(capacity=8, max_distance=6)
+    fingerprint = difference_hash(_wall())
+    index.add(fingerprint, 600, 800, [_hold(100, 200)], detector="weights-v1")
+
+    # when
+    same_detector = index.find(fingerprint, 600, 800, detector="weights-v1")
+    new_weights = index.find(fingerprint, 600, 800, detector="weights-v2")
+
+    # then
+    assert same_detector is not None
+    assert new_weights is None
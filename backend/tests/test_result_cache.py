@@ -0,0 +1,99 @@
+import os
+from dataclasses import replace
+
+import numpy as np
+
+from src.model.detected_object import DetectedObject
+from src.model.point import Point
+from src.result_cache import CacheEntry, ResultCache
+
+
+def _entry(body: bytes = b"png-bytes") -> CacheEntry:
+    hold = DetectedObject(class_name="hold", bbox=np.array([10, 20, 30, 40]), center=Point(x=20, y=30))
+    return CacheEntry(detected_objects=[hold], body=body, media_type="image/png")
+
+
+def test_memory_hit_after_put(tmp_path) -> None:
+    # given
+    cache = ResultCache(max_memory_bytes=10_000, disk_dir=None)
+    key = cache.make_key(b"photo", {"width": 1216})
+
+    # when
+    first = cache.get(key)
+    cache.put(key, _entry())
+    second = cache.get(key)
+
+    # then
+    assert first is None
+    assert second == _entry()
+    assert cache.stats()["misses"] == 1
+    assert cache.stats()["memoryHits"] == 1
+
+
+def test_key_depends_on_contents_and_params(tmp_path) -> None:
+    # given
+    cache = ResultCache(max_memory_bytes=10_000, disk_dir=None)
+    key = cache.make_key(b"photo", {"width": 1216, "detect": {"model": "7:1"}})
+
+    # when
+    other_photo_key = cache.make_key(b"other photo", {"width": 1216, "detect": {"model": "7:1"}})
+    other_params_key = cache.make_key(b"photo", {"width": 640, "detect": {"model": "7:1"}})
+    other_model_key = cache.make_key(b"photo", {"width": 1216, "detect": {"model": "26:2"}})
+
+    # then
+    assert len({key, other_photo_key, other_params_key, other_model_key}) == 4
+
+
+def test_least_recently_used_entry_is_evicted_over_byte_budget(tmp_path) -> None:
+    # given
+    entry_size = _entry(b"x" * 100).size_bytes()
+    cache = ResultCache(max_memory_bytes=2 * entry_size, disk_dir=None)
+    cache.put("a", _entry(b"a" * 100))
+    cache.put("b", _entry(b"b" * 100))
+    cache.get("a")
+
+    # when
+    cache.put("c", _entry(b"c" * 100))
+
+    # then
+    assert cache.get("b") is None
+    assert cache.get("a") is not None
+    assert cache.get("c") is not None
+    assert cache.stats()["evictions"] == 1
+
+
+def test_disk_tier_survives_restart(tmp_path) -> None:
+    # given
+    disk_dir = str(tmp_path / "cache")
+    cache = ResultCache(max_memory_bytes=10_000, disk_dir=disk_dir)
+    key = cache.make_key(b"photo", {})
+    cache.put(key, replace(_entry(), near_duplicate_distance=3))
+
+    # when
+    restarted = ResultCache(max_memory_bytes=10_000, disk_dir=disk_dir)
+    entry = restarted.get(key)
+
+    # then
+    assert entry.body == b"png-bytes"
+    assert entry.near_duplicate_distance == 3
+    assert entry.detected_objects == _entry().detected_objects
+    assert entry.detected_objects[0].center == Point(x=20, y=30)
+    assert restarted.stats()["diskHits"] == 1
+
+
+def test_invalidate_drops_memory_and_disk_entries(tmp_path) -> None:
+    # given
+    disk_dir = tmp_path / "cache"
+    disk_dir.mkdir()
+    (disk_dir / "README").write_text("not a cache entry")
+    (disk_dir / "backups").mkdir()
+    cache = ResultCache(max_memory_bytes=10_000, disk_dir=str(disk_dir))
+    key = cache.make_key(b"photo", {})
+    cache.put(key, _entry())
+
+    # when
+    cache.invalidate()
+
+    # then
+    assert cache.get(key) is None
+    assert sorted(os.listdir(disk_dir)) == ["README", "backups"]
@@ -0,0 +1,80 @@
+import cv2
+import numpy as np
+import pytest
+
+from src import config
+from src.route_encoding import (EncodingStats, OutputFormat, encode_image, negotiate_output_format,
+                                new_overlay_canvas)
+
+
+def test_query_parameter_wins_over_accept_header() -> None:
+    # when
+    output_format = negotiate_output_format("webp", 70, "image/jpeg")
+
+    # then
+    assert output_format == OutputFormat("webp", 70)
+    assert output_format.media_type == "image/webp"
+
+
+def test_accept_header_picks_highest_quality_supported_type() -> None:
+    # when
+    output_format = negotiate_output_format(None, None, "image/avif, image/webp;q=0.8, image/jpeg;q=0.9, */*;q=0.1")
+
+    # then
+    assert output_format == OutputFormat("jpeg", config.JPEG_QUALITY)
+
+
+def test_defaults_to_configured_format_without_preferences() -> None:
+    # when
+    output_format = negotiate_output_format(None, None, "*/*")
+
+    # then
+    assert output_format.name == config.OUTPUT_FORMAT
+
+
+def test_unsupported_format_is_rejected() -> None:
+    # when and then
+    with pytest.raises(ValueError):
+        negotiate_output_format("gif", None, None)
+
+
+def test_overlay_is_transparent_except_drawn_pixels() -> None:
+    # given
+    img = new_overlay_canvas(200, 100)
+    cv2.line(img, (10, 50), (190, 50), (255, 0, 0), 4)
+
+    # when
+    decoded = cv2.imdecode(np.frombuffer(encode_image(img, OutputFormat("overlay")), np.uint8), cv2.IMREAD_UNCHANGED)
+
+    # then
+    assert decoded.shape == (100, 200, 4)
+    assert decoded[50, 100, 3] == 255
+    assert decoded[10, 10, 3] == 0
+
+
+def test_lossy_formats_decode_to_same_size() -> None:
+    # given
+    img = np.full((120, 160, 3), 128, dtype=np.uint8)
+
+    # when
+    jpeg = cv2.imdecode(np.frombuffer(encode_image(img, OutputFormat("jpeg", 80)), np.uint8), cv2.IMREAD_COLOR)
+    webp = cv2.imdecode(np.frombuffer(encode_image(img, OutputFormat("webp", 80)), np.uint8), cv2.IMREAD_COLOR)
+
+    # then
+    assert jpeg.shape == img.shape
+    assert webp.shape == img.shape
+
+
+def test_encoding_stats_are_kept_per_format_and_quality() -> None:
+    # given
+    stats = EncodingStats()
+
+    # when
+    stats.record(OutputFormat("jpeg", 80), seconds=0.01, size_bytes=1000)
+    stats.record(OutputFormat("jpeg", 80), seconds=0.03, size_bytes=3000)
+    stats.record(OutputFormat("png"), seconds=0.1, size_bytes=9000)
+
+    # then
+    assert stats.stats()["jpeg:80"]["count"] == 2
+    assert stats.stats()["jpeg:80"]["meanBytes"] == 2000
+    assert stats.stats()["png"]["meanEncodeMs"] == pytest.approx(100)
@@ -0,0 +1,156 @@
+import time
+
+import numpy as np
+import pytest
+
+from src import config
+from src.model.climber import PARTS
+from src.model.hold_set import HoldSet
+from src.route_generator import RouteGenerator
+from src.route_scoring import LIMBS, posture_cost, route_cost
+
+
+class _Marker:
+    def convert_cm_to_px(self, cm: float) -> int:
+        return int(cm * 4)
+
+    def convert_px_to_cm(self, px: int) -> float:
+        return px / 4
+
+
+def _wall(seed: int = 3, count: int = 400) -> HoldSet:
+    rng = np.random.default_rng(seed)
+    centers = rng.integers(0, [1216, 1600], size=(count, 2))
+    return HoldSet(bboxes=np.hstack([centers - 10, centers + 10]), class_ids=np.zeros(count), class_names=("hold",),
+                   centers=centers)
+
+
+def _beam_route(holds: HoldSet, **kwargs) -> list:
+    generator = RouteGenerator(1216, 1600, _Marker(), holds)
+    return generator.generate_route_beam(config.CLIMBER_HEIGHT_IN_CM,
+                                         config.STARTING_STEPS_MAX_DISTANCE_FROM_GROUND_IN_CM, **kwargs)
+
+
+def _held(position) -> list[int]:
+    return position.state.hold_indices[[PARTS.index(limb) for limb in LIMBS]].tolist()
+
+
+def _cost(positions: list) -> float:
+    return route_cost(positions) + sum(posture_cost(position) for position in positions)
+
+
+def test_beam_search_is_deterministic_and_reaches_the_top() -> None:
+    # given
+    holds = _wall()
+
+    # when
+    first = _beam_route(holds)
+    second = _beam_route(holds)
+
+    # then
+    assert [_held(position) for position in first] == [_held(position) for position in second]
+    assert first[-1].head.start.y < first[0].head.start.y
+    top = first[-1]
+    above_head = np.array([top.head.start.x, top.head.start.y - 2 * top.body_proportion.head])
+    in_reach = np.hypot(*(holds.centers - above_head).T) <= top.body_proportion.arm
+    assert not np.any(in_reach & (holds.centers[:, 1] < above_head[1]))
+    assert all(position.state.holds is holds for position in first)
+    assert all(-1 not in _held(position) for position in first)
+
+
+def test_beam_search_finds_routes_where_random_walks_fail() -> None:
+    # given: a sparse wall
+    holds = _wall(seed=1, count=120)
+
+    # when
+    route = _beam_route(holds)
+
+    # then
+    assert len(route) > 1
+    assert _held(route[0]) != _held(route[-1])
+
+
+def test_beam_search_raises_without_a_route() -> None:
+    # given: no holds near the ground to start from
+    holds = _wall().subset(_wall().centers[:, 1] < 1200)
+
+    # then
+    with pytest.raises(ValueError):
+        _beam_route(holds)
+    with pytest.raises(ValueError, match="within 2 moves"):
+        _beam_route(_wall(), max_moves=2)
+
+
+def test_anytime_search_returns_the_best_route_before_the_deadline() -> None:
+    # given
+    generator = RouteGenerator(1216, 1600, _Marker(), _wall())
+    narrowest = generator.generate_route_beam(config.CLIMBER_HEIGHT_IN_CM,
+                                              config.STARTING_STEPS_MAX_DISTANCE_FROM_GROUND_IN_CM, beam_width=1)
+    deadline_ms = 300
+
+    # when
+    started = time.perf_counter()
+    route = generator.generate_route_anytime(config.CLIMBER_HEIGHT_IN_CM,
+                                             config.STARTING_STEPS_MAX_DISTANCE_FROM_GROUND_IN_CM, deadline_ms)
+    seconds = time.perf_counter() - started
+
+    # then
+    assert seconds < deadline_ms / 1000 + 0.1
+    assert route.cost == pytest.approx(_cost(route.positions))
+    assert route.cost <= _cost(narrowest) + 1e-6
+
+
+def _ladder(xs: tuple[int, ...], spacing: int) -> HoldSet:
+    centers = np.array([(x, y) for y in range(1580, 0, -spacing) for x in xs])
+    return HoldSet(bboxes=np.hstack([centers - 10, centers + 10]), class_ids=np.zeros(len(centers)),
+                   class_names=("hold",), centers=centers)
+
+
+def test_anytime_search_is_exhaustive_when_nothing_is_left_out() -> None:
+    # given: two columns of holds, few enough to try every placement with branching=16
+    generator = RouteGenerator(1216, 1600, _Marker(), _ladder((560, 660), spacing=150))
+
+    # when
+    route = generator.generate_route_anytime(config.CLIMBER_HEIGHT_IN_CM,
+                                             config.STARTING_STEPS_MAX_DISTANCE_FROM_GROUND_IN_CM, 10_000,
+                                             branching=16)
+    wider = generator.generate_route_anytime(config.CLIMBER_HEIGHT_IN_CM,
+                                             config.STARTING_STEPS_MAX_DISTANCE_FROM_GROUND_IN_CM, 10_000,
+                                             branching=64)
+    narrow = generator.generate_route_anytime(config.CLIMBER_HEIGHT_IN_CM,
+                                              config.STARTING_STEPS_MAX_DISTANCE_FROM_GROUND_IN_CM, 10_000,
+                                              branching=4)
+
+    # then
+    assert route.exhaustive and route.to_dict()["exhaustive"] is True
+    assert [_held(position) for position in wider.positions] == [_held(position) for position in route.positions]
+    # placements beyond the 4 best were never tried, even if no beam state was dropped
+    assert not narrow.exhaustive
+
+
+def test_anytime_search_raises_when_nothing_is_found_in_time() -> None:
+    # given
+    generator = RouteGenerator(1216, 1600, _Marker(), _wall())
+
+    # then
+    with pytest.raises(TimeoutError, match="within 0.001 ms"):
+        generator.generate_route_anytime(config.CLIMBER_HEIGHT_IN_CM,
+                                         config.STARTING_STEPS_MAX_DISTANCE_FROM_GROUND_IN_CM, 0.001)
+
+
+def test_anytime_search_stops_at_the_deadline_on_a_dense_wall() -> None:
+    # given: so many holds that pairing the first steps alone outlasts the deadline
+    generator = RouteGenerator(1216, 1600, _Marker(), _wall(count=5000))
+    with pytest.raises(TimeoutError):
+        generator.generate_route_anytime(config.CLIMBER_HEIGHT_IN_CM,
+                                         config.STARTING_STEPS_MAX_DISTANCE_FROM_GROUND_IN_CM, 1)
+
+    # when
+    started = time.perf_counter()
+    with pytest.raises(TimeoutError, match="within 20 ms"):
+        generator.generate_route_anytime(config.CLIMBER_HEIGHT_IN_CM,
+                                         config.STARTING_STEPS_MAX_DISTANCE_FROM_GROUND_IN_CM, 20)
+    seconds = time.perf_counter() - started
+
+    # then
+    assert seconds < 0.02 + 0.05
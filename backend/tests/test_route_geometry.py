@@ -0,0 +1,51 @@
+import numpy as np
+
+from api.boulder_pipeline import route_geometry
+from src.image_decode import DecodedImage
+from src.model.detected_object import DetectedObject
+from src.model.hold_set import HoldSet
+
+
+def _decoded() -> DecodedImage:
+    return DecodedImage(img=np.zeros((900, 1216, 3), dtype=np.uint8), original_width=4864, original_height=3600)
+
+
+def _holds() -> HoldSet:
+    return HoldSet(
+        bboxes=[[0, 0, 10, 10], [20, 20, 40, 40], [50, 50, 60, 60], [70, 70, 80, 80]],
+        class_ids=[1, 0, 1, 0],
+        class_names=("hold", "volume", "jug"),
+    )
+
+
+def test_geometry_lists_holds_with_used_classes_only() -> None:
+    # given
+    holds = _holds()
+
+    # when
+    geometry = route_geometry(_decoded(), holds, [holds[3], holds[1]])
+
+    # then
+    assert geometry["image"] == {"width": 1216, "height": 900, "originalWidth": 4864, "originalHeight": 3600,
+                                 "scale": 0.25}
+    # class indices in order of first appearance, "jug" is never used
+    assert geometry["classNames"] == ["volume", "hold"]
+    assert geometry["holds"] == [[0, 0, 10, 10, 0], [20, 20, 40, 40, 1], [50, 50, 60, 60, 0], [70, 70, 80, 80, 1]]
+    assert geometry["route"] == [3, 1]
+    assert "routes" not in geometry and "positions" not in geometry
+
+
+def test_route_indices_do_not_depend_on_the_hold_objects() -> None:
+    # given: routes planned on a subset of the holds, and on copies of them
+    holds = _holds()
+    pool = holds.subset([2, 3])
+    copies = [DetectedObject(class_name=hold.class_name, bbox=hold.bbox.copy(), center=hold.center) for hold in holds]
+
+    # when
+    geometry = route_geometry(_decoded(), holds, [pool[1], pool[0]], routes=[[pool[1], pool[0]], [holds[0]]])
+    from_copies = route_geometry(_decoded(), copies, [copies[2], copies[1]])
+
+    # then
+    assert geometry["route"] == [3, 2]
+    assert geometry["routes"] == [[3, 2], [0]]
+    assert from_copies["route"] == [2, 1]
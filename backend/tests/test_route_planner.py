@@ -2,7 +2,8 @@ import numpy as np
 
 from src.model.detected_object import DetectedObject
 from src.model.point import Point
-from src.route_planner import plan_bottom_to_top_route
+from src.model.hold_set import HoldSet
+from src.route_planner import plan_best_routes, plan_bottom_to_top_route, plan_diverse_routes, reach_graph
 
 
 def _obj(class_name: str, x: int, y: int, size: int = 20) -> DetectedObject:
@@ -86,3 +87,74 @@ def test_prefers_central_holds_when_available() -> None:
 
     assert all(100 <= hold.center.x <= 900 for hold in route)
 
+
+def test_route_on_a_dense_random_wall_is_unchanged() -> None:
+    rng = np.random.default_rng(2024)
+    holds = [_obj("hold", int(x), int(y)) for x, y in zip(rng.integers(0, 1000, 300), rng.integers(0, 800, 300))]
+
+    route = plan_bottom_to_top_route(holds, img_width=1000, img_height=800)
+
+    # the route the per-candidate planner picked before vectorization
+    assert [(hold.center.x, hold.center.y) for hold in route] == [
+        (782, 795), (782, 740), (807, 701), (891, 611), (873, 559), (877, 485),
+        (851, 419), (829, 372), (800, 303), (791, 236), (749, 165), (773, 56),
+    ]
+
+
+def test_graph_planner_only_makes_moves_within_reach() -> None:
+    # the greedy planner jumps from the short right column to the left one
+    right_column = [_obj("hold", 500, 760), _obj("hold", 500, 700), _obj("hold", 505, 640)]
+    left_column = [_obj("hold", 300, y) for y in range(740, 40, -110)]
+
+    greedy = plan_bottom_to_top_route(right_column + left_column, img_width=1000, img_height=800)
+    routes = plan_best_routes(right_column + left_column, img_width=1000, img_height=800, count=3)
+
+    assert (greedy[2].center.x, greedy[3].center.x) == (505, 300)
+    assert len(routes) == 1
+    assert routes[0].holds == left_column
+
+
+def test_graph_planner_ranks_distinct_routes_and_reuses_its_graph() -> None:
+    rng = np.random.default_rng(2024)
+    holds = HoldSet.from_objects(
+        [_obj("hold", int(x), int(y)) for x, y in zip(rng.integers(0, 1000, 300), rng.integers(0, 800, 300))]
+    )
+
+    routes = plan_best_routes(holds, img_width=1000, img_height=800, count=5)
+    graph = reach_graph(holds, img_width=1000, img_height=800)
+
+    costs = [route.cost for route in routes]
+    assert len(routes) == 5 and costs == sorted(costs)
+    assert len({tuple(hold.id for hold in route.holds) for route in routes}) == 5
+    for route in routes:
+        assert route.holds[0].center.y >= 640 and route.holds[-1].center.y <= 96
+        for lower, upper in zip(route.holds, route.holds[1:]):
+            assert lower.center.y - upper.center.y >= 32
+            assert np.hypot(lower.center.x - upper.center.x, lower.center.y - upper.center.y) < 160
+    assert plan_best_routes(holds, img_width=1000, img_height=800, count=8)[:5] == routes
+    assert reach_graph(holds, img_width=1000, img_height=800) is graph
+
+
+def test_diverse_routes_share_at_most_half_their_holds() -> None:
+    rng = np.random.default_rng(2024)
+    holds = HoldSet.from_objects(
+        [_obj("hold", int(x), int(y)) for x, y in zip(rng.integers(0, 1000, 300), rng.integers(0, 800, 300))]
+    )
+
+    routes = plan_diverse_routes(holds, img_width=1000, img_height=800, count=4, max_shared_ratio=0.5)
+
+    assert len(routes) == 4
+    assert routes[0] == plan_best_routes(holds, img_width=1000, img_height=800)[0]
+    assert [route.cost for route in routes] == sorted(route.cost for route in routes)
+    for later_index, later in enumerate(routes):
+        for earlier in routes[:later_index]:
+            shared = {hold.id for hold in later.holds} & {hold.id for hold in earlier.holds}
+            assert len(shared) <= len(later.holds) / 2
+
+
+def test_diverse_routes_stop_when_every_route_overlaps() -> None:
+    holds = [_obj("hold", 500, y) for y in range(760, 40, -100)]
+
+    routes = plan_diverse_routes(holds, img_width=1000, img_height=800, count=3, max_shared_ratio=0.5)
+
+    assert len(routes) == 1
@@ -0,0 +1,71 @@
+import numpy as np
+
+from src import config
+from src.model.hold_set import HoldSet
+from src.route_generator import RouteGenerator
+from src.route_sampler import sample_routes
+from src.route_scoring import route_cost
+
+
+class _Marker:
+    """4 px per cm, picklable for the worker processes."""
+
+    def convert_cm_to_px(self, cm: float) -> int:
+        return int(cm * 4)
+
+    def convert_px_to_cm(self, px: int) -> float:
+        return px / 4
+
+
+def _wall(seed: int = 3, count: int = 400) -> HoldSet:
+    rng = np.random.default_rng(seed)
+    centers = rng.integers(0, [1216, 1600], size=(count, 2))
+    return HoldSet(bboxes=np.hstack([centers - 10, centers + 10]), class_ids=np.zeros(count), class_names=("hold",),
+                   centers=centers)
+
+
+def test_sampling_is_reproducible_and_routes_replay_from_their_seeds() -> None:
+    # given
+    holds = _wall()
+
+    # when
+    first = sample_routes(1216, 1600, _Marker(), holds, trials=40, best=3, seed=11)
+    second = sample_routes(1216, 1600, _Marker(), holds, trials=40, best=3, seed=11)
+
+    # then
+    assert [(route.seed, route.cost) for route in first.routes] == [(route.seed, route.cost) for route in second.routes]
+    assert [route.cost for route in first.routes] == sorted(route.cost for route in first.routes)
+    best = first.routes[0]
+    generator = RouteGenerator(1216, 1600, _Marker(), holds, rng=np.random.default_rng(best.seed))
+    replayed = generator.generate_route(config.CLIMBER_HEIGHT_IN_CM,
+                                        config.STARTING_STEPS_MAX_DISTANCE_FROM_GROUND_IN_CM)
+    assert route_cost(replayed) == best.cost
+    assert [position.state.hold_indices.tolist() for position in replayed] == \
+        [position.state.hold_indices.tolist() for position in best.positions]
+
+
+def test_failures_are_counted() -> None:
+    # given: no holds near the ground to start from
+    holds = _wall(count=400).subset(_wall(count=400).centers[:, 1] < 1200)
+
+    # when
+    result = sample_routes(1216, 1600, _Marker(), holds, trials=10)
+
+    # then
+    assert result.routes == []
+    assert (result.stats.failures, result.stats.failure_rate) == (10, 1.0)
+    assert result.stats.trials_per_second > 0
+
+
+def test_process_pool_gives_the_same_routes() -> None:
+    # given
+    holds = _wall()
+
+    # when
+    local = sample_routes(1216, 1600, _Marker(), holds, trials=24, best=2, seed=5)
+    pooled = sample_routes(1216, 1600, _Marker(), holds, trials=24, best=2, seed=5, workers=2)
+
+    # then
+    assert [(route.seed, route.cost) for route in pooled.routes] == [(route.seed, route.cost) for route in local.routes]
+    assert pooled.stats.failures == local.stats.failures
+    assert pooled.routes[0].positions[0].state.holds is holds
@@ -0,0 +1,91 @@
+import numpy as np
+import pytest
+
+from src.model.hold_set import HoldSet
+from src.model.point import Point
+from src.objects_detector import get_objects_around_point
+from src.spatial_index import HoldIndex, hold_index
+
+
+def _random_holds(count: int, seed: int = 7) -> HoldSet:
+    rng = np.random.default_rng(seed)
+    top_left = rng.integers(0, 1000, size=(count, 2))
+    sizes = rng.integers(5, 40, size=(count, 2))
+    return HoldSet(bboxes=np.hstack([top_left, top_left + sizes]), class_ids=np.zeros(count), class_names=("hold",))
+
+
+@pytest.mark.parametrize("anchor", ["top_left", "center"])
+def test_radius_query_matches_a_linear_scan(anchor: str) -> None:
+    # given
+    holds = _random_holds(2000)
+    index = HoldIndex(holds, anchor)
+    points = holds.bboxes[:, :2] if anchor == "top_left" else holds.centers
+
+    for x, y, radius in [(500, 500, 80), (0, 0, 150), (999, 10, 45.5), (300, 700, 0)]:
+        # when
+        found = index.within(Point(x, y), radius)
+
+        # then
+        expected = [i for i, (px, py) in enumerate(points.tolist()) if ((px - x) ** 2 + (py - y) ** 2) ** 0.5 < radius]
+        assert found.tolist() == expected
+
+
+def test_radius_is_exclusive_and_batched_queries_agree() -> None:
+    # given
+    holds = HoldSet(bboxes=[[0, 0, 2, 2], [3, 4, 5, 6], [6, 8, 8, 10]], class_ids=[0, 0, 0], class_names=("hold",))
+    index = HoldIndex(holds)
+
+    # when
+    single = [index.within(Point(0, 0), 5), index.within(Point(6, 8), 6)]
+    batched = index.within_many([Point(0, 0), Point(6, 8)], 6)
+
+    # then
+    assert single[0].tolist() == [0]
+    assert [found.tolist() for found in batched] == [[0, 1], [1, 2]]
+
+
+def test_pairs_match_radius_queries() -> None:
+    # given
+    holds = _random_holds(400)
+    index = HoldIndex(holds, "center")
+    mask = holds.centers[:, 1] > 300
+
+    # when
+    pairs = index.pairs_within(60, mask)
+
+    # then
+    expected = [[i, j] for i, found in enumerate(index.within_many(holds.centers, 60, mask))
+                for j in found.tolist() if mask[i] and i < j]
+    assert pairs.tolist() == expected
+
+
+def test_y_band_and_mask() -> None:
+    # given
+    holds = _random_holds(500)
+    index = HoldIndex(holds, "center")
+    mask = holds.centers[:, 0] < 500
+
+    # when
+    band = index.in_y_band(200, 400, mask)
+
+    # then
+    centers_y = holds.centers[:, 1]
+    assert band.tolist() == np.flatnonzero((centers_y >= 200) & (centers_y <= 400) & mask).tolist()
+
+
+def test_index_is_built_once_per_set_and_used_by_objects_around_point() -> None:
+    # given
+    holds = _random_holds(300)
+
+    # when
+    around = get_objects_around_point(holds, Point(400, 400), radius=120, anchor="center")
+
+    # then
+    assert hold_index(holds, "center") is hold_index(holds, "center")
+    assert around == get_objects_around_point(list(holds), Point(400, 400), radius=120, anchor="center")
+    assert all(hold is holds[hold.index] for hold in around)
+
+
+def test_unknown_anchor_is_rejected() -> None:
+    with pytest.raises(ValueError, match="anchor"):
+        HoldIndex(_random_holds(3), anchor="bottom")
@@ -0,0 +1,76 @@
+import cv2
+import numpy as np
+import pytest
+from fastapi.testclient import TestClient
+
+from api import boulder_pipeline, telemetry
+from api.app_factory import create_app
+from routers import boulder
+from src.model.hold_set import HoldSet
+
+
+def _png() -> bytes:
+    return cv2.imencode(".png", np.full((900, 1216, 3), 255, dtype=np.uint8))[1].tobytes()
+
+
+def _stages(response) -> list[str]:
+    return [entry.split(";")[0] for entry in response.headers["Server-Timing"].split(", ")]
+
+
+@pytest.fixture
+def client(monkeypatch):
+    rng = np.random.default_rng(0)
+    centers = rng.integers(0, [1216, 900], size=(200, 2))
+    holds = HoldSet(bboxes=np.hstack([centers - 10, centers + 10]), class_ids=np.zeros(200), class_names=("hold",),
+                    centers=centers)
+    # no detector here: every photo shows the synthetic wall
+    monkeypatch.setattr(boulder_pipeline, "_detect", lambda img, tiling_img=None: holds)
+    boulder.result_cache.invalidate()
+    boulder_pipeline.near_duplicate_index.clear()
+    with TestClient(create_app(title="test", routers=[boulder.router])) as test_client:
+        yield test_client
+    boulder.result_cache.invalidate()
+    boulder_pipeline.near_duplicate_index.clear()
+
+
+def test_server_timing_lists_the_pipeline_stages(client) -> None:
+    # when
+    response = client.post("/boulder/route", files={"file": ("wall.png", _png(), "image/png")})
+
+    # then
+    assert response.status_code == 200
+    stages = _stages(response)
+    assert stages[:3] == ["read", "validate", "cache"]
+    assert {"queue", "decode", "detect", "plan", "serialize"} <= set(stages)
+    assert stages[-1] == "total"
+    assert "X-Failed-Stage" not in response.headers
+
+
+def test_failed_pipeline_keeps_its_stage_timings_and_is_counted_by_stage(client) -> None:
+    # given
+    errors = telemetry.ERRORS.value(route="/boulder/route", stage="decode", status="400")
+
+    # when: a PNG signature with nothing decodable behind it
+    response = client.post("/boulder/route", files={"file": ("wall.png", b"\x89PNG\r\n\x1a\n" + bytes(64),
+                                                             "image/png")})
+
+    # then
+    assert response.status_code == 400
+    assert response.headers["X-Failed-Stage"] == "decode"
+    assert {"read", "validate", "queue", "decode", "total"} <= set(_stages(response))
+    assert telemetry.ERRORS.value(route="/boulder/route", stage="decode", status="400") == errors + 1
+
+
+def test_errors_before_the_pipeline_are_counted_by_their_stage(client) -> None:
+    # given
+    errors = telemetry.ERRORS.value(route="/boulder/route", stage="validate", status="415")
+
+    # when
+    response = client.post("/boulder/route", files={"file": ("wall.gif", b"GIF89a", "image/gif")})
+
+    # then
+    assert response.status_code == 415
+    assert "X-Failed-Stage" not in response.headers
+    assert telemetry.ERRORS.value(route="/boulder/route", stage="validate", status="415") == errors + 1
+    assert _stages(response) == ["read", "validate", "total"]
+    assert "request_errors_total" in client.get("/metrics").text
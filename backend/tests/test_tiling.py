@@ -0,0 +1,69 @@
+import numpy as np
+
+from src.tiling import Tile, detect_tiles, merge_tile_detections, tile_grid
+
+
+def _result(boxes: list, scores: list, class_ids: list) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+    return np.array(boxes, dtype=float).reshape(-1, 4), np.array(scores, dtype=float), np.array(class_ids)
+
+
+def test_tiles_cover_the_image_with_the_requested_overlap() -> None:
+    # when
+    tiles = tile_grid(3000, 1000, tile_size=1000, overlap=0.2)
+
+    # then
+    assert [(tile.x, tile.y) for tile in tiles] == [(0, 0), (667, 0), (1333, 0), (2000, 0)]
+    assert all((tile.width, tile.height) == (1000, 1000) for tile in tiles)
+    assert all(left.x + left.width - right.x >= 200 for left, right in zip(tiles, tiles[1:]))
+
+
+def test_image_smaller_than_a_tile_is_one_tile() -> None:
+    # when and then
+    assert tile_grid(800, 600, tile_size=1216, overlap=0.2) == [Tile(x=0, y=0, width=800, height=600)]
+
+
+def test_merge_keeps_the_uncut_box_of_a_hold_split_by_a_tile_edge() -> None:
+    # given: a hold at x 900..1000 in a 1760 px image; the left tile cuts it at its right edge
+    tiles = [Tile(x=0, y=0, width=960, height=500), Tile(x=800, y=0, width=960, height=500)]
+    tile_results = [
+        _result([[900, 100, 959, 150], [10, 10, 50, 50]], [0.95, 0.9], [0, 0]),
+        _result([[100, 100, 200, 150]], [0.8], [0]),
+    ]
+
+    # when
+    boxes, scores, _ = merge_tile_detections(tiles, tile_results, 1760, 500, iou=0.7)
+
+    # then
+    assert boxes.tolist() == [[10, 10, 50, 50], [900, 100, 1000, 150]]
+    assert scores.tolist() == [0.9, 0.8]
+
+
+def test_merge_keeps_overlapping_boxes_of_different_classes() -> None:
+    # given
+    tiles = [Tile(x=0, y=0, width=500, height=500), Tile(x=400, y=0, width=500, height=500)]
+    tile_results = [_result([[420, 10, 480, 70]], [0.9], [0]), _result([[20, 10, 80, 70]], [0.8], [1])]
+
+    # when
+    boxes, _, class_ids = merge_tile_detections(tiles, tile_results, 900, 500, iou=0.7)
+
+    # then
+    assert len(boxes) == 2
+    assert class_ids.tolist() == [0, 1]
+
+
+def test_tiles_are_detected_in_batches_and_returned_in_tile_order() -> None:
+    # given
+    img = np.arange(40 * 100).reshape(40, 100, 1).astype(np.uint8)
+    tiles = tile_grid(100, 40, tile_size=40, overlap=0.25)
+    batch_sizes = []
+
+    def detect_raw(crops):
+        batch_sizes.append(len(crops))
+        return [_result([[0, 0, 1, 1]], [float(crop[0, 0, 0])], [0]) for crop in crops]
+
+    # when
+    results = detect_tiles(detect_raw, img, tiles, batch_size=2, concurrency=2)
+
+    # then
+    assert sorted(batch_sizes) == [1, 2]
+    assert [scores[0] for _, scores, _ in results] == [float(img[tile.y, tile.x, 0]) for tile in tiles]
@@ -0,0 +1,119 @@
+import asyncio
+import threading
+import time
+
+import pytest
+from fastapi import HTTPException
+
+from api.worker_pool import WorkerPool, stage_timings
+
+
+def _raise_bad_request() -> None:
+    raise HTTPException(status_code=400, detail="Invalid image file")
+
+
+def test_run_returns_result_from_worker() -> None:
+    # given
+    pool = WorkerPool(kind="thread", max_workers=1, max_queue=0, timeout_seconds=5)
+
+    # when
+    result = asyncio.run(pool.run(sum, [1, 2, 3]))
+
+    # then
+    assert result == 6
+    assert pool.in_flight == 0
+    pool.shutdown()
+
+
+def test_http_exception_from_worker_is_propagated() -> None:
+    # given
+    pool = WorkerPool(kind="thread", max_workers=1, max_queue=0, timeout_seconds=5)
+
+    # when and then
+    with pytest.raises(HTTPException) as exc_info:
+        asyncio.run(pool.run(_raise_bad_request))
+
+    assert exc_info.value.status_code == 400
+    pool.shutdown()
+
+
+def _raise_after_decoding() -> None:
+    exc = HTTPException(status_code=400, detail="Invalid image file", headers={"X-Failed-Stage": "decode"})
+    exc.timings = {"decode": 0.25}
+    raise exc
+
+
+@pytest.mark.parametrize("kind", ["thread", "process"])
+def test_stage_timings_of_a_failed_job_are_propagated(kind: str) -> None:
+    # given
+    pool = WorkerPool(kind=kind, max_workers=1, max_queue=0, timeout_seconds=30)
+
+    # when
+    with pytest.raises(HTTPException) as exc_info:
+        asyncio.run(pool.run(_raise_after_decoding))
+
+    # then
+    assert exc_info.value.headers == {"X-Failed-Stage": "decode"}
+    assert stage_timings(exc_info.value) == {"decode": 0.25}
+    assert stage_timings(HTTPException(status_code=400)) == {}
+    pool.shutdown()
+
+
+def test_rejects_when_pool_and_queue_are_full() -> None:
+    # given
+    pool = WorkerPool(kind="thread", max_workers=1, max_queue=0, timeout_seconds=5)
+    release = threading.Event()
+
+    async def scenario() -> None:
+        blocked = asyncio.ensure_future(pool.run(release.wait))
+        await asyncio.sleep(0.05)
+        try:
+            with pytest.raises(HTTPException) as exc_info:
+                await pool.run(sum, [1])
+            assert exc_info.value.status_code == 503
+        finally:
+            release.set()
+        await blocked
+
+    # when and then
+    asyncio.run(scenario())
+    pool.shutdown()
+
+
+def test_times_out_slow_jobs_but_keeps_slot_until_done() -> None:
+    # given
+    pool = WorkerPool(kind="thread", max_workers=1, max_queue=0, timeout_seconds=0.05)
+    release = threading.Event()
+
+    # when
+    with pytest.raises(HTTPException) as exc_info:
+        asyncio.run(pool.run(release.wait))
+
+    # then
+    assert exc_info.value.status_code == 504
+    assert pool.in_flight == 1
+    release.set()
+    pool.shutdown()
+
+
+def _slow_thread_ident() -> int:
+    time.sleep(0.05)
+    return threading.get_ident()
+
+
+def test_start_runs_initializer_in_every_worker_before_probe() -> None:
+    # given
+    initialized_threads = set()
+    pool = WorkerPool(
+        kind="thread", max_workers=3, max_queue=0, timeout_seconds=5,
+        initializer=lambda: initialized_threads.add(threading.get_ident()),
+    )
+
+    # when
+    probed_threads = asyncio.run(pool.start(_slow_thread_ident))
+
+    # then
+    assert len(probed_threads) == 3
+    assert len(initialized_threads) == 3
+    assert set(probed_threads) <= initialized_threads
+    pool.shutdown()